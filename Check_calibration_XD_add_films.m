@@ -11,12 +11,20 @@ function Check_calibration_XD_add_films()
     script_dir = fileparts(mfilename('fullpath'));
     addpath(fullfile(script_dir, 'functions'));
 
+    % Octave profiler for the whole run when the GUI asks for it (OCTAVE_PROFILE_FILE)
+    profile_file = getenv('OCTAVE_PROFILE_FILE');
+    if ~isempty(profile_file)
+        profile clear;
+        profile on;
+        profile_guard = onCleanup(@() writeProfile(profile_file));
+    end
+
     % Configuration flags
     create_plots = true;
     save_plots = true;
 
     % Get user inputs
-    [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir, chargeAll, lead_films, validate_calibration, polynomial_degree, lead_mask_type, rect_height_mm] = ...
+    [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir, chargeAll, lead_films, validate_calibration, polynomial_degree, lead_mask_type, rect_height_mm, write_dose_cube, precision, compare_cals] = ...
         getUserInputs();
 
     % Define measurement window coordinates [y_range; x_range]
@@ -26,27 +34,37 @@ function Check_calibration_XD_add_films()
 
     if use_existing_calibration
         % Process with existing calibration
+        t0 = traceSpan();
         [coeff1, Dose_non_Gy, Dose_non_Gy_std, Dose_calAll] = ...
             processExperimentalFilms(exp_dir, window_meas, chargeAll, create_plots, save_plots, ...
-            selected_cal, selected_mat);
+            selected_cal, selected_mat, write_dose_cube, precision, compare_cals);
+        traceSpan('processExperimentalFilms', t0, 'stage');
     else
         % Create new calibration curve
+        t0 = traceSpan();
         [calibration_dir, coeff1, Dose_non_Gy, Dose_non_Gy_std, Dose_calAll, liste, nb_files] = ...
             createCalibrationCurve(window_meas, create_plots, save_plots, cal_dir, polynomial_degree);
+        traceSpan('createCalibrationCurve', t0, 'stage');
 
         % Validate calibration if requested
         if validate_calibration
             Dose_Name_Gy = Dose_calAll;
+            t0 = traceSpan();
             [Dose, Dose_std] = applyCalibrationToCalFilms(cal_dir, liste, nb_files, window_meas, ...
                 coeff1, Dose_Name_Gy, create_plots, save_plots);
+            traceSpan('applyCalibrationToCalFilms', t0, 'stage');
         end
 
         % Process experimental films
-        processExperimentalFilms(exp_dir, window_meas, coeff1, chargeAll, create_plots, save_plots);
+        t0 = traceSpan();
+        processExperimentalFilms(exp_dir, window_meas, coeff1, chargeAll, create_plots, save_plots, write_dose_cube, precision, compare_cals);
+        traceSpan('processExperimentalFilms', t0, 'stage');
     end
 
     % Process lead region analysis
+    t0 = traceSpan();
     analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_height_mm);
+    traceSpan('analyzeLeadRegion', t0, 'stage');
 
     disp(['Processing complete! Total time: ', num2str(toc), ' seconds']);
 end
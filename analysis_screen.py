@@ -9,17 +9,21 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import QProcess
+from tracing import get_tracer
+from lead_masks import load_lead_masks
+from dose_cube import has_dose_cube, open_dose_cube
 
 class AnalysisScreen(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.current_roi_pixmap = None  # Stores original pixmap for resizing
+        self.current_mask_file = None
+        self.current_lead_masks = {}  # Lead masks of the selected ROI file, by film number
         self.extraction_timer = QTimer()  # Timer for delayed archive extraction
         self.extraction_timer.setSingleShot(True)
         self.extraction_timer.timeout.connect(self.extract_archive)
-        self.setup_ui()
-        self.load_initial_data()
+        self.setup_ui()  # Data is loaded in showEvent
     
     def setup_ui(self):
         """Initialize the main UI layout and components"""
@@ -185,6 +189,11 @@ class AnalysisScreen(QWidget):
         lead_layout.addStretch()
 
         layout.addWidget(lead_group)
+
+        self.mask_info_label = QLabel("")
+        self.mask_info_label.setStyleSheet("font-size: 12px; color: #666;")
+        self.mask_info_label.setWordWrap(True)
+        layout.addWidget(self.mask_info_label)
         
         return panel
 
@@ -245,6 +254,39 @@ class AnalysisScreen(QWidget):
         # Calibration plot checkbox
         self.include_calib_checkbox = QCheckBox("Include calibration plot in the pdf report")
         self.include_calib_checkbox.setStyleSheet("font-size: 16px;")
+
+        # Working precision of the dose maps
+        self.single_precision_checkbox = QCheckBox("Analyse in single precision (float32, half the memory)")
+        self.single_precision_checkbox.setStyleSheet("font-size: 16px;")
+
+        # Octave profiler around the whole analysis
+        self.profile_run_checkbox = QCheckBox("Profile this run (Octave function timings)")
+        self.profile_run_checkbox.setStyleSheet("font-size: 16px;")
+
+        # Parameter sweep: every combination of the listed ROI sizes and shapes (and optionally
+        # the edge-based background) evaluated in one run
+        self.sweep_checkbox = QCheckBox("Parameter sweep (each film loaded once)")
+        self.sweep_checkbox.setStyleSheet("font-size: 16px;")
+        self.sweep_checkbox.toggled.connect(self.on_sweep_toggled)
+
+        sweep_group = QWidget()
+        sweep_layout = QHBoxLayout(sweep_group)
+        sweep_layout.setContentsMargins(20, 0, 0, 0)
+        sweep_sizes_label = QLabel("ROI sizes (mm):")
+        self.sweep_sizes_input = QLineEdit()
+        self.sweep_sizes_input.setPlaceholderText("e.g., 1, 2, 3")
+        self.sweep_circle_checkbox = QCheckBox("Circle")
+        self.sweep_circle_checkbox.setChecked(True)
+        self.sweep_square_checkbox = QCheckBox("Square")
+        self.sweep_edge_checkbox = QCheckBox("Also edge-based background")
+
+        sweep_layout.addWidget(sweep_sizes_label)
+        sweep_layout.addWidget(self.sweep_sizes_input)
+        sweep_layout.addWidget(self.sweep_circle_checkbox)
+        sweep_layout.addWidget(self.sweep_square_checkbox)
+        sweep_layout.addWidget(self.sweep_edge_checkbox)
+        self.sweep_options = sweep_group
+        self.sweep_options.setEnabled(False)
         
         # Notes section
         notes_group = QWidget()
@@ -266,6 +308,10 @@ class AnalysisScreen(QWidget):
         layout.addWidget(bg_files_group)
         layout.addWidget(main_files_group)
         layout.addWidget(self.include_calib_checkbox)
+        layout.addWidget(self.single_precision_checkbox)
+        layout.addWidget(self.profile_run_checkbox)
+        layout.addWidget(self.sweep_checkbox)
+        layout.addWidget(self.sweep_options)
         layout.addWidget(notes_group)
         
         # Connect signals
@@ -449,6 +495,15 @@ class AnalysisScreen(QWidget):
             self.archive_info_label.setText(f"{len(dat_files)} data files available")
             return
         
+        # Films are read straight from the dose cube, no extraction needed
+        if has_dose_cube(calibrated_dir):
+            try:
+                cube = open_dose_cube(calibrated_dir)
+                self.archive_info_label.setText(f"{len(cube)} films in dose cube (memory-mapped)")
+                return
+            except (OSError, ValueError, KeyError) as e:
+                self.archive_info_label.setText(f"Dose cube unusable ({e}), extracting archive...")
+
         tar_files = glob.glob(os.path.join(calibrated_dir, "experimental_films_data.tar.gz"))
         if not tar_files:
             self.archive_info_label.setText("Archive file not found")
@@ -457,8 +512,9 @@ class AnalysisScreen(QWidget):
         self.archive_info_label.setText("Extracting archive...")
         
         try:
-            with tarfile.open(tar_files[0], 'r') as tar:
-                tar.extractall(path=calibrated_dir)
+            with get_tracer('analysis').span('extraction', 'io'):
+                with tarfile.open(tar_files[0], 'r') as tar:
+                    tar.extractall(path=calibrated_dir)
             
             dat_files = glob.glob(os.path.join(calibrated_dir, "*.dat"))
             self.archive_info_label.setText(f"{len(dat_files)} data files extracted")
@@ -472,6 +528,7 @@ class AnalysisScreen(QWidget):
             self.roi_image_label.clear()
             self.roi_image_label.setText("No ROI image available")
             self.current_roi_pixmap = None
+            self.load_lead_mask_info(None)
             return
             
         current_data = self.roi_combo.currentData()
@@ -479,9 +536,12 @@ class AnalysisScreen(QWidget):
             return
             
         png_file, mat_file = current_data
+        if mat_file != self.current_mask_file:
+            self.load_lead_mask_info(mat_file)
         
         try:
-            original_pixmap = QPixmap(png_file)
+            with get_tracer('analysis').span('image_load'):
+                original_pixmap = QPixmap(png_file)
             if not original_pixmap.isNull():
                 self.current_roi_pixmap = original_pixmap
                 available_height = self.roi_image_label.height()
@@ -499,6 +559,29 @@ class AnalysisScreen(QWidget):
             self.roi_image_label.setText(f"Error loading image: {str(e)}")
             self.current_roi_pixmap = None
              
+    def load_lead_mask_info(self, mat_file):
+        """Read the lead masks of the selected ROI file and list them below the mask input"""
+        self.current_mask_file = mat_file
+        self.current_lead_masks = {}
+        if not mat_file:
+            self.mask_info_label.setText("")
+            return
+
+        try:
+            with get_tracer('analysis').span('mask_load', 'io'):
+                masks, file_size, load_seconds = load_lead_masks(mat_file)
+        except Exception as e:
+            self.mask_info_label.setText(f"Could not read lead masks: {str(e)}")
+            return
+
+        self.current_lead_masks = masks
+        if not masks:
+            self.mask_info_label.setText("No lead masks found in the selected ROI file")
+            return
+        mask_list = ", ".join(f"{number} ({mask.pixel_count:,} px)" for number, mask in sorted(masks.items()))
+        self.mask_info_label.setText(
+            f"Masks in file: {mask_list} — {file_size / 1024:.1f} KB, loaded in {load_seconds * 1000:.0f} ms")
+
     def scale_image_to_panel_height(self, pixmap):
         """Scale image to fit panel height while maintaining aspect ratio"""
         if pixmap.isNull():
@@ -532,6 +615,19 @@ class AnalysisScreen(QWidget):
         self.existing_bg_combo.setEnabled(self.existing_bg_checkbox.isChecked())
         self.bg_files_input.setEnabled(self.compute_bg_checkbox.isChecked())
     
+    def on_sweep_toggled(self, checked):
+        """Enable the sweep lists; the single ROI size is not used in a sweep"""
+        self.sweep_options.setEnabled(checked)
+        self.size_input.setEnabled(not checked)
+        self.shape_combo.setEnabled(not checked)
+
+    def parse_sweep_sizes(self):
+        """ROI sizes of the sweep list (raises ValueError on invalid input)"""
+        sizes = [float(x) for x in self.sweep_sizes_input.text().replace(" ", "").split(",") if x]
+        if not sizes or any(size <= 0 for size in sizes):
+            raise ValueError("sizes must be positive numbers")
+        return sizes
+
     def update_film_count(self):
         """Update film count based on input"""
         text = self.main_files_input.text().strip()
@@ -570,14 +666,24 @@ class AnalysisScreen(QWidget):
             self.show_error("Please select at least one background option")
             return False
 
-        try:
-            size_value = float(self.size_input.text())
-            if size_value <= 0:
-                self.show_error("Size must be a positive number")
+        if self.sweep_checkbox.isChecked():
+            try:
+                self.parse_sweep_sizes()
+            except ValueError:
+                self.show_error("Please enter the sweep ROI sizes as positive numbers separated by commas")
+                return False
+            if not (self.sweep_circle_checkbox.isChecked() or self.sweep_square_checkbox.isChecked()):
+                self.show_error("Please select at least one ROI shape for the sweep")
+                return False
+        else:
+            try:
+                size_value = float(self.size_input.text())
+                if size_value <= 0:
+                    self.show_error("Size must be a positive number")
+                    return False
+            except ValueError:
+                self.show_error("Please enter a valid number for size")
                 return False
-        except ValueError:
-            self.show_error("Please enter a valid number for size")
-            return False
         
         if not self.main_files_input.text().strip():
             self.show_error("Please enter file numbers for main image set")
@@ -586,6 +692,18 @@ class AnalysisScreen(QWidget):
         if self.compute_bg_checkbox.isChecked() and not self.bg_files_input.text().strip():
             self.show_error("Please enter file numbers for background when computing new background")
             return False
+
+        mask_text = self.mask_input.text().strip()
+        if mask_text and self.current_lead_masks:
+            try:
+                missing = [n for n in self.parse_number_range(mask_text) if n not in self.current_lead_masks]
+            except ValueError:
+                missing = []
+            if missing:
+                available = ", ".join(str(n) for n in sorted(self.current_lead_masks))
+                self.show_error(f"Mask number(s) {', '.join(str(n) for n in missing)} not found "
+                                f"in the selected ROI file (available: {available})")
+                return False
             
         return True
     
@@ -668,10 +786,22 @@ class AnalysisScreen(QWidget):
         elif self.edge_bg_checkbox.isChecked():
             bgnd_choice = "edge"
         
+        # Parameter sweep lists (the first setting doubles as roi_shape/roi_size)
+        sweep = {}
+        if self.sweep_checkbox.isChecked():
+            shapes = [name for name, checkbox in (("circle", self.sweep_circle_checkbox),
+                                                  ("square", self.sweep_square_checkbox))
+                      if checkbox.isChecked()]
+            bgnd_choices = [bgnd_choice]
+            if self.sweep_edge_checkbox.isChecked() and bgnd_choice != "edge":
+                bgnd_choices.append("edge")
+            sweep = {"roi_sizes": self.parse_sweep_sizes(), "roi_shapes": shapes,
+                     "bgnd_choices": bgnd_choices}
+
         # Build parameters dictionary
         params = {
-            "roi_shape": self.shape_combo.currentText().lower(),
-            "roi_size": float(self.size_input.text()),
+            "roi_shape": sweep["roi_shapes"][0] if sweep else self.shape_combo.currentText().lower(),
+            "roi_size": sweep["roi_sizes"][0] if sweep else float(self.size_input.text()),
             "directory_films": calibrated_dir,
             "roi_image_path": roi_image_path,
             "roi_mat_path": roi_mat_path,
@@ -681,6 +811,9 @@ class AnalysisScreen(QWidget):
             "bg_nums": bg_nums,
             "main_nums": main_nums,
             "include_calib_plot": 1 if self.include_calib_checkbox.isChecked() else 0,
+            "single_precision": 1 if self.single_precision_checkbox.isChecked() else 0,
+            "profile_run": 1 if self.profile_run_checkbox.isChecked() else 0,
+            "sweep": sweep,
             "film_notes": film_notes
         }
         
@@ -4,7 +4,7 @@ import json
 import glob
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                             QLabel, QSizePolicy, QComboBox, QCheckBox, 
-                            QLineEdit, QMessageBox)
+                            QLineEdit, QMessageBox, QListWidget, QListWidgetItem)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap
 
@@ -104,9 +104,19 @@ class CalibrationScreen(QWidget):
         self.cal_image_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
         image_container_layout.addWidget(self.cal_image_label)
+
+        # Further curves evaluated on the same films in the same pass
+        compare_label = QLabel("Also evaluate with (comparison)")
+        compare_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        self.compare_cal_list = QListWidget()
+        self.compare_cal_list.setMaximumHeight(110)
+        self.compare_cal_list.setStyleSheet("font-size: 13px;")
+
         left_layout.addWidget(cal_label)
         left_layout.addWidget(self.cal_curve_combo)
         left_layout.addWidget(image_container, stretch=1)
+        left_layout.addWidget(compare_label)
+        left_layout.addWidget(self.compare_cal_list)
         
         return left_panel
     
@@ -139,6 +149,11 @@ class CalibrationScreen(QWidget):
         right_layout.addSpacing(10)
         for section in sections[-2:]:
             right_layout.addWidget(section)
+
+        right_layout.addSpacing(10)
+        right_layout.addWidget(self._create_dose_cube_checkbox())
+        right_layout.addWidget(self._create_single_precision_checkbox())
+        right_layout.addWidget(self._create_profile_checkbox())
                 
         # Add spacer to push content up
         right_layout.addStretch()
@@ -194,6 +209,21 @@ class CalibrationScreen(QWidget):
         self.validate_cal_cb.setEnabled(False)
         return self.validate_cal_cb
     
+    def _create_dose_cube_checkbox(self):
+        self.dose_cube_cb = QCheckBox("Also write a memory-mapped dose cube (random access to any film)")
+        self.dose_cube_cb.setStyleSheet("font-size: 14px;")
+        return self.dose_cube_cb
+
+    def _create_single_precision_checkbox(self):
+        self.single_precision_cb = QCheckBox("Store dose maps in single precision (float32, half the memory and disk)")
+        self.single_precision_cb.setStyleSheet("font-size: 14px;")
+        return self.single_precision_cb
+
+    def _create_profile_checkbox(self):
+        self.profile_run_cb = QCheckBox("Profile this run (Octave function timings)")
+        self.profile_run_cb.setStyleSheet("font-size: 14px;")
+        return self.profile_run_cb
+
     def _create_experimental_films_section(self):
         widget = QWidget()
         layout = QHBoxLayout(widget)
@@ -356,6 +386,8 @@ class CalibrationScreen(QWidget):
         saved_exp_dir = self.exp_films_combo.currentText()
         saved_preset = self.charges_preset_combo.currentText()
         
+        saved_compare = set(self._selected_comparison_curves())
+        
         self._populate_calibration_curves()
         self._populate_directory_lists()
         
@@ -375,6 +407,11 @@ class CalibrationScreen(QWidget):
         preset_index = self.charges_preset_combo.findText(saved_preset)
         if preset_index >= 0:
             self.charges_preset_combo.setCurrentIndex(preset_index)
+        
+        for row in range(self.compare_cal_list.count()):
+            item = self.compare_cal_list.item(row)
+            if item.text() in saved_compare and item.flags() & Qt.ItemFlag.ItemIsEnabled:
+                item.setCheckState(Qt.CheckState.Checked)
     
     def _populate_calibration_curves(self):
         """Populate calibration curves dropdown"""
@@ -396,6 +433,13 @@ class CalibrationScreen(QWidget):
             if os.path.exists(mat_file):
                 valid_calibrations.append(base_name)
         
+        self.compare_cal_list.clear()
+        for name in valid_calibrations:
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.compare_cal_list.addItem(item)
+        
         if valid_calibrations:
             self.cal_curve_combo.addItems(valid_calibrations)
         else:
@@ -411,7 +455,7 @@ class CalibrationScreen(QWidget):
             available_dirs = self._dir_cache
         else:
             project_dirs = [d for d in os.listdir('.') if os.path.isdir(d) and not d.startswith('.')]
-            excluded_dirs = {'!CalibrationCurves', '!Processed', '!ROIlead', 'functions', 'scripts', 'FilmDosimetryGUI.app'}
+            excluded_dirs = {'!CalibrationCurves', '!Processed', '!ROIlead', '!Traces', '!Results', 'functions', 'scripts', 'FilmDosimetryGUI.app'}
             available_dirs = [d for d in project_dirs 
                             if d not in excluded_dirs and not d.endswith('_CALIBRATED')]
             
@@ -428,8 +472,26 @@ class CalibrationScreen(QWidget):
             self.cal_films_combo.addItem("(No directories found)")
             self.exp_films_combo.addItem("(No directories found)")
     
+    def _selected_comparison_curves(self):
+        """Checked comparison curves, without the curve used for the outputs"""
+        return [self.compare_cal_list.item(row).text() for row in range(self.compare_cal_list.count())
+                if self.compare_cal_list.item(row).checkState() == Qt.CheckState.Checked
+                and self.compare_cal_list.item(row).flags() & Qt.ItemFlag.ItemIsEnabled]
+
+    def _update_comparison_list(self):
+        """Disable the curve used for the outputs in the comparison list"""
+        primary = "" if self.create_new_cal_cb.isChecked() else self.cal_curve_combo.currentText()
+        for row in range(self.compare_cal_list.count()):
+            item = self.compare_cal_list.item(row)
+            if item.text() == primary:
+                item.setCheckState(Qt.CheckState.Unchecked)
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEnabled)
+            else:
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEnabled)
+
     def _on_calibration_selection_changed(self, text):
         """Handle calibration curve selection change"""
+        self._update_comparison_list()
         if not text or text.startswith("("):
             self.cal_image_label.clear()
             self.cal_image_label.setText("No calibration curve selected")
@@ -474,6 +536,7 @@ class CalibrationScreen(QWidget):
         self.polynomial_degree_combo.setEnabled(checked)
         self.validate_cal_cb.setEnabled(checked)
         self.cal_curve_combo.setEnabled(not checked)
+        self._update_comparison_list()
         
         if checked:
             self.cal_image_label.setText("New calibration will be created")
@@ -593,7 +656,11 @@ class CalibrationScreen(QWidget):
             "validate_calibration": self.validate_cal_cb.isChecked() and not use_existing,
             "polynomial_degree": int(self.polynomial_degree_combo.currentText()),
             "lead_mask_type": self.lead_mask_combo.currentText(),
-            "rect_height_mm": float(self.rect_height_input.text().strip()) if self.lead_mask_combo.currentText() == "rectangle" else 0
+            "rect_height_mm": float(self.rect_height_input.text().strip()) if self.lead_mask_combo.currentText() == "rectangle" else 0,
+            "write_dose_cube": self.dose_cube_cb.isChecked(),
+            "single_precision": self.single_precision_cb.isChecked(),
+            "compare_cals": self._selected_comparison_curves(),
+            "profile_run": self.profile_run_cb.isChecked()
         }
 
         # Save and start processing
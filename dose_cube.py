@@ -0,0 +1,66 @@
+import os
+import json
+import numpy as np
+
+CUBE_FILE = 'dose_cube.f32'
+INDEX_FILE = 'dose_cube.json'
+
+
+def has_dose_cube(calibrated_dir):
+    """True if the calibration wrote a dose cube into this directory"""
+    return (os.path.exists(os.path.join(calibrated_dir, CUBE_FILE)) and
+            os.path.exists(os.path.join(calibrated_dir, INDEX_FILE)))
+
+
+class DoseCube:
+    """Calibrated dose maps of one experiment, memory-mapped from dose_cube.f32.
+
+    processExperimentalFilms.m writes every film as height x width little-endian float32
+    values in column-major order, one after the other; dose_cube.json lists the film names
+    and charges in the same order. Only the pages of the films actually read are loaded.
+    """
+
+    def __init__(self, calibrated_dir):
+        with open(os.path.join(calibrated_dir, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+
+        # jsonencode writes single-element arrays as scalars
+        names = index['names']
+        self.names = [names] if isinstance(names, str) else list(names)
+        self.charges = np.atleast_1d(np.asarray(index['charges'], dtype=float))
+        self.height = int(index['height'])
+        self.width = int(index['width'])
+
+        cube_path = os.path.join(calibrated_dir, CUBE_FILE)
+        expected = len(self.names) * self.height * self.width * 4
+        if os.path.getsize(cube_path) != expected:
+            raise ValueError(f"{cube_path} does not match its index ({os.path.getsize(cube_path)} bytes, expected {expected})")
+
+        # Stored column-major per film, so map as (film, column, row) and swap the axes
+        raw = np.memmap(cube_path, dtype='<f4', mode='r', shape=(len(self.names), self.width, self.height))
+        self.doses = raw.transpose(0, 2, 1)
+
+    def __len__(self):
+        return len(self.names)
+
+    def film(self, key):
+        """Dose map in Gy (height x width view) by index or film name ('C001' or 'C001.dat')"""
+        if isinstance(key, str):
+            name = key if key.endswith('.dat') else key + '.dat'
+            key = self.names.index(name)
+        return self.doses[key]
+
+    def film_statistics(self, chunk_size=16):
+        """Mean and max dose of every film, reading chunk_size films at a time"""
+        means = np.empty(len(self))
+        maxima = np.empty(len(self))
+        for start in range(0, len(self), chunk_size):
+            block = np.asarray(self.doses[start:start + chunk_size], dtype=np.float64)
+            means[start:start + len(block)] = block.mean(axis=(1, 2))
+            maxima[start:start + len(block)] = block.max(axis=(1, 2))
+        return means, maxima
+
+
+def open_dose_cube(calibrated_dir):
+    """Open the dose cube of a calibrated directory"""
+    return DoseCube(calibrated_dir)
@@ -0,0 +1,73 @@
+import math
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QPixmap, QFont
+
+LABEL_HEIGHT = 14
+GAP = 4
+
+
+class FilmMontageView(QWidget):
+    """Montage of the film tiles written by processExperimentalFilms, filled in as films are processed.
+
+    Tiles are laid out in the grid that best fits the widget, so the montage stays readable
+    from the first film to the last without re-rendering anything but the scaled tiles.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tiles = []
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumHeight(150)
+
+    def add_tile(self, tile_path, label):
+        """Append a film tile; unreadable tiles are skipped"""
+        pixmap = QPixmap(tile_path)
+        if pixmap.isNull():
+            return
+        self.tiles.append((pixmap, label))
+        self.update()
+
+    def clear(self):
+        self.tiles = []
+        self.update()
+
+    def _grid(self):
+        """Columns and cell size that fit all tiles into the widget"""
+        n = len(self.tiles)
+        tile = self.tiles[0][0]
+        aspect = tile.width() / max(1, tile.height())
+        best = (1, 0.0, 0.0)
+        for cols in range(1, n + 1):
+            rows = math.ceil(n / cols)
+            cell_w = self.width() / cols
+            cell_h = self.height() / rows
+            # Largest tile that fits the cell next to its label
+            tile_h = min(cell_h - LABEL_HEIGHT - GAP, (cell_w - GAP) / aspect)
+            if tile_h > best[2]:
+                best = (cols, cell_w, tile_h)
+        cols, cell_w, tile_h = best
+        return cols, cell_w, max(tile_h, 1.0), aspect
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if not self.tiles:
+            painter.setPen(self.palette().placeholderText().color())
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Processed films will be displayed here")
+            return
+
+        cols, cell_w, tile_h, aspect = self._grid()
+        tile_w = tile_h * aspect
+        cell_h = tile_h + LABEL_HEIGHT + GAP
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        font = QFont(painter.font())
+        font.setPixelSize(max(7, min(11, int(tile_w / 9))))
+        painter.setFont(font)
+
+        for i, (pixmap, label) in enumerate(self.tiles):
+            row, col = divmod(i, cols)
+            x = col * cell_w + (cell_w - tile_w) / 2
+            y = row * cell_h
+            painter.drawPixmap(QRectF(x, y, tile_w, tile_h), pixmap, QRectF(pixmap.rect()))
+            painter.drawText(QRectF(col * cell_w, y + tile_h, cell_w, LABEL_HEIGHT),
+                             Qt.AlignmentFlag.AlignCenter, label)
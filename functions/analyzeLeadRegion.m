@@ -21,47 +21,51 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
         end
     end
 
-    % Store lead masks and boundaries
-    lead_masks = cell(length(lead_indices), 1);
-    lead_boundaries = cell(length(lead_indices), 1);
-    lead_roi_coords = cell(length(lead_indices), 1);
-
-    % Process each lead film
-    for i = 1:length(lead_indices)
-        lead_idx = lead_indices(i);
-        lead_name = filenames{lead_idx};
-
-        % Load and crop image
-        I_lead_full = imread([exp_dir, lead_name]);
-        film_edges = [10, size(I_lead_full, 1)-10, 10, size(I_lead_full, 2)-10];
-        I_lead = I_lead_full(film_edges(1):film_edges(2), film_edges(3):film_edges(4), :);
-
-        Ig = double(I_lead(:, :, 2));
-        [h, w] = size(Ig);
-        cx = round(w / 2);
-        cy = round(h / 2);
+    % Create filenames
+    exp_name = exp_dir(1:end-1);
+    if ~isempty(strfind(exp_name, '/'))
+        exp_name = exp_name(find(exp_name == '/', 1, 'last')+1:end);
+    end
 
-        % Extract central region for mask computation
-        roi_size = round(min(500, min(h, w) / 5.1));
-        y1 = cy - floor(roi_size / 2);
-        y2 = cy + floor(roi_size / 2);
-        x1 = cx - floor(roi_size / 2);
-        x2 = cx + floor(roi_size / 2);
-        sub = Ig(y1:y2, x1:x2);
-        subn = (sub - min(sub(:))) / (max(sub(:)) - min(sub(:)));
-        subn = imgaussfilt(subn, 1.2);
-        thresh = graythresh(subn);
-        mask = subn > thresh;
-        mask = bwareaopen(mask, 40);
-        mask = imfill(mask, 'holes');
-        mask(round(end*0.65):end, :) = 0;
-
-        % Extract largest object as lead region
-        CC = bwconncomp(mask);
-        areas = cellfun(@numel, CC.PixelIdxList);
-        [~, iMax] = max(areas);
-        mask_clean = false(size(mask));
-        mask_clean(CC.PixelIdxList{iMax}) = true;
+    lead_str = '';
+    for i = 1:length(lead_films)
+        if i == 1
+            lead_str = num2str(lead_films(i));
+        else
+            lead_str = [lead_str, '_', num2str(lead_films(i))];
+        end
+    end
+
+    % Create output directory
+    roilead_dir = '!ROIlead/';
+    cache_dir = [roilead_dir, 'cache/'];
+    if ~exist(cache_dir, 'dir')
+        mkdir(cache_dir);
+    end
+
+    % Segment the lead films concurrently. Results are cached per film, so changing
+    % the mask type or rectangle height only redoes the rectangle step below
+    n_lead = length(lead_indices);
+    lead_paths = cellfun(@(f) [exp_dir, f], lead_film_names, 'UniformOutput', false);
+    cache_files = cellfun(@(f) [cache_dir, exp_name, '_', f(1:end-4), '.mat'], ...
+                          lead_film_names, 'UniformOutput', false);
+
+    t0 = traceSpan();
+    n_workers = min(parallelWorkerCount(), n_lead);
+    if n_workers > 1
+        segments = parcellfun(n_workers, @segmentLeadFilm, lead_paths, cache_files, ...
+                              'UniformOutput', false, 'VerboseLevel', 0);
+    else
+        segments = cellfun(@segmentLeadFilm, lead_paths, cache_files, 'UniformOutput', false);
+    end
+    traceSpan('lead_segmentation', t0, 'compute');
+
+    % Store lead masks (over the segmentation window) and boundaries
+    lead_masks = cell(n_lead, 1);
+    lead_boundaries = cell(n_lead, 1);
+
+    for i = 1:n_lead
+        mask_clean = segments{i}.mask;
 
         if strcmp(lead_mask_type, 'rectangle')
             % Compute rectangle mask
@@ -69,7 +73,7 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
             bottom_y = max(yy);
 
             % Convert height from mm to pixels
-            dpi = 300;
+            dpi = segmentDpi(segments{i});
             rect_height_px = round(rect_height_mm * dpi / 25.4);
 
             % Define rectangle boundaries
@@ -82,67 +86,35 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
             mask_clean = rect_mask;
         end
 
-        % Convert to full-size mask
-        full_mask = false(h, w);
-        full_mask(y1:y2, x1:x2) = mask_clean;
-
-        % Store mask and boundary
-        lead_masks{i} = full_mask;
+        lead_masks{i} = mask_clean;
         B = bwboundaries(mask_clean);
         lead_boundaries{i} = B{1};
-        lead_roi_coords{i} = struct('y1', y1, 'y2', y2, 'x1', x1, 'x2', x2);
-    end
-
-    % Create filenames
-    exp_name = exp_dir(1:end-1);
-    if ~isempty(strfind(exp_name, '/'))
-        exp_name = exp_name(find(exp_name == '/', 1, 'last')+1:end);
-    end
-
-    lead_str = '';
-    for i = 1:length(lead_films)
-        if i == 1
-            lead_str = num2str(lead_films(i));
-        else
-            lead_str = [lead_str, '_', num2str(lead_films(i))];
-        end
-    end
-
-    % Create output directory
-    roilead_dir = '!ROIlead/';
-    if ~exist(roilead_dir, 'dir')
-        mkdir(roilead_dir);
     end
 
     % Save lead region data
     mat_filename = [roilead_dir, sprintf('ROIlead_%s_from_%s.mat', lead_str, exp_name)];
     lead_data = struct();
-    for i = 1:length(lead_indices)
+    for i = 1:n_lead
         film_num = lead_films(i);
         field_name = sprintf('film_%d', film_num);
-        [mask_rows, mask_cols] = find(lead_masks{i});
-        lead_data.(field_name) = struct(...
-            'film_number', film_num, ...
-            'mask_pixel_coords', [mask_rows, mask_cols], ...
-            'full_mask', lead_masks{i}, ...
-            'roi_coords', lead_roi_coords{i});
+        lead_data.(field_name) = encodeLeadMask(lead_masks{i}, film_num, ...
+                                                segments{i}.roi_coords, segments{i}.film_size);
     end
+    t0 = traceSpan();
     save('-v7', mat_filename, 'lead_data');
-    printf("Lead region data saved to: %s\n", mat_filename);
+    traceSpan('save', t0, 'io');
+    mat_info = dir(mat_filename);
+    printf("Lead region data saved to: %s (%.1f KB)\n", mat_filename, mat_info.bytes / 1024);
 
-    % Setup visualization parameters
-    dpi = 300;
+    % Setup visualization parameters (the circle radius is converted per film resolution)
     r_mm = 2;
-    r_px = round(r_mm * dpi / 25.4);
     p = linspace(0, 2*pi, 300);
-    cross_len = round(0.8 * r_px);
 
     % Create figure
     hfig = figure(12, 'Position', [10 10 1832 1022], 'Visible', 'off');
     clim = [0 25];
 
     % Calculate grid layout
-    n_lead = length(lead_indices);
     if n_lead <= 5
         ncols = ceil(n_lead); nrows = 1;
     else
@@ -155,32 +127,45 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
 
     % Process lead films for display
     for i = 1:n_lead
-        lead_idx = lead_indices(i);
-        fname = filenames{lead_idx};
-
-        % Read and crop image
-        I_full = imread([exp_dir, fname]);
-        film_edges = [10, size(I_full, 1)-10, 10, size(I_full, 2)-10];
-        I = I_full(film_edges(1):film_edges(2), film_edges(3):film_edges(4), :);
-
-        Ig = double(I(:, :, 2));
-        Id = polyval(coeff1, Ig);
-        [h, w] = size(Ig);
+        fname = lead_film_names{i};
+        segment = segments{i};
+        roi_coords = segment.roi_coords;
+        h = segment.film_size(1);
+        w = segment.film_size(2);
         cx = round(w / 2);
         cy = round(h / 2);
-
-        % Create coordinate grid
-        [X, Y] = meshgrid(1:w, 1:h);
-        circle_mask = (X - cx).^2 + (Y - cy).^2 <= r_px^2;
+        r_px = round(r_mm * segmentDpi(segment) / 25.4);
+        cross_len = round(0.8 * r_px);
         circ_x = cx + r_px * cos(p);
         circ_y = cy + r_px * sin(p);
 
-        % Calculate dose statistics
+        % Calculate dose statistics inside the mask and the circle only. The circle's
+        % bounding box (clipped to the film) is taken from the segmentation window, or
+        % read from the film when the window of a small film does not contain it
+        t0 = traceSpan();
         full_mask = lead_masks{i};
-        d_roi = mean(Id(full_mask));
-        s_roi = std(Id(full_mask));
-        d_ctr = mean(Id(circle_mask));
-        s_ctr = std(Id(circle_mask));
+        roi_dose = polyval(coeff1, double(segment.window(full_mask)));
+        circle_rows = max(1, cy - r_px):min(h, cy + r_px);
+        circle_cols = max(1, cx - r_px):min(w, cx + r_px);
+        if circle_rows(1) >= roi_coords.y1 && circle_rows(end) <= roi_coords.y2 && ...
+           circle_cols(1) >= roi_coords.x1 && circle_cols(end) <= roi_coords.x2
+            circle_window = double(segment.window(circle_rows - roi_coords.y1 + 1, ...
+                                                  circle_cols - roi_coords.x1 + 1));
+        else
+            circle_window = readTiffWindow(lead_paths{i}, circle_rows + 9, circle_cols + 9, 2);
+        end
+        [X, Y] = meshgrid(circle_cols - cx, circle_rows - cy);
+        circle_mask = X.^2 + Y.^2 <= r_px^2;
+        ctr_dose = polyval(coeff1, circle_window(circle_mask));
+
+        % Dose map for display, at the thumbnail resolution
+        Id = polyval(coeff1, double(segment.thumbnail));
+        traceSpan('polyval', t0, 'compute');
+
+        d_roi = mean(roi_dose);
+        s_roi = std(roi_dose);
+        d_ctr = mean(ctr_dose);
+        s_ctr = std(ctr_dose);
 
         % Calculate subplot position
         row = ceil(i / ncols);
@@ -190,14 +175,14 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
         pos_x = marg_w(1) + (col-1) * (subplot_width + gap(2));
         pos_y = 1 - marg_h(2) - row * subplot_height - (row-1) * gap(1);
 
-        % Create subplot
+        % Create subplot (thumbnail placed in full-resolution pixel coordinates)
         ax = subplot('Position', [pos_x, pos_y, subplot_width, subplot_height]);
-        imagesc(Id, [0 25]);
+        step = segment.thumbnail_step;
+        imagesc([1, 1 + (size(Id, 2) - 1) * step], [1, 1 + (size(Id, 1) - 1) * step], Id, [0 25]);
         axis off; axis equal; hold on;
 
         % Draw overlays
         b = lead_boundaries{i};
-        roi_coords = lead_roi_coords{i};
         plot(b(:,2) + roi_coords.x1 - 1, b(:,1) + roi_coords.y1 - 1, 'r-', 'LineWidth', 1.2);
         plot(circ_x, circ_y, 'k--', 'LineWidth', 1);
         plot([cx - cross_len, cx + cross_len], [cy, cy], 'k-', 'LineWidth', 1);
@@ -219,7 +204,97 @@ function analyzeLeadRegion(exp_dir, coeff1, lead_films, lead_mask_type, rect_hei
 
     % Save visualization
     png_filename = [roilead_dir, sprintf('ROIlead_%s_from_%s.png', lead_str, exp_name)];
+    t0 = traceSpan();
     print(hfig, '-dpng', '-r150', png_filename);
+    traceSpan('saveas', t0, 'io');
     close(hfig);
     printf("Lead region visualization saved to: %s\n", png_filename);
 end
+
+function segment = segmentLeadFilm(file_path, cache_file)
+    % Segment the lead region of one film, reusing the cached result while the film is unchanged
+    % Returns the largest-object mask over the central window (before any rectangle step), the
+    % window position, its green channel for the dose statistics and a display thumbnail
+
+    file_info = dir(file_path);
+    film_key = sprintf('%d@%.10f', file_info(1).bytes, file_info(1).datenum);
+    if exist(cache_file, 'file')
+        cached = load(cache_file);
+        if isfield(cached, 'film_key') && strcmp(cached.film_key, film_key)
+            segment = cached.segment;
+            return;
+        end
+    end
+
+    % Film size after cropping 10 pixels off every edge; only the central window is read
+    % at full resolution, so memory does not grow with the scan resolution
+    info = imfinfo(file_path);
+    h = info(1).Height - 19;
+    w = info(1).Width - 19;
+    dpi = 300;
+    if strcmpi(info(1).ResolutionUnit, 'Inch') && info(1).XResolution > 0
+        dpi = info(1).XResolution;
+    end
+    cx = round(w / 2);
+    cy = round(h / 2);
+
+    % Extract central region for mask computation
+    roi_size = round(min(500, min(h, w) / 5.1));
+    y1 = cy - floor(roi_size / 2);
+    y2 = cy + floor(roi_size / 2);
+    x1 = cx - floor(roi_size / 2);
+    x2 = cx + floor(roi_size / 2);
+    t0 = traceSpan();
+    window = readTiffWindow(file_path, (y1:y2) + 9, (x1:x2) + 9, 2);
+    traceSpan('imread', t0, 'io');
+    sub = window;
+    subn = (sub - min(sub(:))) / (max(sub(:)) - min(sub(:)));
+    subn = imgaussfilt(subn, 1.2);
+    thresh = graythresh(subn);
+    mask = subn > thresh;
+    mask = bwareaopen(mask, 40);
+    mask = imfill(mask, 'holes');
+    mask(round(end*0.65):end, :) = 0;
+
+    % Extract largest object as lead region
+    CC = bwconncomp(mask);
+    areas = cellfun(@numel, CC.PixelIdxList);
+    [~, iMax] = max(areas);
+    mask_clean = false(size(mask));
+    mask_clean(CC.PixelIdxList{iMax}) = true;
+
+    % About 1000 pixels across is plenty for the overview figure; it is read in strips
+    % of rows, keeping every thumbnail_step-th row and column
+    thumbnail_step = max(1, floor(min(h, w) / 1000));
+    thumbnail_rows = 1:thumbnail_step:h;
+    thumbnail = zeros(numel(thumbnail_rows), numel(1:thumbnail_step:w));
+    strip_rows = max(thumbnail_step, floor(32 * 2^20 / (8 * w)));
+    t0 = traceSpan();
+    for r0 = 1:strip_rows:h
+        rows = thumbnail_rows(thumbnail_rows >= r0 & thumbnail_rows < r0 + strip_rows);
+        if ~isempty(rows)
+            strip = readTiffWindow(file_path, (rows(1):rows(end)) + 9, 10:info(1).Width - 10, 2);
+            thumbnail((rows - 1) / thumbnail_step + 1, :) = strip(rows - rows(1) + 1, 1:thumbnail_step:end);
+        end
+    end
+    traceSpan('thumbnail', t0, 'io');
+
+    segment = struct(...
+        'mask', mask_clean, ...
+        'roi_coords', struct('y1', y1, 'y2', y2, 'x1', x1, 'x2', x2), ...
+        'film_size', [h, w], ...
+        'window', window, ...
+        'thumbnail', thumbnail, ...
+        'thumbnail_step', thumbnail_step, ...
+        'dpi', dpi);
+    save('-binary', cache_file, 'segment', 'film_key');
+end
+
+function dpi = segmentDpi(segment)
+    % Scan resolution of a segmented film (segments cached before it was stored are 300 dpi)
+
+    dpi = 300;
+    if isfield(segment, 'dpi')
+        dpi = segment.dpi;
+    end
+end
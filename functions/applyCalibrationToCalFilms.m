@@ -12,16 +12,23 @@ function [Dose, Dose_std] = applyCalibrationToCalFilms(cal_dir, liste, nb_files,
     Dose_non_Gy = zeros(1, nb_files);
     Dose_non_Gy_std = zeros(1, nb_files);
 
-    % Create figure if needed
-    if create_plots
-        hfig = figure('Position', [10 10 1832 1022], 'Visible', 'off');
+    cal_name = cal_dir(1:end-1);
+    if ~isempty(strfind(cal_name, '/'))
+        cal_name = cal_name(find(cal_name == '/', 1, 'last')+1:end);
     end
 
-    % Initialize 3D array for calibrated images
-    if nb_files > 0
-        temp_img = imread([cal_dir, liste(1).name]);
-        temp_img = temp_img(film_edges(1):film_edges(2), film_edges(3):film_edges(4), :);
-        Image_Gy = zeros(size(temp_img, 1), size(temp_img, 2), nb_files);
+    % Each film is rendered as a small tile as soon as it is processed; the montage is
+    % assembled from the tiles at the end
+    tile_files = cell(1, nb_files);
+    tile_labels = cell(1, nb_files);
+    if create_plots
+        tile_dir = ['!Processed/tiles/check_', cal_name, '/'];
+        if ~exist(tile_dir, 'dir')
+            mkdir(tile_dir);
+        elseif ~isempty(dir([tile_dir, '*.png']))
+            delete([tile_dir, '*.png']);
+        end
+        tile_px = min(256, max(64, floor(4800 / ceil(nb_files / 4))));
     end
 
     % Process each calibration film
@@ -29,48 +36,41 @@ function [Dose, Dose_std] = applyCalibrationToCalFilms(cal_dir, liste, nb_files,
         fprintf('\rProcessing calibration film %d of %d', i, nb_files);
 
         % Read and crop image
+        t0 = traceSpan();
         Image = imread([cal_dir, liste(i).name]);
+        traceSpan('imread', t0, 'io');
         Image = Image(film_edges(1):film_edges(2), film_edges(3):film_edges(4), :);
         Image_green = double(Image(:, :, 2));
 
         % Apply calibration
-        Image_Gy(:, :, i) = polyval(coeff1, Image_green);
+        t0 = traceSpan();
+        Image_Gy = polyval(coeff1, Image_green);
+        traceSpan('polyval', t0, 'compute');
 
         % Extract ROI and calculate statistics
         Image_green_cut = Image_green(roi_rows, roi_cols);
-        Image_sample = Image_Gy(roi_rows, roi_cols, i);
+        Image_sample = Image_Gy(roi_rows, roi_cols);
 
         Dose(i) = mean(Image_sample(:));
         Dose_std(i) = std(Image_sample(:));
         Dose_non_Gy(i) = mean(Image_green_cut(:));
         Dose_non_Gy_std(i) = std(Image_green_cut(:));
 
-        % Create subplot if needed
+        % Render the film tile
         if create_plots
-            subplot(4, ceil(nb_files/4), i);
-            imagesc(Image_Gy(:, :, i), [0 25]);
-            axis off; axis equal; hold on;
-
-            % Draw ROI rectangle
-            plot([window_meas(2, 1), window_meas(2, 2), window_meas(2, 2), window_meas(2, 1), window_meas(2, 1)], ...
-                 [window_meas(1, 1), window_meas(1, 1), window_meas(1, 2), window_meas(1, 2), window_meas(1, 1)], 'r-');
-
-            xlabel({['Del.dose: ', num2str(Dose_Name_Gy(i), '%.3f'), 'Gy'], ...
-                ['\Delta = ', num2str(abs(Dose(i) - Dose_Name_Gy(i)), '%.3f'), 'Gy']}, ...
-                'FontSize', 10, 'FontWeight', 'bold');
+            tile_files{i} = sprintf('%s%03d.png', tile_dir, i);
+            tile_labels{i} = {['Del.dose: ', num2str(Dose_Name_Gy(i), '%.3f'), 'Gy'], ...
+                              ['\Delta = ', num2str(abs(Dose(i) - Dose_Name_Gy(i)), '%.3f'), 'Gy']};
+            t0 = traceSpan();
+            writeFilmTile(Image_Gy, [0 25], window_meas, tile_files{i}, tile_px);
+            traceSpan('tile', t0, 'compute');
         end
     end
 
     % Save plot if needed
     if create_plots && save_plots
-        cal_name = cal_dir(1:end-1);
-        if ~isempty(strfind(cal_name, '/'))
-            cal_name = cal_name(find(cal_name == '/', 1, 'last')+1:end);
-        end
-
         validation_filename = ['check_', cal_name, '.png'];
         fprintf('\nSaving results to: %s\n', validation_filename);
-        print(hfig, '-dpng', '-r150', validation_filename);
-        close(hfig);
+        composeFilmMontage(tile_files, tile_labels, validation_filename, 150, 'tex');
     end
 end
@@ -0,0 +1,51 @@
+function composeFilmMontage(tile_files, labels, output_file, resolution, interpreter)
+    % Assemble film tiles (from writeFilmTile) into one labelled montage image
+    % Tiles fill a 4-row grid in film order, as the former subplot(4, ceil(n/4), i) layout.
+    % The figure holds a single image plus one text label per film, so printing it is
+    % cheap regardless of the number of films.
+
+    n = numel(tile_files);
+    if n == 0
+        return;
+    end
+
+    tiles = cellfun(@imread, tile_files, 'UniformOutput', false);
+    tile_h = max(cellfun(@(t) size(t, 1), tiles));
+    tile_w = max(cellfun(@(t) size(t, 2), tiles));
+
+    n_rows = min(4, n);
+    n_cols = ceil(n / 4);
+    gap = max(2, round(tile_w / 20));
+    label_h = round(0.3 * tile_h);
+    cell_h = tile_h + label_h;
+    cell_w = tile_w + gap;
+
+    montage = 255 * ones(n_rows * cell_h, n_cols * cell_w, 3, 'uint8');
+    for i = 1:n
+        row = ceil(i / n_cols);
+        col = mod(i - 1, n_cols) + 1;
+        [h, w, ~] = size(tiles{i});
+        y0 = (row - 1) * cell_h;
+        x0 = (col - 1) * cell_w + floor(gap / 2);
+        montage(y0 + (1:h), x0 + (1:w), :) = tiles{i};
+    end
+
+    hfig = figure('Position', [10 10 1832 1022], 'Visible', 'off');
+    axes('Position', [0.01 0.01 0.98 0.98]);
+    image(montage);
+    axis image off;
+
+    font_size = max(5, min(10, floor(100 / n_cols)));
+    for i = 1:n
+        row = ceil(i / n_cols);
+        col = mod(i - 1, n_cols) + 1;
+        text((col - 1) * cell_w + cell_w / 2, (row - 1) * cell_h + tile_h + 2, labels{i}, ...
+             'HorizontalAlignment', 'center', 'VerticalAlignment', 'top', ...
+             'FontSize', font_size, 'FontWeight', 'bold', 'Interpreter', interpreter);
+    end
+
+    t0 = traceSpan();
+    print(hfig, '-dpng', sprintf('-r%d', resolution), output_file);
+    traceSpan('saveas', t0, 'io');
+    close(hfig);
+end
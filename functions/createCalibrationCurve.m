@@ -61,33 +61,40 @@ function [calibration_dir, coeff1, Dose_non_Gy, Dose_non_Gy_std, Dose_calAll, li
     Dose_non_Gy = zeros(1, nb_files);
     Dose_non_Gy_std = zeros(1, nb_files);
 
-    % Define ROI and crop parameters
-    roi_rows = window_meas(1,1):window_meas(1,2);
-    roi_cols = window_meas(2,1):window_meas(2,2);
+    % Define ROI and crop parameters; the ROI is given within the cropped film
     film_edges = [10 460 10 400];
+    roi_rows = (window_meas(1,1):window_meas(1,2)) + film_edges(1) - 1;
+    roi_cols = (window_meas(2,1):window_meas(2,2)) + film_edges(3) - 1;
 
     % Process each calibration film
     for i = 1:nb_files
-        % Read and process image
-        Image = imread([cal_dir, liste(i).name]);
-        Image_green = double(Image(film_edges(1):film_edges(2), film_edges(3):film_edges(4), 2));
+        % Read only the green channel of the measurement window
+        t0 = traceSpan();
+        roi_window = readTiffWindow([cal_dir, liste(i).name], roi_rows, roi_cols, 2);
+        traceSpan('read_window', t0, 'io');
 
         % Calculate ROI statistics
-        roi_vec = Image_green(roi_rows, roi_cols)(:);
+        t0 = traceSpan();
+        roi_vec = roi_window(:);
         Dose_non_Gy(i) = mean(roi_vec);
         Dose_non_Gy_std(i) = std(roi_vec);
+        traceSpan('stats', t0, 'compute');
     end
 
     % Create polynomial calibration curve
     warning('off', 'Octave:singular-matrix');
     warning('off', 'Octave:nearly-singular-matrix');
+    t0 = traceSpan();
     coeff1 = polyfit(Dose_non_Gy, Dose_Name_Gy, polynomial_degree);
+    traceSpan('polyfit', t0, 'compute');
     warning('on', 'Octave:singular-matrix');
     warning('on', 'Octave:nearly-singular-matrix');
 
     % Save calibration data
     if save_plots
+        t0 = traceSpan();
         save(calibration_data_file, 'coeff1', 'Dose_non_Gy', 'Dose_non_Gy_std', 'Dose_calAll', '-v7');
+        traceSpan('save', t0, 'io');
     end
 
     % Generate calibration plot
@@ -119,7 +126,9 @@ function [calibration_dir, coeff1, Dose_non_Gy, Dose_non_Gy_std, Dose_calAll, li
 
         % Save plot
         if save_plots
+            t0 = traceSpan();
             print(hfig, '-dpng', '-r300', calibration_plot_file);
+            traceSpan('saveas', t0, 'io');
             fprintf('Calibration curve is saved to %s\n', calibration_plot_file);
         end
     end
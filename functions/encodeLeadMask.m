@@ -0,0 +1,32 @@
+function entry = encodeLeadMask(mask, film_number, roi_coords, mask_size)
+    % Compact storage of a lead mask: bounding box plus run-length encoded box bitmap
+    % mask is the segmentation window placed at roi_coords in a film of size mask_size.
+    % mask_bbox = [r1 r2 c1 c2] in film pixels; mask_runs holds (start; length) pairs
+    % over the column-major box pixels. Decoded by lead_mask_coords in the analysis.
+
+    [rr, cc] = find(mask);
+    if isempty(rr)
+        bbox = [0 0 0 0];
+        runs = zeros(2, 0, 'uint32');
+    else
+        r1 = min(rr);
+        r2 = max(rr);
+        c1 = min(cc);
+        c2 = max(cc);
+        box = mask(r1:r2, c1:c2);
+        edges = diff([false; box(:); false]);
+        starts = find(edges == 1);
+        lengths = find(edges == -1) - starts;
+        runs = uint32([starts'; lengths']);
+        bbox = [r1 + roi_coords.y1 - 1, r2 + roi_coords.y1 - 1, ...
+                c1 + roi_coords.x1 - 1, c2 + roi_coords.x1 - 1];
+    end
+
+    entry = struct(...
+        'film_number', film_number, ...
+        'roi_coords', roi_coords, ...
+        'mask_size', mask_size, ...
+        'mask_bbox', bbox, ...
+        'mask_runs', runs, ...
+        'pixel_count', numel(rr));
+end
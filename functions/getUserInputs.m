@@ -1,4 +1,4 @@
-function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir, chargeAll, lead_films, validate_calibration, polynomial_degree, lead_mask_type, rect_height_mm] = getUserInputs()
+function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir, chargeAll, lead_films, validate_calibration, polynomial_degree, lead_mask_type, rect_height_mm, write_dose_cube, precision, compare_cals] = getUserInputs()
 
     pkg load io;
 
@@ -30,6 +30,21 @@ function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir
         else
             rect_height_mm = 0;
         end
+        if isfield(user_data, 'write_dose_cube')
+            write_dose_cube = logical(user_data.write_dose_cube);
+        else
+            write_dose_cube = false;
+        end
+        if isfield(user_data, 'single_precision') && user_data.single_precision
+            precision = 'single';
+        else
+            precision = 'double';
+        end
+        compare_cals = {};
+        if isfield(user_data, 'compare_cals') && ~isempty(user_data.compare_cals)
+            compare_cals = cellstr(user_data.compare_cals);
+            compare_cals = compare_cals(:)';
+        end
 
         % Display loaded settings
         disp('Loaded settings:');
@@ -47,6 +62,11 @@ function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir
         if strcmp(lead_mask_type, 'rectangle')
             disp(['  Rectangle height: ', num2str(rect_height_mm), ' mm']);
         end
+        disp(['  Write dose cube: ', num2str(write_dose_cube)]);
+        disp(['  Dose map precision: ', precision]);
+        if ~isempty(compare_cals)
+            disp(['  Comparison curves: ', strjoin(compare_cals, ', ')]);
+        end
 
         return;
     end
@@ -74,6 +94,7 @@ function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir
     selected_mat = '';
     validate_calibration = false;
     polynomial_degree = 8;
+    compare_cals = {};
 
     % Prompt for calibration choice
     if ~isempty(valid_calibrations)
@@ -90,6 +111,13 @@ function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir
             selected_mat = ['data_', selected_cal(1:end-4), '.mat'];
             cal_dir = '';
         end
+
+        % Further curves applied to the same films for comparison
+        compare_input = input('Also evaluate calibration numbers (comma-separated, empty for none): ', 's');
+        compare_choice = str2num(['[' compare_input ']']);
+        compare_choice = unique(compare_choice(compare_choice >= 1 & compare_choice <= length(valid_calibrations)));
+        compare_cals = valid_calibrations(compare_choice);
+        compare_cals = compare_cals(~strcmp(compare_cals, selected_cal));
     end
 
     % Get new calibration parameters if needed
@@ -162,4 +190,14 @@ function [use_existing_calibration, selected_cal, selected_mat, cal_dir, exp_dir
         lead_mask_type = 'full';
         rect_height_mm = 0;
     end
+
+    % Optional memory-mapped dose cube next to the .dat archive
+    write_dose_cube = strcmpi(strtrim(input('Also write a dose cube for fast random access? (y/n): ', 's')), 'y');
+
+    % Dose map precision
+    if strcmpi(strtrim(input('Store dose maps in single precision (float32)? (y/n): ', 's')), 'y')
+        precision = 'single';
+    else
+        precision = 'double';
+    end
 end
@@ -0,0 +1,24 @@
+function n_workers = parallelWorkerCount()
+    % Number of worker processes for parallel film processing (1 if the parallel package is unavailable)
+    % The GUI passes the count that fits the machine's CPUs and memory in FILMDOSIMETRY_WORKERS
+
+    persistent cached_count
+
+    if ~isempty(cached_count)
+        n_workers = cached_count;
+        return;
+    end
+
+    try
+        pkg load parallel;
+        n_workers = max(1, nproc() - 1);
+        planned = str2double(getenv('FILMDOSIMETRY_WORKERS'));
+        if ~isnan(planned)
+            n_workers = max(1, round(planned));
+        end
+    catch
+        n_workers = 1;
+    end
+
+    cached_count = n_workers;
+end
@@ -2,14 +2,27 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
 
     gui_mode = ~isempty(getenv('OCTAVE_GUI_MODE'));
     gui_fid = -1;
+    write_cube = false;
+    precision = 'double';
+    compare_cals = {};
 
-    if nargin == 7
+    if nargin >= 7 && nargin <= 10 && ischar(varargin{4})
         % Using existing calibration
         chargeAll = varargin{1};
         create_plots = varargin{2};
         save_plots = varargin{3};
         selected_cal = varargin{4};
         selected_mat = varargin{5};
+        if nargin >= 8
+            write_cube = varargin{6};
+        end
+        if nargin >= 9
+            precision = varargin{7};
+        end
+        if nargin == 10
+            compare_cals = varargin{8};
+        end
+        primary_label = selected_cal(1:end-4);
 
         calibration_dir = '!CalibrationCurves/';
 
@@ -33,16 +46,39 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
         varargout{3} = Dose_non_Gy_std;
         varargout{4} = Dose_calAll;
 
-    elseif nargin == 6
+    elseif nargin >= 6 && nargin <= 9
         % Using new calibration
         coeff1 = varargin{1};
         chargeAll = varargin{2};
         create_plots = varargin{3};
         save_plots = varargin{4};
+        if nargin >= 7
+            write_cube = varargin{5};
+        end
+        if nargin >= 8
+            precision = varargin{6};
+        end
+        if nargin == 9
+            compare_cals = varargin{7};
+        end
+        primary_label = 'new_calibration';
     else
         error('Invalid number of input arguments');
     end
 
+    % Further calibration curves evaluated on the ROI of the same decoded films
+    if ischar(compare_cals)
+        compare_cals = {compare_cals};
+    end
+    nb_compare = numel(compare_cals);
+    compare_labels = cell(1, nb_compare);
+    compare_coeffs = cell(1, nb_compare);
+    for k = 1:nb_compare
+        compare_labels{k} = regexprep(compare_cals{k}, '\.png$', '');
+        compare_data = load(['!CalibrationCurves/data_', compare_labels{k}, '.mat'], 'coeff1');
+        compare_coeffs{k} = compare_data.coeff1;
+    end
+
     % Setup GUI mode file if needed
     if gui_mode
         tmp_file = 'octave_gui_data.txt';
@@ -70,16 +106,62 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
     Dose_non_Gy = zeros(1, nb_films);
     Dose_non_Gy_std = zeros(1, nb_films);
     dat_files = cell(nb_films, 1);
+    Dose_compare = zeros(nb_compare, nb_films);
+    Dose_compare_std = zeros(nb_compare, nb_films);
+
+    % Dose maps are computed and stored in the selected precision ('single' halves
+    % memory and .dat size; the calibration polynomial itself stays double)
+    if strcmp(precision, 'single')
+        save_format = '-float-binary';
+    else
+        save_format = '-text';
+    end
 
-    % Initialize 3D array for calibrated images
-    if nb_films > 0
-        temp_img = imread([exp_dir, list_films(1).name]);
-        Image_Gy = zeros(size(temp_img, 1), size(temp_img, 2), nb_films);
+    % Films whose whole-image copies (RGB scan, green channel, dose map and polyval
+    % temporaries) would exceed strip_threshold_mb are processed in strips of strip_mb
+    % (processFilmStrips); FILMDOSIMETRY_STRIP_THRESHOLD_MB overrides the threshold
+    strip_threshold_mb = 512;
+    strip_mb = 32;
+    if ~isempty(getenv('FILMDOSIMETRY_STRIP_THRESHOLD_MB'))
+        strip_threshold_mb = str2double(getenv('FILMDOSIMETRY_STRIP_THRESHOLD_MB'));
     end
 
-    % Create figure if needed
+    % Optional dose cube: all calibrated films as one float32 file (films x h x w,
+    % each film column-major) plus a JSON index, for direct reads at computed offsets.
+    % A cube left by an earlier run is removed, as it no longer matches the new films
+    cube_fid = -1;
+    for stale = {'dose_cube.f32', 'dose_cube.json'}
+        if exist([output_dir, stale{1}], 'file')
+            delete([output_dir, stale{1}]);
+        end
+    end
+    if write_cube && nb_films > 0
+        cube_file = [output_dir, 'dose_cube.f32'];
+        cube_fid = fopen(cube_file, 'w', 'ieee-le');
+        if cube_fid == -1
+            warning('Could not create dose cube file %s', cube_file);
+        end
+        cube_size = [];
+        cube_names = cell(1, nb_films);
+    end
+
+    % Film tiles for the montage: each film is rendered as a small tile as soon as it is
+    % processed (and shown by the GUI), the montage is assembled from them at the end
+    exp_name = exp_dir(1:end-1);
+    if ~isempty(strfind(exp_name, '/'))
+        exp_name = exp_name(find(exp_name == '/', 1, 'last')+1:end);
+    end
+    tile_files = cell(1, nb_films);
+    tile_labels = cell(1, nb_films);
+    tile_px = 256;
     if create_plots
-        hfig = figure(11, 'Position', [10 10 1832 1022], 'Visible', 'off');
+        tile_dir = ['!Processed/tiles/', exp_name, '/'];
+        if ~exist(tile_dir, 'dir')
+            mkdir(tile_dir);
+        elseif ~isempty(dir([tile_dir, '*.png']))
+            delete([tile_dir, '*.png']);
+        end
+        tile_px = min(256, max(64, floor(4800 / ceil(nb_films / 4))));
     end
 
     % Process each experimental film
@@ -93,16 +175,13 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
         Dose_Name_Film(i) = str2num(file_name(3:end-4));
         Dose_Name_This = file_name(1:end-4);
 
-        % Read and crop image
-        Image = imread([exp_dir, file_name]);
-        Image_uncut = Image;
-        film_edges = [10, size(Image_uncut, 1)-10, 10, size(Image_uncut, 2)-10];
-        Image = Image(film_edges(1):film_edges(2), film_edges(3):film_edges(4), :);
-        Image_green = double(Image(:, :, 2));
+        % Film size after cropping 10 pixels off every edge
+        film_info = imfinfo([exp_dir, file_name]);
+        film_size = [film_info(1).Height - 19, film_info(1).Width - 19];
 
         % Calculate center and ROI
-        image_height = size(Image, 1);
-        image_width = size(Image, 2);
+        image_height = film_size(1);
+        image_width = film_size(2);
         center_y = round(image_height / 2);
         center_x = round(image_width / 2);
 
@@ -117,43 +196,122 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
         roi_rows = film_window_meas(1,1):film_window_meas(1,2);
         roi_cols = film_window_meas(2,1):film_window_meas(2,2);
 
-        % Apply calibration
-        image_film_Gy = polyval(coeff1, Image_green);
-
-        % Calculate statistics
-        Image_green_cut = Image_green(roi_rows, roi_cols);
-        Image_sample = image_film_Gy(roi_rows, roi_cols);
-
-        Dose(i) = mean(Image_sample(:));
-        Dose_std(i) = std(Image_sample(:));
-        Dose_non_Gy(i) = mean(Image_green_cut(:));
-        Dose_non_Gy_std(i) = std(Image_green_cut(:));
-
-        % Write GUI data if needed
-        if gui_mode && gui_fid ~= -1
-            json_msg = sprintf('[FILM_DATA]{"num":"%s","name":"%s","dose":%.3f,"std":%.3f,"charge":%.2f}', ...
-                file_name(1:end-4), file_name, Dose(i), Dose_std(i), chargeAll(i));
-            fprintf(gui_fid, '%s\n', json_msg);
-            fflush(gui_fid);
+        % The dose cube needs all films in one size
+        if cube_fid ~= -1
+            if isempty(cube_size)
+                cube_size = film_size;
+            end
+            if ~isequal(film_size, cube_size)
+                fprintf('\nFilm %s differs in size from the first film; dose cube not written\n', file_name);
+                fclose(cube_fid);
+                delete(cube_file);
+                cube_fid = -1;
+            end
         end
 
-        % Save calibrated data
         temp_file = [output_dir, Dose_Name_This, '.dat'];
-        save('-text', temp_file, 'charge', 'image_film_Gy');
+        if create_plots
+            tile_files{i} = [tile_dir, Dose_Name_This, '.png'];
+        end
+
+        % Large scans are processed in strips of rows instead of as whole images
+        samples = 1 + 2 * strcmp(film_info(1).ColorType, 'truecolor');
+        element_bytes = 4 + 4 * strcmp(precision, 'double');
+        whole_film_bytes = prod(film_size) * (2 * samples * ceil(film_info(1).BitDepth / 8) + 4 * element_bytes);
+
+        if whole_film_bytes > strip_threshold_mb * 2^20
+            t0 = traceSpan();
+            film = processFilmStrips([exp_dir, file_name], coeff1, precision, film_window_meas, ...
+                                     charge, temp_file, cube_fid, tile_px, strip_mb);
+            traceSpan('strips', t0, 'compute');
+            Dose(i) = film.Dose;
+            Dose_std(i) = film.Dose_std;
+            Dose_non_Gy(i) = film.Dose_non_Gy;
+            Dose_non_Gy_std(i) = film.Dose_non_Gy_std;
+            roi_green = film.roi_green;
+
+            if create_plots
+                t0 = traceSpan();
+                writeFilmTile(film.tile, [0 25], film_window_meas, tile_files{i}, tile_px, film.tile_step);
+                traceSpan('tile', t0, 'compute');
+            end
+        else
+            % Read and crop image
+            t0 = traceSpan();
+            Image = imread([exp_dir, file_name]);
+            traceSpan('imread', t0, 'io');
+            film_edges = [10, size(Image, 1)-10, 10, size(Image, 2)-10];
+            Image_green = cast(Image(film_edges(1):film_edges(2), film_edges(3):film_edges(4), 2), precision);
+            clear Image;
+
+            % Apply calibration
+            t0 = traceSpan();
+            image_film_Gy = polyval(coeff1, Image_green);
+            traceSpan('polyval', t0, 'compute');
+
+            % Calculate statistics (in double: the ROI is small and results stay double)
+            t0 = traceSpan();
+            Image_green_cut = double(Image_green(roi_rows, roi_cols));
+            Image_sample = double(image_film_Gy(roi_rows, roi_cols));
+
+            Dose(i) = mean(Image_sample(:));
+            Dose_std(i) = std(Image_sample(:));
+            Dose_non_Gy(i) = mean(Image_green_cut(:));
+            Dose_non_Gy_std(i) = std(Image_green_cut(:));
+            traceSpan('stats', t0, 'compute');
+            roi_green = Image_green_cut;
+
+            % Render the film tile
+            if create_plots
+                t0 = traceSpan();
+                writeFilmTile(image_film_Gy, [0 25], film_window_meas, tile_files{i}, tile_px);
+                traceSpan('tile', t0, 'compute');
+            end
+
+            % Save calibrated data
+            t0 = traceSpan();
+            save(save_format, temp_file, 'charge', 'image_film_Gy');
+            traceSpan('save', t0, 'io');
+
+            % Append to the dose cube
+            if cube_fid ~= -1
+                t0 = traceSpan();
+                fwrite(cube_fid, image_film_Gy, 'float32');
+                traceSpan('cube_write', t0, 'io');
+            end
+            clear Image_green image_film_Gy;
+        end
         dat_files{i} = temp_file;
 
-        % Create subplot if needed
-        if create_plots
-            subplot(4, ceil(nb_films/4), i);
-            imagesc(image_film_Gy, [0 25]);
-            axis off; axis equal; hold on;
+        % Comparison curves on the ROI pixels already decoded for this film
+        if nb_compare > 0
+            t0 = traceSpan();
+            for k = 1:nb_compare
+                compare_sample = double(polyval(compare_coeffs{k}, cast(roi_green, precision)));
+                Dose_compare(k, i) = mean(compare_sample(:));
+                Dose_compare_std(k, i) = std(compare_sample(:));
+            end
+            traceSpan('compare', t0, 'compute');
+        end
+        clear roi_green;
 
-            % Draw ROI rectangle
-            plot([film_window_meas(2, 1), film_window_meas(2, 2), film_window_meas(2, 2), film_window_meas(2, 1), film_window_meas(2, 1)], ...
-                 [film_window_meas(1, 1), film_window_meas(1, 1), film_window_meas(1, 2), film_window_meas(1, 2), film_window_meas(1, 1)], 'r-');
+        if cube_fid ~= -1
+            cube_names{i} = [Dose_Name_This, '.dat'];
+        end
+        if create_plots
+            tile_labels{i} = [Dose_Name_This, ': ', num2str(Dose(i), '%.3f'), 'Gy'];
+        end
 
-            xlabel([list_films(i).name(1:end-4), ': ', num2str(Dose(i), '%.3f'), 'Gy'], ...
-                'FontSize', 10, 'FontWeight', 'bold', 'Interpreter', 'none');
+        % Write GUI data if needed
+        if gui_mode && gui_fid ~= -1
+            compare_json = ',';
+            if nb_compare > 0
+                compare_json = sprintf('{"dose":%.3f,"std":%.3f},', [Dose_compare(:, i).'; Dose_compare_std(:, i).']);
+            end
+            json_msg = sprintf('[FILM_DATA]{"num":"%s","name":"%s","dose":%.3f,"std":%.3f,"charge":%.2f,"tile":"%s","compare":[%s]}', ...
+                file_name(1:end-4), file_name, Dose(i), Dose_std(i), chargeAll(i), tile_files{i}, compare_json(1:end-1));
+            fprintf(gui_fid, '%s\n', json_msg);
+            fflush(gui_fid);
         end
     end
 
@@ -161,22 +319,33 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
         fclose(gui_fid);
     end
 
+    if cube_fid ~= -1
+        fclose(cube_fid);
+        cube_index = struct('format', 'float32-le', 'layout', 'film-major, column-major per film', ...
+                            'height', cube_size(1), 'width', cube_size(2), ...
+                            'names', {cube_names}, 'charges', chargeAll(1:nb_films));
+        fid = fopen([output_dir, 'dose_cube.json'], 'w');
+        fprintf(fid, '%s', jsonencode(cube_index));
+        fclose(fid);
+        fprintf('\nDose cube saved to: %s (%d films, %dx%d)\n', cube_file, nb_films, cube_size(1), cube_size(2));
+    end
+
     % Save plot if needed
     if create_plots && save_plots
         processed_dir = '!Processed/';
-        if ~exist(processed_dir, 'dir')
-            mkdir(processed_dir);
-        end
-
-        exp_name = exp_dir(1:end-1);
-        if ~isempty(strfind(exp_name, '/'))
-            exp_name = exp_name(find(exp_name == '/', 1, 'last')+1:end);
-        end
-
         experimental_filename = [processed_dir, 'polynomial_calibration_', exp_name, '.png'];
         fprintf('\nSaving results to: %s\n', experimental_filename);
-        print(hfig, '-dpng', '-r250', experimental_filename);
-        close(hfig);
+        composeFilmMontage(tile_files, tile_labels, experimental_filename, 250, 'none');
+    end
+
+    % Side-by-side results of all curves
+    if nb_compare > 0 && nb_films > 0
+        t0 = traceSpan();
+        film_names = cellfun(@(name) name(1:end-4), {list_films.name}, 'UniformOutput', false);
+        writeCalibrationComparison(output_dir, exp_name, film_names, chargeAll(1:nb_films), ...
+            [{primary_label}, compare_labels], [Dose; Dose_compare], [Dose_std; Dose_compare_std], ...
+            create_plots && save_plots);
+        traceSpan('comparison', t0, 'io');
     end
 
     % Create compressed archive
@@ -193,11 +362,13 @@ function varargout = processExperimentalFilms(exp_dir, window_meas, varargin)
         end
 
         % Create archive
+        t0 = traceSpan();
         if ispc
             system('"C:\Windows\System32\tar.exe" -czf experimental_films_data.tar.gz *.dat');
         else
             system('tar -czf experimental_films_data.tar.gz *.dat');
         end
+        traceSpan('tar', t0, 'io');
 
         delete('*.dat');
         cd(current_dir);
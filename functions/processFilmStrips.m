@@ -0,0 +1,93 @@
+function film = processFilmStrips(file_path, coeff1, precision, roi_window, charge, dat_file, cube_fid, tile_px, strip_mb)
+    % Calibrate one experimental film in strips of rows, for scans too large to hold whole
+    % The green channel of the cropped film (10 pixels off every edge, as in the whole-film
+    % path) is read strip_mb megabytes at a time. Each strip is calibrated, its ROI pixels and
+    % tile rows are kept, and it is appended to the text .dat file and written into the dose
+    % cube (cube_fid, -1 for none) at the film's offset. Peak memory is a few strips plus the
+    % tile, whatever the scan resolution.
+    % Returns the ROI statistics and green channel, the cropped film size and the tile
+    % (sampled every tile_step pixels, for writeFilmTile)
+
+    info = imfinfo(file_path);
+    height = info(1).Height - 19;
+    width = info(1).Width - 19;
+    cols = 10:info(1).Width - 10;
+    strip_rows = max(1, floor(strip_mb * 2^20 / (8 * width)));
+
+    roi_rows = roi_window(1, 1):roi_window(1, 2);
+    roi_cols = roi_window(2, 1):roi_window(2, 2);
+    roi_green = zeros(numel(roi_rows), numel(roi_cols));
+    roi_dose = zeros(numel(roi_rows), numel(roi_cols));
+
+    tile_step = max(1, ceil(max(height, width) / tile_px));
+    tile = zeros(numel(1:tile_step:height), numel(1:tile_step:width));
+
+    % Same text format as save -text, written row by row
+    dat_fid = fopen(dat_file, 'w');
+    if dat_fid == -1
+        error('Could not write calibrated film %s', dat_file);
+    end
+    if strcmp(precision, 'single')
+        matrix_type = 'float matrix';
+        row_format = [repmat(' %.9g', 1, width), '\n'];
+    else
+        matrix_type = 'matrix';
+        row_format = [repmat(' %.17g', 1, width), '\n'];
+    end
+    fprintf(dat_fid, '# Created by processFilmStrips\n');
+    fprintf(dat_fid, '# name: charge\n# type: scalar\n%.17g\n\n\n', charge);
+    fprintf(dat_fid, '# name: image_film_Gy\n# type: %s\n# rows: %d\n# columns: %d\n', matrix_type, height, width);
+
+    % The cube stores each film column-major: reserve the film, then fill it strip by strip
+    if cube_fid ~= -1
+        cube_base = ftell(cube_fid);
+        zero_columns = max(1, min(width, floor(strip_mb * 2^20 / (4 * height))));
+        for c = 1:zero_columns:width
+            fwrite(cube_fid, zeros(height, min(zero_columns, width - c + 1), 'single'), 'float32');
+        end
+    end
+
+    for r0 = 1:strip_rows:height
+        rows = r0:min(height, r0 + strip_rows - 1);
+
+        t0 = traceSpan();
+        green = cast(readTiffWindow(file_path, rows + 9, cols, 2), precision);
+        traceSpan('strip_read', t0, 'io');
+
+        t0 = traceSpan();
+        dose = polyval(coeff1, green);
+        traceSpan('polyval', t0, 'compute');
+
+        % ROI and tile rows falling in this strip
+        [in_roi, roi_pos] = ismember(rows, roi_rows);
+        if any(in_roi)
+            roi_green(roi_pos(in_roi), :) = double(green(in_roi, roi_cols));
+            roi_dose(roi_pos(in_roi), :) = double(dose(in_roi, roi_cols));
+        end
+        in_tile = mod(rows - 1, tile_step) == 0;
+        if any(in_tile)
+            tile((rows(in_tile) - 1) / tile_step + 1, :) = double(dose(in_tile, 1:tile_step:end));
+        end
+
+        t0 = traceSpan();
+        fprintf(dat_fid, row_format, dose.');
+        if cube_fid ~= -1
+            for c = 1:width
+                fseek(cube_fid, cube_base + ((c - 1) * height + r0 - 1) * 4, 'bof');
+                fwrite(cube_fid, dose(:, c), 'float32');
+            end
+        end
+        traceSpan('strip_write', t0, 'io');
+    end
+
+    fprintf(dat_fid, '\n\n');
+    fclose(dat_fid);
+    if cube_fid ~= -1
+        fseek(cube_fid, 0, 'eof');
+    end
+
+    film = struct('Dose', mean(roi_dose(:)), 'Dose_std', std(roi_dose(:)), ...
+                  'Dose_non_Gy', mean(roi_green(:)), 'Dose_non_Gy_std', std(roi_green(:)), ...
+                  'roi_green', roi_green, ...
+                  'size', [height, width], 'tile', tile, 'tile_step', tile_step);
+end
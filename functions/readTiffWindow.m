@@ -0,0 +1,135 @@
+function window = readTiffWindow(file_path, rows, cols, channel)
+    % Read one channel of a rectangular pixel window from a TIFF file as double
+    % rows and cols are contiguous 1-based ranges in the full image. Uncompressed,
+    % strip-organised RGB/grey TIFFs (the scanner output) are read directly: only the
+    % IFD and the bytes of the requested rows and columns are touched. Any other
+    % layout falls back to imread with PixelRegion.
+
+    layout = readTiffLayout(file_path);
+    if isempty(layout)
+        image = imread(file_path, 'PixelRegion', {[rows(1) rows(end)], [cols(1) cols(end)]});
+        window = double(image(:, :, channel));
+        return;
+    end
+
+    if rows(end) > layout.height || cols(end) > layout.width || channel > layout.samples
+        error('readTiffWindow: window exceeds the %dx%d image %s', layout.height, layout.width, file_path);
+    end
+
+    fid = fopen(file_path, 'r', layout.byte_order);
+    n_cols = numel(cols);
+    precision = sprintf('uint%d=>double', layout.bits);
+    pixel_bytes = layout.samples * layout.bits / 8;
+
+    window = zeros(numel(rows), n_cols);
+    for k = 1:numel(rows)
+        r = rows(k) - 1;
+        strip = floor(r / layout.rows_per_strip);
+        offset = layout.strip_offsets(strip + 1) + ...
+                 (r - strip * layout.rows_per_strip) * layout.width * pixel_bytes + ...
+                 (cols(1) - 1) * pixel_bytes;
+        fseek(fid, offset, 'bof');
+        pixels = fread(fid, n_cols * layout.samples, precision);
+        window(k, :) = pixels(channel:layout.samples:end);
+    end
+    fclose(fid);
+end
+
+function layout = readTiffLayout(file_path)
+    % Strip layout of an uncompressed, chunky, 8/16-bit TIFF; empty for anything else
+
+    layout = [];
+    fid = fopen(file_path, 'r', 'ieee-le');
+    if fid == -1
+        return;
+    end
+    byte_order_mark = fread(fid, 2, 'char=>char')';
+    fclose(fid);
+
+    if strcmp(byte_order_mark, 'II')
+        byte_order = 'ieee-le';
+    elseif strcmp(byte_order_mark, 'MM')
+        byte_order = 'ieee-be';
+    else
+        return;
+    end
+
+    fid = fopen(file_path, 'r', byte_order);
+    fseek(fid, 2, 'bof');
+    magic = fread(fid, 1, 'uint16');
+    if isempty(magic) || magic ~= 42
+        fclose(fid);
+        return;   % BigTIFF or not a TIFF
+    end
+    fseek(fid, fread(fid, 1, 'uint32'), 'bof');
+
+    % Directory entries: tag, type, count and the position of the value field
+    n_entries = fread(fid, 1, 'uint16');
+    tags = zeros(1, n_entries);
+    types = zeros(1, n_entries);
+    counts = zeros(1, n_entries);
+    positions = zeros(1, n_entries);
+    for e = 1:n_entries
+        tags(e) = fread(fid, 1, 'uint16');
+        types(e) = fread(fid, 1, 'uint16');
+        counts(e) = fread(fid, 1, 'uint32');
+        positions(e) = ftell(fid);
+        fseek(fid, 4, 'cof');
+    end
+
+    value = @(tag, default) readTagValues(fid, tags, types, counts, positions, tag, default);
+    width = value(256, []);
+    height = value(257, []);
+    bits = value(258, 1);
+    compression = value(259, 1);
+    strip_offsets = value(273, []);
+    samples = value(277, 1);
+    rows_per_strip = value(278, height);
+    planar = value(284, 1);
+    sample_format = value(339, 1);
+    is_tiled = any(tags == 322);
+    fclose(fid);
+
+    if isempty(width) || isempty(height) || isempty(strip_offsets) || is_tiled || ...
+       compression(1) ~= 1 || planar(1) ~= 1 || any(sample_format ~= 1) || ...
+       any(bits ~= bits(1)) || ~any(bits(1) == [8 16])
+        return;
+    end
+
+    layout = struct('byte_order', byte_order, 'width', width(1), 'height', height(1), ...
+                    'bits', bits(1), 'samples', samples(1), ...
+                    'rows_per_strip', min(rows_per_strip(1), height(1)), ...
+                    'strip_offsets', strip_offsets(:)');
+end
+
+function values = readTagValues(fid, tags, types, counts, positions, tag, default)
+    % Values of one IFD entry (BYTE, SHORT or LONG); default if the tag is absent
+
+    e = find(tags == tag, 1);
+    if isempty(e)
+        values = default;
+        return;
+    end
+
+    switch types(e)
+        case 1
+            precision = 'uint8';
+            type_bytes = 1;
+        case 3
+            precision = 'uint16';
+            type_bytes = 2;
+        case 4
+            precision = 'uint32';
+            type_bytes = 4;
+        otherwise
+            values = default;
+            return;
+    end
+
+    % Values up to 4 bytes are stored in the entry itself, longer ones at an offset
+    fseek(fid, positions(e), 'bof');
+    if counts(e) * type_bytes > 4
+        fseek(fid, fread(fid, 1, 'uint32'), 'bof');
+    end
+    values = fread(fid, counts(e), [precision, '=>double'])';
+end
@@ -0,0 +1,84 @@
+function writeCalibrationComparison(output_dir, exp_name, film_names, charges, labels, Dose, Dose_std, save_plot)
+    % Write the ROI doses of the same films under several calibration curves
+    % Dose and Dose_std hold one row per curve (labels), the first being the curve the
+    % dose maps were calibrated with. Writes the curves side by side
+    % (calibration_comparison.txt), one dose table per curve (doses_<label>.txt) and,
+    % with save_plot, the doses per film and their difference to the first curve
+    % (!Processed/calibration_comparison_<exp_name>.png).
+
+    nb_curves = numel(labels);
+    nb_films = numel(film_names);
+
+    % Side by side: film, charge, then dose and std of every curve
+    fid = fopen([output_dir, 'calibration_comparison.txt'], 'w');
+    if fid == -1
+        warning('Could not write %scalibration_comparison.txt', output_dir);
+        return;
+    end
+    fprintf(fid, 'film\tcharge');
+    for k = 1:nb_curves
+        fprintf(fid, '\tdose_%s\tstd_%s', labels{k}, labels{k});
+    end
+    fprintf(fid, '\n');
+    for i = 1:nb_films
+        fprintf(fid, '%s\t%.2f', film_names{i}, charges(i));
+        fprintf(fid, '\t%.4f\t%.4f', [Dose(:, i).'; Dose_std(:, i).']);
+        fprintf(fid, '\n');
+    end
+    fclose(fid);
+
+    % One table per curve
+    for k = 1:nb_curves
+        fid = fopen([output_dir, 'doses_', labels{k}, '.txt'], 'w');
+        if fid == -1
+            warning('Could not write the doses of %s', labels{k});
+            continue;
+        end
+        fprintf(fid, 'film\tcharge\tdose\tstd\n');
+        for i = 1:nb_films
+            fprintf(fid, '%s\t%.2f\t%.4f\t%.4f\n', film_names{i}, charges(i), Dose(k, i), Dose_std(k, i));
+        end
+        fclose(fid);
+    end
+    fprintf('\nCalibration comparison saved to: %scalibration_comparison.txt\n', output_dir);
+
+    if ~save_plot
+        return;
+    end
+
+    hfig = figure('Position', [100 100 1200 800], 'Visible', 'off');
+    x = 1:nb_films;
+
+    subplot(2, 1, 1);
+    hold on;
+    for k = 1:nb_curves
+        errorbar(x, Dose(k, :), Dose_std(k, :), 'o-', 'LineWidth', 1, 'MarkerSize', 5);
+    end
+    ylabel('Dose (Gy)', 'FontSize', 12);
+    title(['Calibration curves compared: ', strrep(exp_name, '_', '\_')], 'FontSize', 14, 'FontWeight', 'bold');
+    legend(strrep(labels, '_', '\_'), 'Location', 'best');
+    set(gca, 'XTick', x, 'XTickLabel', {}, 'FontSize', 10, 'Box', 'on');
+    xlim([0.5 nb_films + 0.5]);
+    grid on;
+
+    % Relative difference of every further curve to the first one
+    subplot(2, 1, 2);
+    hold on;
+    reference = Dose(1, :);
+    reference(reference == 0) = NaN;
+    for k = 2:nb_curves
+        plot(x, 100 * (Dose(k, :) - Dose(1, :)) ./ reference, 'o-', 'LineWidth', 1, 'MarkerSize', 5);
+    end
+    plot([0.5 nb_films + 0.5], [0 0], 'k-');
+    ylabel(['Difference to ', strrep(labels{1}, '_', '\_'), ' (%)'], 'FontSize', 12);
+    set(gca, 'XTick', x, 'XTickLabel', strrep(film_names, '_', '\_'), 'FontSize', 8, 'Box', 'on');
+    xlim([0.5 nb_films + 0.5]);
+    grid on;
+
+    comparison_file = ['!Processed/calibration_comparison_', exp_name, '.png'];
+    t0 = traceSpan();
+    print(hfig, '-dpng', '-r150', comparison_file);
+    traceSpan('saveas', t0, 'io');
+    close(hfig);
+    fprintf('Calibration comparison plot saved to: %s\n', comparison_file);
+end
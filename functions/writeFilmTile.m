@@ -0,0 +1,29 @@
+function writeFilmTile(image_Gy, clim, roi_window, tile_file, tile_px, step)
+    % Write a downsampled, color-mapped tile of one dose map (as drawn by imagesc with clim)
+    % roi_window = [y_min y_max; x_min x_max] is outlined in red. The longest side of the
+    % tile is at most tile_px pixels; composeFilmMontage assembles the tiles of a run.
+    % With step, image_Gy is already sampled every step pixels (processFilmStrips)
+
+    if nargin < 6
+        step = max(1, ceil(max(size(image_Gy)) / tile_px));
+        tile = double(image_Gy(1:step:end, 1:step:end));
+    else
+        tile = double(image_Gy);
+    end
+
+    % Same mapping as imagesc: clim spread over the colormap, values outside clamped
+    cmap = viridis(256);
+    idx = round((tile - clim(1)) / (clim(2) - clim(1)) * 255) + 1;
+    idx = min(max(idx, 1), 256);
+    idx(isnan(tile)) = 1;
+    rgb = uint8(reshape(cmap(idx, :), [size(tile), 3]) * 255);
+
+    % ROI outline at tile resolution
+    r = min(max(round((roi_window(1, :) - 1) / step) + 1, 1), size(tile, 1));
+    c = min(max(round((roi_window(2, :) - 1) / step) + 1, 1), size(tile, 2));
+    red = reshape(uint8([255 0 0]), 1, 1, 3);
+    rgb([r(1), r(2)], c(1):c(2), :) = repmat(red, 2, c(2) - c(1) + 1);
+    rgb(r(1):r(2), [c(1), c(2)], :) = repmat(red, r(2) - r(1) + 1, 2);
+
+    imwrite(rgb, tile_file);
+end
@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import zlib
+import struct
+import numpy as np
+
+# MAT-file v5 data types and array classes used by Octave's save -v6/-v7
+_MI_DTYPES = {1: 'i1', 2: 'u1', 3: '<i2', 4: '<u2', 5: '<i4', 6: '<u4',
+              7: '<f4', 9: '<f8', 12: '<i8', 13: '<u8', 16: 'u1'}
+_MI_MATRIX = 14
+_MI_COMPRESSED = 15
+_MX_CELL, _MX_STRUCT, _MX_CHAR = 1, 2, 4
+
+
+def _read_element(buf, pos):
+    """Return (type, payload, next_pos) for the data element at pos"""
+    first, second = struct.unpack_from('<II', buf, pos)
+    if first >> 16:
+        # Small element: type, size and up to 4 bytes of data packed in the 8-byte tag
+        nbytes = first >> 16
+        return first & 0xFFFF, buf[pos + 4:pos + 4 + nbytes], pos + 8
+    data_type, nbytes = first, second
+    start = pos + 8
+    end = start + nbytes
+    if data_type != _MI_COMPRESSED:
+        end += (-nbytes) % 8
+    return data_type, buf[start:start + nbytes], end
+
+
+def _numeric(data_type, payload):
+    return np.frombuffer(payload, dtype=_MI_DTYPES[data_type])
+
+
+def _parse_matrix(payload):
+    """Decode an miMATRIX payload into numpy arrays, strings, dicts (structs) or lists (cells)"""
+    if not payload:
+        return np.zeros((0, 0))
+
+    pos = 0
+    _, flags, pos = _read_element(payload, pos)
+    flags = _numeric(6, flags[:8])
+    array_class = int(flags[0]) & 0xFF
+    is_logical = bool(int(flags[0]) & 0x0200)
+    _, dims, pos = _read_element(payload, pos)
+    dims = tuple(int(d) for d in _numeric(5, dims))
+    _, _, pos = _read_element(payload, pos)  # Array name (empty for struct fields)
+
+    if array_class == _MX_STRUCT:
+        _, name_length, pos = _read_element(payload, pos)
+        name_length = int(_numeric(5, name_length)[0])
+        _, names, pos = _read_element(payload, pos)
+        fields = [names[i:i + name_length].split(b'\0', 1)[0].decode('ascii')
+                  for i in range(0, len(names), name_length)]
+        elements = []
+        for _ in range(int(np.prod(dims))):
+            element = {}
+            for field in fields:
+                _, sub, pos = _read_element(payload, pos)
+                element[field] = _parse_matrix(sub)
+            elements.append(element)
+        return elements[0] if len(elements) == 1 else elements
+
+    if array_class == _MX_CELL:
+        cells = []
+        for _ in range(int(np.prod(dims))):
+            _, sub, pos = _read_element(payload, pos)
+            cells.append(_parse_matrix(sub))
+        return cells
+
+    data_type, real, pos = _read_element(payload, pos)
+    if array_class == _MX_CHAR:
+        if data_type == 16:
+            return real.decode('utf-8')
+        return ''.join(chr(c) for c in _numeric(data_type, real))
+
+    values = _numeric(data_type, real).reshape(dims, order='F')
+    return values.astype(bool) if is_logical else values
+
+
+def read_mat(path):
+    """Read the variables of a MAT-file v5 (Octave save -v6 or -v7) into a dict"""
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if len(buf) < 128 or buf[126:128] != b'IM':
+        raise ValueError(f"{os.path.basename(path)} is not a little-endian MAT-file v5")
+
+    variables = {}
+    pos = 128
+    while pos + 8 <= len(buf):
+        data_type, payload, pos = _read_element(buf, pos)
+        if data_type == _MI_COMPRESSED:
+            data_type, payload, _ = _read_element(zlib.decompress(payload), 0)
+        if data_type != _MI_MATRIX:
+            continue
+        # The variable name is the third sub-element of the matrix
+        name_pos = _read_element(payload, _read_element(payload, 0)[2])[2]
+        _, name, _ = _read_element(payload, name_pos)
+        variables[name.decode('ascii')] = _parse_matrix(payload)
+    return variables
+
+
+class LeadMask:
+    """One lead film's mask as stored by analyzeLeadRegion.m.
+
+    Compact files store a bounding box (1-based, inclusive, in cropped-film pixels) and
+    run-length encoded (start, length) pairs over the column-major box pixels; the pixel
+    coordinates are only reconstructed when first requested. Files written before the
+    compact layout store every pixel in `mask_pixel_coords`.
+    """
+
+    def __init__(self, film_number, mask_size, bbox, pixel_count, runs=None, coords=None):
+        self.film_number = film_number
+        self.mask_size = mask_size
+        self.bbox = bbox
+        self.pixel_count = pixel_count
+        self._runs = runs
+        self._coords = coords
+
+    @classmethod
+    def from_entry(cls, entry):
+        film_number = int(np.asarray(entry['film_number']).ravel()[0])
+
+        if 'mask_runs' in entry:
+            runs = np.asarray(entry['mask_runs'], dtype=np.int64).reshape(2, -1)
+            bbox = tuple(int(v) for v in np.asarray(entry['mask_bbox']).ravel())
+            mask_size = tuple(int(v) for v in np.asarray(entry['mask_size']).ravel())
+            pixel_count = int(np.asarray(entry['pixel_count']).ravel()[0])
+            return cls(film_number, mask_size, bbox, pixel_count, runs=runs)
+
+        coords = np.asarray(entry['mask_pixel_coords'], dtype=np.int64).reshape(-1, 2)
+        full_mask = entry.get('full_mask')
+        mask_size = tuple(np.shape(full_mask)) if full_mask is not None else (0, 0)
+        if len(coords):
+            bbox = (int(coords[:, 0].min()), int(coords[:, 0].max()),
+                    int(coords[:, 1].min()), int(coords[:, 1].max()))
+        else:
+            bbox = (0, 0, 0, 0)
+        return cls(film_number, mask_size, bbox, len(coords), coords=coords)
+
+    def coords(self):
+        """(rows, cols) of the masked pixels, 1-based as in Octave"""
+        if self._coords is None:
+            r1, r2, c1, c2 = self.bbox
+            box_h, box_w = r2 - r1 + 1, c2 - c1 + 1
+            if self.pixel_count == 0 or self._runs.size == 0:
+                self._coords = np.zeros((0, 2), dtype=np.int64)
+            else:
+                marks = np.zeros(box_h * box_w + 1, dtype=np.int8)
+                starts, lengths = self._runs
+                marks[starts - 1] = 1
+                marks[starts - 1 + lengths] -= 1
+                box = np.cumsum(marks[:-1]).astype(bool).reshape((box_h, box_w), order='F')
+                cols, rows = np.nonzero(box.T)
+                self._coords = np.column_stack([rows + r1, cols + c1])
+        return self._coords[:, 0], self._coords[:, 1]
+
+
+def load_lead_masks(mat_path):
+    """Load the lead masks of a !ROIlead MAT file.
+
+    Returns ({film_number: LeadMask}, file_size_bytes, load_seconds).
+    """
+    start = time.perf_counter()
+    lead_data = read_mat(mat_path).get('lead_data', {})
+    masks = {}
+    for field, entry in lead_data.items():
+        if re.fullmatch(r'film_\d+', field) and isinstance(entry, dict):
+            mask = LeadMask.from_entry(entry)
+            masks[mask.film_number] = mask
+    return masks, os.path.getsize(mat_path), time.perf_counter() - start
@@ -1,7 +1,27 @@
 import sys
 import os
+import time
 os.environ["PYTHONDONTWRITEBYTECODE"] = "1"
 sys.dont_write_bytecode = True
+
+# Startup timing: run with --startup-timing (or FILMDOSIMETRY_STARTUP_TIMING=1) to print
+# the cost of each import group and screen construction
+STARTUP_TIMING = '--startup-timing' in sys.argv or os.environ.get('FILMDOSIMETRY_STARTUP_TIMING') == '1'
+_startup_start = time.perf_counter()
+_startup_last = _startup_start
+
+
+def startup_mark(label):
+    """Print the time since the previous mark (startup timing mode only)"""
+    global _startup_last
+    if not STARTUP_TIMING:
+        return
+    now = time.perf_counter()
+    print(f"[startup] {label:<40} {1000 * (now - _startup_last):8.1f} ms  "
+          f"(total {1000 * (now - _startup_start):8.1f} ms)", file=sys.stderr, flush=True)
+    _startup_last = now
+
+
 # Fix working directory for macOS .app bundle
 if getattr(sys, 'frozen', False) and sys.platform == 'darwin':
     exe_dir = os.path.dirname(sys.executable)
@@ -12,17 +32,13 @@ if getattr(sys, 'frozen', False) and sys.platform == 'darwin':
     if app_bundle_dir.endswith('.app'):
         base_dir = os.path.dirname(app_bundle_dir)
         os.chdir(base_dir)
-import resources_rc
 from PyQt6.QtSvgWidgets import QSvgWidget
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QStackedWidget, 
                             QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                             QLabel, QSizePolicy, QSpacerItem, QScrollArea)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon, QPalette, QColor
-from calibration_screen import CalibrationScreen
-from analysis_screen import AnalysisScreen
-from processing_screen import ProcessingScreen
-from progress_screen import AnalysisProgressScreen
+startup_mark("import PyQt6")
 
 class CollapsibleSection(QWidget):
     """Collapsible UI section with title and content that can be expanded/collapsed"""
@@ -142,31 +158,53 @@ class MainWindow(QMainWindow):
     # Static instruction data to avoid repeated string processing
     INSTRUCTION_SECTIONS = [
         ("About", "This software performs film dosimetry analysis in two main stages: calibration with dose calculation, and detailed dose distribution analysis. The application uses Octave scripts that can be executed either from the Octave console or through the GUI.<br><br>Source code and documentation: `https://github.com/annc0in/FilmDosimetryGUI`"),
-        ("Required Directory Structure", "The application requires a main directory containing:<br><br>**Essential files:**<br>• `FilmDosimetryGUI` — GUI executable file<br>• Script `Check_calibration_XD_add_films.m` and `functions` folder with supporting functions (5)<br>• `scripts` folder containing script `analyze_shots_films_MOD_centering_Charge_Density_bgnd.m` and its `functions` subfolder (6 supporting functions)<br><br>**Input data folders:**<br>• Calibration films directories (format: `Calibration_*`)<br>&nbsp;&nbsp;- Contains: TIFF film files + Excel file (.xlsx) with Delivered Doses in column F starting from row 2<br>• Experimental films directories<br>&nbsp;&nbsp;- Contains: TIFF film files"),
-        ("Output Files Generated", "**After Calibration & Film Processing:**<br>• `!CalibrationCurves` — PNG curve images and corresponding MAT files (reusable)<br>• `!Processed` — Combined PNG images of all processed films<br>• `!ROIlead` — PNG images with lead region highlighted + corresponding MAT files (used in Stage 2)<br>• `[ExperimentalFilmsFolder]_CALIBRATED` — Contains `experimental_films_data.tar.gz` archive with DAT files for each processed film<br>• Optional: `check_Calibration_*.png` (if calibration validation was selected)<br>• Temporary files: `user_inputs.json`, `octave_gui.txt` (automatically deleted upon successful completion)<br><br>**After Image Analysis & Dose Calculation:**<br>• `scripts/images` — PNG images showing dose cross-sections (with background, without background, and CD — 3 images per film)<br>• `scripts/analysis_report.pdf` — 3-page analysis report<br>• Optional: `scripts/bgnd_avg_XX-YY_from_[ExperimentalFilmFolder].mat` — Average background file (reusable if computed)<br>• Temporary files: `scripts/get_user_inputs.json`, `scripts/temp_analysis_results.txt` (automatically deleted upon successful completion)"),
+        ("Required Directory Structure", "The application requires a main directory containing:<br><br>**Essential files:**<br>• `FilmDosimetryGUI` — GUI executable file<br>• Script `Check_calibration_XD_add_films.m` and `functions` folder with supporting functions (14)<br>• `scripts` folder containing script `analyze_shots_films_MOD_centering_Charge_Density_bgnd.m` and its `functions` subfolder (20 supporting functions)<br><br>**Input data folders:**<br>• Calibration films directories (format: `Calibration_*`)<br>&nbsp;&nbsp;- Contains: TIFF film files + Excel file (.xlsx) with Delivered Doses in column F starting from row 2<br>• Experimental films directories<br>&nbsp;&nbsp;- Contains: TIFF film files"),
+        ("Output Files Generated", "**After Calibration & Film Processing:**<br>• `!CalibrationCurves` — PNG curve images and corresponding MAT files (reusable)<br>• `!Processed` — Combined PNG images of all processed films, assembled from the per-film tiles in `!Processed/tiles`<br>• `!ROIlead` — PNG images with lead region highlighted + corresponding MAT files with the lead masks stored compactly (used in Stage 2); `!ROIlead/cache` keeps the per-film lead segmentation so changing the mask type does not re-segment<br>• `[ExperimentalFilmsFolder]_CALIBRATED` — Contains `experimental_films_data.tar.gz` archive with DAT files for each processed film; optionally `dose_cube.f32` + `dose_cube.json` (all dose maps as float32 in one file, read directly by the analysis and by `dose_cube.py`)<br>• Optional: `check_Calibration_*.png` (if calibration validation was selected)<br>• Optional: `calibration_comparison.txt` and `doses_[curve].txt` in the `_CALIBRATED` folder plus `!Processed/calibration_comparison_[ExperimentalFilmsFolder].png` (if further curves were selected for comparison)<br>• Optional: `octave_profile.json` + `octave_profile.txt` in the `_CALIBRATED` folder — Octave function timings (self time, total time, calls) of a profiled run<br>• Temporary files: `user_inputs.json`, `octave_gui.txt` (automatically deleted upon successful completion)<br><br>**After Image Analysis & Dose Calculation:**<br>• `scripts/images` — PNG images showing dose cross-sections (with background and without background — 2 images per film; CD results are derived from the no-background analysis)<br>• Parameter sweep runs: `scripts/sweep_results.txt` (dose, centroid and widths per film and setting) and `scripts/images/sweep_comparison.png` instead of the per-film images and the report<br>• `scripts/cache` — Per-film intermediates (cropped maps, profile fits, rendered-image records) reused by re-runs with unchanged films, background and crop; least recently used entries are evicted beyond 4 GB (`film_cache_limit_mb` in the analysis script)<br>• `scripts/analysis_report.pdf` — Analysis report: results plot, summary table (continued on extra pages for large campaigns), parameters and jitter plots (rendered by the application after the analysis finishes)<br>• `scripts/analysis_report_data.json` — Report data used to re-render the PDF when notes are edited<br>• `scripts/roi_windows.f32` + `scripts/roi_windows.json` — Float32 dose windows around each centroid (up to 10 mm ROI), used to re-evaluate the ROI on the progress screen<br>• Optional: `scripts/octave_profile.json` + `scripts/octave_profile.txt` — Octave function timings of a profiled run<br>• Optional: `scripts/bgnd_avg_XX-YY_from_[ExperimentalFilmFolder].mat` — Average background file (reusable if computed)<br>• Temporary files: `scripts/get_user_inputs.json`, `scripts/temp_analysis_results.txt` (automatically deleted upon successful completion)<br><br>**After either stage:**<br>• `!Traces` — JSON timing trace of each run (open in `chrome://tracing` or Perfetto)<br>• `!Results/results.sqlite` — Parameters and per-film results of every calibration and analysis run, written while the runs progress (browse them with **Results History** on the main screen)"),
         ("User Interface", [
-            ("Main Screen", "Choose between two processing stages:<br>• **Calibration & Film Processing**<br>• **Image Analysis & Dose Calculation**<br><br>Access this instruction guide via the button in the upper-right corner (available from any screen).<br><br>**Navigation**<br>Each stage has two screens: input parameters and real-time processing results. Navigate using:<br>• **Back** button (bottom left) — return to previous screen<br>• **Forward** button (bottom left) — return to results screen<br>• **Home** button (bottom right) — return to main screen"),
-            ("Calibration && Film Processing", "**Purpose**<br>Creates calibration curve from known dose films and applies it to experimental films to calculate dose values.<br><br>**Required Input Parameters**<br><br>**1. Calibration Curve Selection:**<br>• Use existing calibration curve, OR<br>• Create new calibration curve by specifying:<br>&nbsp;&nbsp;- Calibration films directory<br>&nbsp;&nbsp;- Polynomial degree (default is 8)<br>&nbsp;&nbsp;- Enable calibration validation (optional)<br><br>**2. Experimental Films Directory**<br>Select folder containing films to be analyzed.<br><br>**3. Charge Values**<br>Enter charges separated by commas, or \"0\" for all zero values.<br><br>**4. Lead Region Detection**<br>• **full** — automatic full detection<br>• **rectangle** — specify height in mm<br><br>**Processing Interface**<br>• **Left panel:** Real-time console output and calibration curve display<br>• **Right panel:** Table showing calculated doses and input charges<br>• **Bottom:** Timer and Pause button (stops processing permanently)"),
-            ("Image Analysis && Dose Calculation", "**Purpose**<br>Performs detailed dose distribution analysis using calibrated films from Calibration & Film Processing.<br><br>**Required Input Parameters**<br><br>**1. Region of Interest (ROI) Definition**<br>• Shape: Circle or Square<br>• Size: Radius (circle) or width (square) in mm<br><br>**2. Calibrated Films Directory**<br>Select directory ending with `_CALIBRATED` from Calibration & Film Processing output.<br><br>**3. Lead Region Reference (Optional)**<br>• Select PNG image from `!ROIlead` folder<br>• Specify film numbers for intersection analysis (single number or comma-separated)<br><br>**4. Background Correction**<br>Choose one option:<br>• **Existing background** — use previously calculated background file<br>• **Calculate new background** — specify film numbers from `_CALIBRATED` directory<br>• **Edge-based background** — automatic edge detection<br><br>**5. Analysis Films**<br>Specify film numbers for main dose analysis (comma-separated).<br><br>**6. PDF Report Options**<br>• Include calibration coefficient plot: Yes/No<br><br>**7. Notes (Optional)**<br>Add comments for the analysis report (comma-separated).<br><br>**Processing Interface**<br>• **Left panel:** Real-time console output<br>• **Right panel:** Results table with doses, charges, and statistical parameters for each film<br>• **Bottom:** Timer and Pause button (stops processing permanently)")
+            ("Main Screen", "Choose between two processing stages:<br>• **Calibration & Film Processing**<br>• **Image Analysis & Dose Calculation**<br><br>**Results History** lists the per-film results of all past runs, filtered by experiment, film, calibration or date.<br><br>Access this instruction guide via the button in the upper-right corner (available from any screen).<br><br>**Navigation**<br>Each stage has two screens: input parameters and real-time processing results. Navigate using:<br>• **Back** button (bottom left) — return to previous screen<br>• **Forward** button (bottom left) — return to results screen<br>• **Home** button (bottom right) — return to main screen"),
+            ("Calibration && Film Processing", "**Purpose**<br>Creates calibration curve from known dose films and applies it to experimental films to calculate dose values.<br><br>**Required Input Parameters**<br><br>**1. Calibration Curve Selection:**<br>• Use existing calibration curve, OR<br>• Create new calibration curve by specifying:<br>&nbsp;&nbsp;- Calibration films directory<br>&nbsp;&nbsp;- Polynomial degree (default is 8)<br>&nbsp;&nbsp;- Enable calibration validation (optional)<br><br>**2. Experimental Films Directory**<br>Select folder containing films to be analyzed.<br><br>**3. Charge Values**<br>Enter charges separated by commas, or \"0\" for all zero values.<br><br>**4. Lead Region Detection**<br>• **full** — automatic full detection<br>• **rectangle** — specify height in mm<br><br>**5. Dose Cube (Optional)**<br>Also write all dose maps into one memory-mapped file, so the analysis reads any film directly without extracting the archive<br><br>**6. Single Precision (Optional)**<br>Compute and store the dose maps as float32: half the memory and `.dat` size (use `tools/compare_precision.py` to check the effect on the results)<br><br>**Profile This Run (Optional)**<br>Runs Octave under its profiler and shows the functions with the most self time below the stage timings (top N, sortable)<br><br>**7. Comparison Curves (Optional)**<br>Check further calibration curves under \"Also evaluate with\": every film is read once and its ROI dose is also computed with each checked curve (one extra table column per curve, side-by-side tables and a comparison plot)<br><br>**Processing Interface**<br>• **Left panel:** Real-time console output and calibration curve display<br>• **Right panel:** Table showing calculated doses and input charges, and a montage of the processed films that fills in as each film is done; per-stage timings appear below it when processing completes<br>• **Bottom:** Timer and Pause button (stops processing permanently)"),
+            ("Image Analysis && Dose Calculation", "**Purpose**<br>Performs detailed dose distribution analysis using calibrated films from Calibration & Film Processing.<br><br>**Required Input Parameters**<br><br>**1. Region of Interest (ROI) Definition**<br>• Shape: Circle or Square<br>• Size: Radius (circle) or width (square) in mm<br><br>**2. Calibrated Films Directory**<br>Select directory ending with `_CALIBRATED` from Calibration & Film Processing output.<br><br>**3. Lead Region Reference (Optional)**<br>• Select PNG image from `!ROIlead` folder<br>• Specify film numbers for intersection analysis (single number or comma-separated) — the masks stored in the selected file are listed below the input<br><br>**4. Background Correction**<br>Choose one option:<br>• **Existing background** — use previously calculated background file<br>• **Calculate new background** — specify film numbers from `_CALIBRATED` directory<br>• **Edge-based background** — automatic edge detection<br><br>**5. Analysis Films**<br>Specify film numbers for main dose analysis (comma-separated).<br><br>**6. PDF Report Options**<br>• Include calibration coefficient plot: Yes/No<br><br>**Analysis Precision (Optional)**<br>Analyse in single precision (float32): half the memory for the dose maps; totals and statistics are still accumulated in double<br><br>**Profile This Run (Optional)**<br>Runs the analysis under the Octave profiler and shows the functions with the most self time below the stage timings (top N, sortable)<br><br>**7. Notes (Optional)**<br>Add comments for the analysis report (comma-separated).<br><br>**Processing Interface**<br>• **Left panel:** Real-time console output<br>• **Right panel:** Results table with doses, charges, and statistical parameters for each film; notes can be edited in the Notes column after the analysis (the PDF report is updated automatically); per-stage timings appear below it when processing completes<br>• **Bottom:** Timer and Pause button (stops processing permanently)")
         ]),
         ("Error Handling", "• Missing or incorrect required parameters trigger warning messages before processing<br>• Console output displays detailed error information<br>• Processing cannot be resumed after using Pause button"),
         ("Support", "For errors, questions, or suggestions, please contact: `aqcaise5@gmail.com`. Subject line: \"FilmDosimetryGUI\"")
     ]
     
+    # Screens other than the main screen are created on first use (first navigation to
+    # them), together with the import of their module
+    LAZY_SCREENS = {
+        'instruction_screen': '_create_instruction_screen',
+        'calibration_screen': '_create_calibration_screen',
+        'analysis_screen': '_create_analysis_screen',
+        'processing_screen': '_create_processing_screen',
+        'progress_screen': '_create_progress_screen',
+        'results_screen': '_create_results_screen',
+    }
+
     def __init__(self):
         super().__init__()
         self.instruction_sections = []
         self.previous_screen_index = 0
+        self.resources_loaded = False
         self._setup_ui()
         self._setup_screens()
         self._update_theme()
+
+    def __getattr__(self, name):
+        """Create a lazy screen on first access"""
+        factory = type(self).LAZY_SCREENS.get(name)
+        if factory is None:
+            raise AttributeError(name)
+        start = time.perf_counter()
+        screen = getattr(self, factory)()
+        setattr(self, name, screen)
+        self.stacked_widget.addWidget(screen)
+        if STARTUP_TIMING:
+            print(f"[startup] created {name} in {1000 * (time.perf_counter() - start):.1f} ms",
+                  file=sys.stderr, flush=True)
+        return screen
     
     def _setup_ui(self):
         """Initialize main window UI components"""
-        app_icon = QIcon(":/_icons/icon.png")
-        self.setWindowIcon(app_icon)
-        QApplication.instance().setWindowIcon(app_icon)
-
         self.setWindowTitle("FilmDosimetryGUI")
         self.setMinimumSize(800, 600)
         
@@ -181,23 +219,30 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.stacked_widget)
     
     def _setup_screens(self):
-        """Create and configure all application screens"""
+        """Create the main screen; the other screens are created on first use (LAZY_SCREENS)"""
         self.main_screen = self._create_main_screen()
-        self.instruction_screen = self._create_instruction_screen()
-        self.calibration_screen = CalibrationScreen(self)
-        self.analysis_screen = AnalysisScreen(self)
-        self.processing_screen = ProcessingScreen(self)
-        self.progress_screen = AnalysisProgressScreen(self)
-
-        screens = [
-            self.main_screen, self.instruction_screen, self.analysis_screen,
-            self.calibration_screen, self.processing_screen, self.progress_screen
-        ]
-        
-        for screen in screens:
-            self.stacked_widget.addWidget(screen)
-        
+        self.stacked_widget.addWidget(self.main_screen)
         self.stacked_widget.currentChanged.connect(self._on_screen_changed)
+
+    def _create_calibration_screen(self):
+        from calibration_screen import CalibrationScreen
+        return CalibrationScreen(self)
+
+    def _create_analysis_screen(self):
+        from analysis_screen import AnalysisScreen
+        return AnalysisScreen(self)
+
+    def _create_processing_screen(self):
+        from processing_screen import ProcessingScreen
+        return ProcessingScreen(self)
+
+    def _create_progress_screen(self):
+        from progress_screen import AnalysisProgressScreen
+        return AnalysisProgressScreen(self)
+
+    def _create_results_screen(self):
+        from results_screen import ResultsScreen
+        return ResultsScreen(self)
     
     def _update_theme(self):
         """Update UI colors based on system theme"""
@@ -304,7 +349,7 @@ class MainWindow(QMainWindow):
         center_layout.addWidget(center_container, 30)  # 30% 
         center_layout.addWidget(right_container, 35)  # 35%
         
-        QTimer.singleShot(0, self._load_logos)
+        QTimer.singleShot(0, self._load_resources)
         return center_content
     
     def _create_logo_container(self, side):
@@ -336,7 +381,10 @@ class MainWindow(QMainWindow):
             lambda: self.stacked_widget.setCurrentWidget(self.calibration_screen)),
             ("Image Analysis + Dose Calculation",
             "Background processing\nDose analysis with shape selection\nStatistical calculations", 
-            lambda: self.stacked_widget.setCurrentWidget(self.analysis_screen))
+            lambda: self.stacked_widget.setCurrentWidget(self.analysis_screen)),
+            ("Results History",
+            "Calibration and analysis results of all runs\nFilter by experiment, film, calibration and date",
+            lambda: self.stacked_widget.setCurrentWidget(self.results_screen))
         ]
         
         for text, tooltip, callback in buttons_config:
@@ -349,6 +397,17 @@ class MainWindow(QMainWindow):
         
         return container
     
+    def _load_resources(self):
+        """Register the compiled resources (icons, logos) once the window is up"""
+        if not self.resources_loaded:
+            import resources_rc  # noqa: F401 - registers the ":/" resources on import
+            self.resources_loaded = True
+            app_icon = QIcon(":/_icons/icon.png")
+            self.setWindowIcon(app_icon)
+            QApplication.instance().setWindowIcon(app_icon)
+            startup_mark("load resources")
+        self._load_logos()
+
     def _load_logos(self):
         """Load and scale SVG logos maintaining aspect ratios"""
         available_width = max(200, (self.width() - 400 - 40) // 2)
@@ -366,7 +425,7 @@ class MainWindow(QMainWindow):
 
     def _on_screen_changed(self, index):
         """Handle screen changes and update window title"""
-        if index != self.stacked_widget.indexOf(self.instruction_screen):
+        if self.stacked_widget.widget(index) is not self.__dict__.get('instruction_screen'):
             self.previous_screen_index = index
             
         widget = self.stacked_widget.widget(index)
@@ -481,7 +540,7 @@ class MainWindow(QMainWindow):
     def resizeEvent(self, event):
         """Handle window resize to update logo sizes"""
         super().resizeEvent(event)
-        if hasattr(self, 'left_logo'):
+        if self.resources_loaded:
             self._load_logos()
 
     # Expose methods for compatibility
@@ -515,6 +574,9 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    startup_mark("create QApplication")
     window = MainWindow()
+    startup_mark("create main window")
     window.showMaximized()
+    QTimer.singleShot(0, lambda: startup_mark("main window shown"))
     sys.exit(app.exec())
\ No newline at end of file
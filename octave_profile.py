@@ -0,0 +1,193 @@
+import os
+import json
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt
+
+PROFILE_JSON = 'octave_profile.json'
+PROFILE_TABLE = 'octave_profile.txt'
+
+
+def _as_list(value):
+    """jsonencode writes a one-element struct array as an object and an empty one as []"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _tree(node, names):
+    """Call tree node with self and inclusive seconds from a profile('info').Hierarchical node"""
+    children = [_tree(child, names) for child in _as_list(node.get('Children'))]
+    if 'SelfTime' in node:
+        self_s, total_s = float(node['SelfTime']), float(node['TotalTime'])
+    else:
+        # Older Octave releases only record the time spent in the node itself
+        self_s = float(node['TotalTime'])
+        total_s = self_s + sum(child["total_s"] for child in children)
+    return {
+        "function": names[int(node['Index']) - 1],
+        "self_s": self_s,
+        "total_s": total_s,
+        "calls": int(node.get('NumCalls', 0)),
+        "children": children,
+    }
+
+
+def _accumulate(node, ancestors, flat):
+    """Sum self and inclusive time per function; a recursive call's inclusive time is
+    already part of its outermost caller's"""
+    row = flat[node["function"]]
+    row["self_s"] += node["self_s"]
+    if node["function"] not in ancestors:
+        row["total_s"] += node["total_s"]
+    for child in node["children"]:
+        _accumulate(child, ancestors | {node["function"]}, flat)
+
+
+def parse_profile(info):
+    """Flat rows and call tree of Octave's profile('info') (decoded from jsonencode).
+
+    Returns (rows, tree): rows are dicts with function, self_s, total_s and calls, by
+    self time; tree is the call hierarchy with the same fields per node.
+    """
+    functions = _as_list(info.get('FunctionTable'))
+    names = [f['FunctionName'] for f in functions]
+    tree = [_tree(node, names) for node in _as_list(info.get('Hierarchical'))]
+
+    flat = {name: {"function": name, "self_s": 0.0, "total_s": 0.0, "calls": int(f.get('NumCalls', 0))}
+            for name, f in zip(names, functions)}
+    if tree:
+        for node in tree:
+            _accumulate(node, frozenset(), flat)
+    else:
+        for name, f in zip(names, functions):
+            flat[name]["self_s"] = flat[name]["total_s"] = float(f.get('TotalTime', 0.0))
+
+    rows = sorted(flat.values(), key=lambda row: row["self_s"], reverse=True)
+    return rows, tree
+
+
+class OctaveProfiler:
+    """Octave profiler capture of one stage's run.
+
+    With profiling enabled the Octave entry point runs under `profile on` and writes
+    profile('info') as JSON to `octave_profile_file` (passed as OCTAVE_PROFILE_FILE);
+    export() turns it into octave_profile.json (flat table and call tree) and
+    octave_profile.txt (flat table) next to the run's outputs.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.octave_profile_file = os.path.abspath(f'octave_profile_{stage}.json')
+        self.enabled = False
+
+    def begin_run(self, enabled):
+        """Remove a profile left over from an earlier run"""
+        self.enabled = enabled
+        if os.path.exists(self.octave_profile_file):
+            os.remove(self.octave_profile_file)
+
+    def environment(self):
+        """Environment for the Octave process"""
+        return {"OCTAVE_PROFILE_FILE": self.octave_profile_file} if self.enabled else {}
+
+    def export(self, output_dir):
+        """Write the profile tables to output_dir; returns (rows, json_path) or None"""
+        if not self.enabled or not os.path.exists(self.octave_profile_file):
+            return None
+        with open(self.octave_profile_file, 'r', encoding='utf-8') as f:
+            rows, tree = parse_profile(json.load(f))
+        os.remove(self.octave_profile_file)
+
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, PROFILE_JSON)
+        with open(json_path, 'w') as f:
+            json.dump({"stage": self.stage, "functions": rows, "tree": tree}, f, indent=1)
+        with open(os.path.join(output_dir, PROFILE_TABLE), 'w') as f:
+            f.write("function\tself_s\ttotal_s\tcalls\n")
+            for row in rows:
+                f.write(f"{row['function']}\t{row['self_s']:.6f}\t{row['total_s']:.6f}\t{row['calls']}\n")
+        return rows, json_path
+
+
+class ProfilePanel(QWidget):
+    """Sortable top-N table of the Octave functions of a profiled run"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.path = ""
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        title_row = QHBoxLayout()
+        self.title_label = QLabel("")
+        self.title_label.setStyleSheet("font-size: 12px; font-weight: bold;")
+        self.title_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.top_spin = QSpinBox()
+        self.top_spin.setRange(5, 500)
+        self.top_spin.setValue(20)
+        self.top_spin.setPrefix("Top ")
+        self.top_spin.valueChanged.connect(self._fill)
+        title_row.addWidget(self.title_label, stretch=1)
+        title_row.addWidget(self.top_spin)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["Function", "Self, s", "Total, s", "Calls"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setMaximumHeight(180)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                gridline-color: #d0d0d0;
+                background-color: transparent;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                font-size: 11px;
+            }
+            QHeaderView::section {
+                background-color: transparent;
+                border: 1px solid #ccc;
+                padding: 3px;
+                font-weight: bold;
+            }
+        """)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, 4):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+
+        layout.addLayout(title_row)
+        layout.addWidget(self.table)
+        self.setVisible(False)
+
+    def show_profile(self, rows, path):
+        """Show the functions of a finished profiled run"""
+        self.rows = rows
+        self.path = path
+        self._fill()
+        self.setVisible(True)
+
+    def _fill(self):
+        top = self.rows[:self.top_spin.value()]
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(top))
+        for r, row in enumerate(top):
+            self.table.setItem(r, 0, QTableWidgetItem(row["function"]))
+            for col, value in ((1, round(row["self_s"], 3)), (2, round(row["total_s"], 3)), (3, row["calls"])):
+                item = QTableWidgetItem()
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(r, col, item)
+        self.table.setSortingEnabled(True)
+        self.title_label.setText(f"Octave profile, top {len(top)} of {len(self.rows)} functions by self time "
+                                 f"({self.path})")
+
+    def clear(self):
+        """Hide until the next profiled run"""
+        self.rows = []
+        self.table.setRowCount(0)
+        self.setVisible(False)
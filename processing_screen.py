@@ -1,15 +1,26 @@
 import os
+import glob
 import platform
 import sys
 import time
 import json
 import getpass
+import sqlite3
+import re
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                            QLabel, QProgressBar, QTextEdit, QTableWidget, 
                            QTableWidgetItem, QSizePolicy, QHeaderView, QApplication)
 from PyQt6.QtCore import Qt, QProcess, QTimer, pyqtSignal, QProcessEnvironment
 from PyQt6.QtGui import QPixmap, QTextCursor
-import psutil
+from tracing import get_tracer, TraceSummaryPanel
+from film_montage import FilmMontageView
+from resource_governor import plan_resources, tif_film_size
+from telemetry import ProcessTreeSampler, TelemetryStrip
+from results_store import ResultsStore, RESULTS_DB, calibration_experiment
+from read_ahead import FilmReadAhead, calibration_read_plan
+from octave_profile import OctaveProfiler, ProfilePanel
+
+FILM_PROGRESS = re.compile(r'Processing experimental film (\d+) of \d+')
 
 class ProcessingScreen(QWidget):
    processing_finished = pyqtSignal(int, QProcess.ExitStatus)
@@ -21,6 +32,7 @@ class ProcessingScreen(QWidget):
        
        # Process state
        self.process = None
+       self.resource_plan = None
        self.start_time = None
        self.is_paused = False
        
@@ -36,6 +48,20 @@ class ProcessingScreen(QWidget):
        # Output handling
        self._stdout_buffer = ""
        
+       # Span tracing
+       self.tracer = get_tracer('calibration')
+       self.sampler = ProcessTreeSampler(self.tracer, self)
+       self.read_ahead = FilmReadAhead(self.tracer)
+       self.profiler = OctaveProfiler('calibration')
+       self.profile_output_dir = ""
+       
+       # Results store (opened on the first run)
+       self.results_store = None
+       self.results_run = None
+       
+       # Further calibration curves evaluated on the same films (one table column each)
+       self.compare_labels = []
+       
        # Timers
        self.timer = QTimer()
        self.timer.timeout.connect(self.update_elapsed_time)
@@ -47,6 +73,7 @@ class ProcessingScreen(QWidget):
        self.keep_alive_timer.timeout.connect(lambda: QApplication.processEvents())
        
        self._create_ui()
+       self.sampler.sampled.connect(self.telemetry_strip.add_sample)
        
    def _create_ui(self):
        """Initialize UI layout and components"""
@@ -210,8 +237,21 @@ class ProcessingScreen(QWidget):
        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+       self.base_column_count = self.data_table.columnCount()
+       
+       # Film tiles, shown as each film is processed
+       self.montage_view = FilmMontageView()
+       
+       # Per-stage timing summary
+       self.trace_panel = TraceSummaryPanel()
+       
+       # Octave function timings of a profiled run
+       self.profile_panel = ProfilePanel()
        
        layout.addWidget(self.data_table, stretch=1)
+       layout.addWidget(self.montage_view, stretch=1)
+       layout.addWidget(self.trace_panel)
+       layout.addWidget(self.profile_panel)
        return panel
 
    def _create_footer(self):
@@ -268,6 +308,7 @@ class ProcessingScreen(QWidget):
         # Elapsed time label
         self.elapsed_time_label = QLabel("Elapsed Time: 00.00 sec")
         self.elapsed_time_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        self.telemetry_strip = TelemetryStrip()
         
         # Home button
         self.home_btn = QPushButton("🏠")
@@ -297,6 +338,8 @@ class ProcessingScreen(QWidget):
         footer_layout.addWidget(self.pause_btn)
         footer_layout.addSpacing(20)
         footer_layout.addWidget(self.elapsed_time_label)
+        footer_layout.addSpacing(10)
+        footer_layout.addWidget(self.telemetry_strip)
         footer_layout.addStretch()
         footer_layout.addWidget(self.home_btn)
         
@@ -314,7 +357,14 @@ class ProcessingScreen(QWidget):
                user_data = json.load(f)
            self.waiting_for_calibration = not user_data.get('use_existing_calibration', False)
        except (OSError, json.JSONDecodeError):
+           user_data = {}
            self.waiting_for_calibration = False
+       self._set_comparison_columns(user_data)
+       self._plan_resources(user_data)
+       self._begin_results_run(user_data)
+       self.read_ahead.start(calibration_read_plan(user_data))
+       self.profiler.begin_run(bool(user_data.get('profile_run', False)))
+       self.profile_output_dir = f"{user_data.get('exp_dir', '').rstrip('/')}_CALIBRATED"
 
        # Reset monitoring
        self.last_read_position = 0
@@ -322,6 +372,7 @@ class ProcessingScreen(QWidget):
            os.remove(self.data_file_path)
        
        # Start monitoring and process
+       self.tracer.begin_run()
        self.file_monitor_timer.start(200)
        self._configure_and_start_process()
        
@@ -334,8 +385,19 @@ class ProcessingScreen(QWidget):
        self.pause_btn.setText("Pause ⏸")
        self.pause_btn.setEnabled(True)
        
-       # Set high priority after process starts
-       QTimer.singleShot(100, self._set_process_priority)
+       # Pin the process to the planned CPUs and start sampling it once it has started
+       QTimer.singleShot(100, self._apply_resource_plan)
+       QTimer.singleShot(100, self._start_telemetry)
+
+   def _set_comparison_columns(self, user_data):
+       """One "Dose <curve>" column per comparison curve of this run"""
+       self.compare_labels = [os.path.splitext(name)[0] for name in user_data.get('compare_cals', [])]
+       self.data_table.setColumnCount(self.base_column_count + len(self.compare_labels))
+       header = self.data_table.horizontalHeader()
+       for k, label in enumerate(self.compare_labels):
+           col = self.base_column_count + k
+           self.data_table.setHorizontalHeaderItem(col, QTableWidgetItem(f"Dose {label.replace('polynomial_calibration_', '')}"))
+           header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
 
    def _configure_and_start_process(self):
         """Configure and start Octave process"""
@@ -352,20 +414,34 @@ class ProcessingScreen(QWidget):
         else:
             self._setup_linux_process()
 
-   def _set_process_priority(self):
-        """Set high priority for Octave process"""
-        if not self.process or self.process.processId() == 0:
+   def _plan_resources(self, user_data):
+        """Size the Octave job (workers, BLAS threads, CPUs) for the films to be processed"""
+        exp_dir = user_data.get('exp_dir', '')
+        n_films = len(glob.glob(os.path.join(exp_dir, '*.tif*'))) if exp_dir else 0
+        cal_dir = user_data.get('cal_dir', '')
+        if cal_dir:
+            n_films = max(n_films, len(glob.glob(os.path.join(cal_dir, '*.tif*'))))
+        film_size = tif_film_size(exp_dir) if exp_dir else None
+        self.resource_plan = plan_resources(film_size, max(1, n_films),
+                                            user_data.get('single_precision', False))
+        self._append_console_output(self.resource_plan.describe())
+
+   def _octave_env_overrides(self):
+        """Resource plan and profiler environment for the Octave process"""
+        env = self.resource_plan.environment() if self.resource_plan else {}
+        return {**env, **self.profiler.environment()}
+
+   def _apply_resource_plan(self):
+        """Restrict the Octave process to the planned CPUs (normal priority keeps the GUI responsive)"""
+        if not self.process or self.process.processId() == 0 or not self.resource_plan:
             return
+        self.resource_plan.apply(self.process.processId())
         
-        try:
-            p = psutil.Process(self.process.processId())
-            if platform.system() == "Windows":
-                p.nice(psutil.REALTIME_PRIORITY_CLASS)
-            else:
-                p.nice(-20)
-        except:
-            pass
-        
+   def _start_telemetry(self):
+        """Sample the Octave process tree until it finishes"""
+        if self.process and self.process.processId() != 0:
+            self.sampler.start(self.process.processId())
+
    def _setup_windows_process(self):
         """Configure Windows process environment"""
         env = QProcessEnvironment.systemEnvironment()
@@ -382,6 +458,9 @@ class ProcessingScreen(QWidget):
         ]
         env.insert("PATH", current_path + ";" + ";".join(additional_paths))
         env.insert("OCTAVE_GUI_MODE", "1")
+        env.insert("OCTAVE_TRACE_FILE", self.tracer.octave_trace_file)
+        for name, value in self._octave_env_overrides().items():
+            env.insert(name, value)
         self.process.setProcessEnvironment(env)
 
         octave_command = (
@@ -402,9 +481,11 @@ class ProcessingScreen(QWidget):
            f"XAUTHORITY={os.environ.get('XAUTHORITY', '')}",
            f"XDG_RUNTIME_DIR={runtime_dir}",
            "OCTAVE_GUI_MODE=1",
+           f"OCTAVE_TRACE_FILE={self.tracer.octave_trace_file}",
            "QT_QPA_PLATFORM=offscreen",
            f"HOME={os.environ.get('HOME', '')}",
            "PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin",
+           *(f"{name}={value}" for name, value in self._octave_env_overrides().items()),
            "/usr/bin/octave",
            "--no-gui",
            "--eval",
@@ -424,6 +505,9 @@ class ProcessingScreen(QWidget):
         env = QProcessEnvironment()
         env.insert("PATH", "/usr/local/bin:/usr/bin:/bin")
         env.insert("HOME", os.environ.get('HOME', ''))
+        env.insert("OCTAVE_TRACE_FILE", self.tracer.octave_trace_file)
+        for name, value in self._octave_env_overrides().items():
+            env.insert(name, value)
         
         self.process.setProcessEnvironment(env)
         
@@ -469,13 +553,26 @@ class ProcessingScreen(QWidget):
 
            self._cleanup_temp_files()
            self._stop_timers()
+           self._finish_results_run(None)
            self._set_navigation_enabled(True)
            self._append_console_output("\n[PAUSED] Processing terminated by user.\n")
 
    def _on_process_finished(self, exit_code, exit_status):
        """Handle process completion"""
        self._stop_timers()
+       self.check_data_file()
        self._cleanup_temp_files()
+       self._finish_results_run(exit_code)
+
+       telemetry = self.sampler.summary()
+       if telemetry:
+           self._append_console_output(telemetry)
+       read_ahead = self.read_ahead.summary()
+       if read_ahead:
+           self._append_console_output(read_ahead)
+       trace_path, events = self.tracer.export()
+       self.trace_panel.show_summary(events, trace_path)
+       self._show_profile()
 
        if exit_code == 0:
            self.progress_bar.setValue(100)
@@ -487,6 +584,18 @@ class ProcessingScreen(QWidget):
        self.pause_btn.setEnabled(False)
        self.processing_finished.emit(exit_code, exit_status)
 
+   def _show_profile(self):
+       """Write the Octave profile of a profiled run next to the calibrated films and show it"""
+       try:
+           profile = self.profiler.export(self.profile_output_dir)
+       except (OSError, ValueError, KeyError, IndexError) as e:
+           self._append_console_output(f"[WARNING] Could not read the Octave profile: {str(e)}")
+           return
+       if profile:
+           rows, path = profile
+           self.profile_panel.show_profile(rows, path)
+           self._append_console_output(f"Octave profile saved to: {path}")
+
    def _cleanup_temp_files(self):
        """Remove temporary files"""
        temp_files = ["user_inputs.json", "octave_gui_data.txt"]
@@ -504,6 +613,8 @@ class ProcessingScreen(QWidget):
        self.timer.stop()
        self.file_monitor_timer.stop()
        self.keep_alive_timer.stop()
+       self.sampler.stop()
+       self.read_ahead.stop()
 
    def check_data_file(self):
        """Monitor data file for new entries"""
@@ -516,6 +627,7 @@ class ProcessingScreen(QWidget):
                new_lines = f.readlines()
                self.last_read_position = f.tell()
                
+               films = []
                for line in new_lines:
                    line = line.strip()
                    if line.startswith('[FILM_DATA]'):
@@ -523,12 +635,53 @@ class ProcessingScreen(QWidget):
                            json_str = line.replace('[FILM_DATA]', '').strip()
                            film_data = json.loads(json_str)
                            self._add_film_data(film_data)
+                           films.append(film_data)
                        except (ValueError, json.JSONDecodeError):
                            self._append_console_output(f"Invalid film data format: {line}\n")
+               self._store_film_data(films)
        
        except OSError:
            pass
 
+   def _begin_results_run(self, user_data):
+       """Record the run and its parameters in the results store"""
+       self.results_run = None
+       try:
+           if self.results_store is None:
+               self.results_store = ResultsStore(RESULTS_DB)
+           experiment, calibration = calibration_experiment(user_data)
+           self.results_run = self.results_store.begin_run('calibration', experiment, calibration, user_data)
+       except sqlite3.Error as e:
+           self._append_console_output(f"[WARNING] Results store unavailable: {str(e)}")
+
+   def _store_film_data(self, films):
+       """Stream the films read in this poll into the results store"""
+       if self.results_run is None or not films:
+           return
+       rows = [{"film": film.get('num', ''), "dose": film.get('dose'), "dose_std": film.get('std'),
+                "charge": film.get('charge')} for film in films]
+       try:
+           with self.tracer.span('results_store', 'io'):
+               self.results_store.add_calibration_films(self.results_run, rows)
+               for k, label in enumerate(self.compare_labels):
+                   compare_rows = [{**row, "dose": film['compare'][k].get('dose'),
+                                    "dose_std": film['compare'][k].get('std')}
+                                   for row, film in zip(rows, films) if len(film.get('compare', [])) > k]
+                   self.results_store.add_calibration_films(self.results_run, compare_rows, calibration=label)
+       except sqlite3.Error as e:
+           self._append_console_output(f"[WARNING] Could not store film results: {str(e)}")
+           self.results_run = None
+
+   def _finish_results_run(self, exit_code):
+       """Record the end of the run in the results store"""
+       if self.results_run is None:
+           return
+       try:
+           self.results_store.finish_run(self.results_run, exit_code)
+       except sqlite3.Error as e:
+           self._append_console_output(f"[WARNING] Could not store run status: {str(e)}")
+       self.results_run = None
+
    def _handle_stdout(self):
        """Process stdout output"""
        if not self.process:
@@ -569,6 +722,11 @@ class ProcessingScreen(QWidget):
        
        # Update progress indicators
        self._update_progress_from_output(raw_data)
+       
+       # Keep the read-ahead in step with the film Octave is reading
+       film_progress = FILM_PROGRESS.findall(raw_data)
+       if film_progress:
+           self.read_ahead.reached(int(film_progress[-1]) - 1)
 
    def _handle_stderr(self):
         """Filter and process stderr output"""
@@ -620,24 +778,32 @@ class ProcessingScreen(QWidget):
 
    def _add_film_data(self, film_data):
        """Add film data to results table"""
-       row_count = self.data_table.rowCount()
-       self.data_table.insertRow(row_count)
-       
-       # Populate row data
-       data_items = [
-           str(film_data.get('num', '')),
-           f"{film_data.get('dose', 0):.3f}",
-           f"{film_data.get('std', 0):.3f}",
-           f"{film_data.get('charge', 0):.2f}"
-       ]
-       
-       for col, value in enumerate(data_items):
-           item = QTableWidgetItem(value)
-           if col > 0:  # Center align numeric columns
-               item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-           self.data_table.setItem(row_count, col, item)
-       
-       self.data_table.scrollToBottom()
+       with self.tracer.span('table_update'):
+           row_count = self.data_table.rowCount()
+           self.data_table.insertRow(row_count)
+           
+           # Populate row data
+           data_items = [
+               str(film_data.get('num', '')),
+               f"{film_data.get('dose', 0):.3f}",
+               f"{film_data.get('std', 0):.3f}",
+               f"{film_data.get('charge', 0):.2f}"
+           ]
+           data_items += [f"{compare.get('dose', 0):.3f} ± {compare.get('std', 0):.3f}"
+                          for compare in film_data.get('compare', [])[:len(self.compare_labels)]]
+           
+           for col, value in enumerate(data_items):
+               item = QTableWidgetItem(value)
+               if col > 0:  # Center align numeric columns
+                   item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+               self.data_table.setItem(row_count, col, item)
+           
+           self.data_table.scrollToBottom()
+
+       tile_path = film_data.get('tile')
+       if tile_path:
+           with self.tracer.span('tile_update'):
+               self.montage_view.add_tile(tile_path, f"{film_data.get('num', '')}: {film_data.get('dose', 0):.3f} Gy")
 
    def _load_calibration_image(self):
        """Load calibration curve image"""
@@ -664,7 +830,8 @@ class ProcessingScreen(QWidget):
        self.current_image_path = image_path
        
        if os.path.exists(image_path):
-           pixmap = QPixmap(image_path)
+           with self.tracer.span('image_load'):
+               pixmap = QPixmap(image_path)
            if not pixmap.isNull():
                self.current_cal_pixmap = pixmap
                available_height = self.cal_image_label.height()
@@ -738,6 +905,10 @@ class ProcessingScreen(QWidget):
         """Reset UI to initial state"""
         self.console_output.clear()
         self.data_table.setRowCount(0)
+        self.montage_view.clear()
+        self.trace_panel.clear()
+        self.profile_panel.clear()
+        self.telemetry_strip.clear()
         self.progress_bar.setValue(0)
         self.elapsed_time_label.setText("Elapsed Time: 00.00 sec")
         self.cal_image_label.clear()
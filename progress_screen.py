@@ -1,21 +1,32 @@
 import os
+import json
 import time
 import platform
 import sys
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                             QLabel, QProgressBar, QTextEdit, QTableWidget, 
                             QTableWidgetItem, QSplitter, QHeaderView, QApplication,
-                            QSizePolicy)
+                            QSizePolicy, QComboBox, QSlider)
 from PyQt6.QtCore import Qt, QTimer, QProcess, QProcessEnvironment
 from PyQt6.QtGui import QFont
 import getpass
-import psutil
+import sqlite3
+from tracing import get_tracer, TraceSummaryPanel
+from report_renderer import (load_report_data, save_report_data, ReportRenderThread,
+                             REPORT_DATA_FILE, REPORT_PDF_FILE)
+from resource_governor import plan_resources, dose_cube_film_size
+from telemetry import ProcessTreeSampler, TelemetryStrip
+from results_store import ResultsStore, RESULTS_DB, analysis_experiment
+from roi_evaluator import RoiEvaluator, ROI_WINDOWS_DATA, ROI_WINDOWS_INDEX
+from read_ahead import FilmReadAhead, analysis_film_extents, FILMS_TO_LOAD, LOADING_FILM
+from octave_profile import OctaveProfiler, ProfilePanel
 
 class AnalysisProgressScreen(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.process = None
+        self.resource_plan = None
         self.start_time = None
         self.is_paused = False
         
@@ -31,6 +42,29 @@ class AnalysisProgressScreen(QWidget):
         # Buffer for stdout handling
         self.stdout_buffer = ""
         
+        # Span tracing (archive extraction is recorded by the analysis screen)
+        self.tracer = get_tracer('analysis')
+        self.sampler = ProcessTreeSampler(self.tracer, self)
+        self.read_ahead = FilmReadAhead(self.tracer)
+        self.profiler = OctaveProfiler('analysis')
+        self.read_ahead_names = []
+        
+        # PDF report, rendered from the report data Octave writes at the end of the run
+        self.report_data = None
+        self.report_thread = None
+        self.report_rerender_pending = False
+        
+        # ROI re-evaluation from the dose windows Octave stores around each centroid
+        self.roi_evaluator = None
+        
+        # Results store (opened on the first run)
+        self.results_store = None
+        self.results_run = None
+        self.run_params = {}
+        self.notes_timer = QTimer()
+        self.notes_timer.setSingleShot(True)
+        self.notes_timer.timeout.connect(self.save_notes_and_render)
+        
         # Initialize timers
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_elapsed_time)
@@ -42,6 +76,7 @@ class AnalysisProgressScreen(QWidget):
         self.keep_alive_timer.timeout.connect(lambda: QApplication.processEvents())
         
         self.setup_ui()
+        self.sampler.sampled.connect(self.telemetry_strip.add_sample)
            
     def setup_ui(self):
         """Initialize the main UI layout and components"""
@@ -167,13 +202,15 @@ class AnalysisProgressScreen(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         self.results_table = QTableWidget()
-        self.results_table.setColumnCount(9)
+        self.results_table.setColumnCount(10)
         headers = ["№", "File", "Charge, nC", "Dose, Gy", 
-                 "Dose CD, Gy", "x0, mm", "y0, mm", "xstd, mm", "ystd, mm"]
+                 "Dose CD, Gy", "x0, mm", "y0, mm", "xstd, mm", "ystd, mm", "Notes"]
         self.results_table.setHorizontalHeaderLabels(headers)
+        self.notes_column = 9
+        self.results_table.itemChanged.connect(self.on_results_item_changed)
         
         # Column width ratios
-        self.column_ratios = [0.6, 1.1, 2.2, 2.3, 2.3, 1.5, 1.5, 1.7, 1.7]
+        self.column_ratios = [0.6, 1.1, 2.2, 2.3, 2.3, 1.5, 1.5, 1.7, 1.7, 1.8]
         
         # Configure table appearance
         self.results_table.setAlternatingRowColors(True)
@@ -202,7 +239,35 @@ class AnalysisProgressScreen(QWidget):
         self.results_table.resizeEvent = lambda e: self.resize_table_columns()
         QTimer.singleShot(100, self.resize_table_columns)
         
+        # ROI re-evaluation controls, enabled once the analysis has stored its ROI windows
+        roi_row = QHBoxLayout()
+        roi_row.setSpacing(10)
+        roi_title = QLabel("Re-evaluate ROI:")
+        roi_title.setStyleSheet("font-weight: bold;")
+        self.roi_shape_combo = QComboBox()
+        self.roi_shape_combo.addItems(["circle", "square"])
+        self.roi_shape_combo.currentTextChanged.connect(self.reevaluate_roi)
+        self.roi_size_slider = QSlider(Qt.Orientation.Horizontal)
+        self.roi_size_slider.setRange(1, 100)  # 0.1 mm steps
+        self.roi_size_slider.valueChanged.connect(self.reevaluate_roi)
+        self.roi_size_label = QLabel("")
+        self.roi_size_label.setMinimumWidth(170)
+        roi_row.addWidget(roi_title)
+        roi_row.addWidget(self.roi_shape_combo)
+        roi_row.addWidget(self.roi_size_slider, stretch=1)
+        roi_row.addWidget(self.roi_size_label)
+        self.set_roi_controls_enabled(False)
+        
+        # Per-stage timing summary
+        self.trace_panel = TraceSummaryPanel()
+        
+        # Octave function timings of a profiled run
+        self.profile_panel = ProfilePanel()
+        
         layout.addWidget(self.results_table, stretch=1)
+        layout.addLayout(roi_row)
+        layout.addWidget(self.trace_panel)
+        layout.addWidget(self.profile_panel)
         return panel
     
     def resize_table_columns(self):
@@ -264,6 +329,7 @@ class AnalysisProgressScreen(QWidget):
         
         self.elapsed_label = QLabel("Elapsed Time: 00.00 sec")
         self.elapsed_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        self.telemetry_strip = TelemetryStrip()
         
         self.home_btn = QPushButton("🏠")
         self.home_btn.setFixedSize(40, 40)
@@ -292,6 +358,8 @@ class AnalysisProgressScreen(QWidget):
         footer_layout.addWidget(self.pause_btn)
         footer_layout.addSpacing(20)
         footer_layout.addWidget(self.elapsed_label)
+        footer_layout.addSpacing(10)
+        footer_layout.addWidget(self.telemetry_strip)
         footer_layout.addStretch()
         footer_layout.addWidget(self.home_btn)
         
@@ -308,6 +376,17 @@ class AnalysisProgressScreen(QWidget):
         # Reset file monitoring
         if os.path.exists(self.results_file_path):
             os.remove(self.results_file_path)
+        for stale_file in (REPORT_DATA_FILE, ROI_WINDOWS_DATA, ROI_WINDOWS_INDEX):
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+        self.report_data = None
+        self.tracer.begin_run()
+        self.run_params = self.load_run_parameters()
+        self.plan_resources(self.run_params)
+        self.begin_results_run(self.run_params)
+        self.read_ahead_names = []
+        self.read_ahead.start()
+        self.profiler.begin_run(bool(self.run_params.get('profile_run', 0)))
         
         # Start timers
         self.file_monitor_timer.start(500)
@@ -334,22 +413,42 @@ class AnalysisProgressScreen(QWidget):
         self.pause_btn.setText("Pause ⏸")
         self.pause_btn.setEnabled(True)
         
-        # Set high priority after process starts
-        QTimer.singleShot(100, self.set_process_priority)
+        # Pin the process to the planned CPUs and start sampling it once it has started
+        QTimer.singleShot(100, self.apply_resource_plan)
+        QTimer.singleShot(100, self.start_telemetry)
 
-    def set_process_priority(self):
-        """Set high priority for Octave process"""
-        if not self.process or self.process.processId() == 0:
-            return
-        
+    def load_run_parameters(self):
+        """Analysis parameters written by the analysis screen"""
         try:
-            p = psutil.Process(self.process.processId())
-            if platform.system() == "Windows":
-                p.nice(psutil.REALTIME_PRIORITY_CLASS)
-            else:
-                p.nice(-20)
-        except:
-            pass
+            with open(os.path.join('scripts', 'get_user_inputs.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def plan_resources(self, params):
+        """Size the Octave job (workers, BLAS threads, CPUs) for the films to be analyzed"""
+        n_films = len(params.get('main_nums', [])) + len(params.get('bg_nums', []))
+        # directory_films is relative to the scripts folder, where Octave runs
+        film_size = dose_cube_film_size(os.path.join('scripts', params.get('directory_films', '')))
+        self.resource_plan = plan_resources(film_size, max(1, n_films),
+                                            bool(params.get('single_precision', 0)))
+        self.console_output.append(self.resource_plan.describe())
+
+    def octave_env_overrides(self):
+        """Resource plan and profiler environment for the Octave process"""
+        env = self.resource_plan.environment() if self.resource_plan else {}
+        return {**env, **self.profiler.environment()}
+
+    def apply_resource_plan(self):
+        """Restrict the Octave process to the planned CPUs (normal priority keeps the GUI responsive)"""
+        if not self.process or self.process.processId() == 0 or not self.resource_plan:
+            return
+        self.resource_plan.apply(self.process.processId())
+
+    def start_telemetry(self):
+        """Sample the Octave process tree until it finishes"""
+        if self.process and self.process.processId() != 0:
+            self.sampler.start(self.process.processId())
 
     def setup_windows_process(self):
         """Configure process for Windows environment"""
@@ -362,6 +461,9 @@ class AnalysisProgressScreen(QWidget):
         additional_paths = [unzip_dir, "C:\\Windows\\System32"]
         env.insert("PATH", current_path + ";" + ";".join(additional_paths))
         env.insert("OCTAVE_GUI_MODE", "1")
+        env.insert("OCTAVE_TRACE_FILE", self.tracer.octave_trace_file)
+        for name, value in self.octave_env_overrides().items():
+            env.insert(name, value)
         self.process.setProcessEnvironment(env)
 
         octave_path = self.find_octave_executable()
@@ -376,6 +478,9 @@ class AnalysisProgressScreen(QWidget):
         env.insert("OCTAVE_GUI_MODE", "1")
         env.insert("LC_ALL", "C.UTF-8")
         env.insert("LANG", "C.UTF-8")
+        env.insert("OCTAVE_TRACE_FILE", self.tracer.octave_trace_file)
+        for name, value in self.octave_env_overrides().items():
+            env.insert(name, value)
         self.process.setProcessEnvironment(env)
         
         octave_command = "cd('scripts'); pkg load io image; try analyze_shots_films_MOD_centering_Charge_Density_bgnd(); catch err error(['Error: ', err.message]); end"
@@ -392,6 +497,9 @@ class AnalysisProgressScreen(QWidget):
         env = QProcessEnvironment()
         env.insert("PATH", "/usr/local/bin:/usr/bin:/bin")
         env.insert("HOME", os.environ.get('HOME', ''))
+        env.insert("OCTAVE_TRACE_FILE", self.tracer.octave_trace_file)
+        for name, value in self.octave_env_overrides().items():
+            env.insert(name, value)
         
         self.process.setProcessEnvironment(env)
         
@@ -430,6 +538,11 @@ class AnalysisProgressScreen(QWidget):
         """Reset UI elements to initial state"""
         self.console_output.clear()
         self.results_table.setRowCount(0)
+        self.roi_evaluator = None
+        self.set_roi_controls_enabled(False)
+        self.trace_panel.clear()
+        self.profile_panel.clear()
+        self.telemetry_strip.clear()
         self.progress_bar.setValue(0)
         self.elapsed_label.setText("Elapsed Time: 00.00 sec")
         self.stdout_buffer = ""
@@ -460,6 +573,11 @@ class AnalysisProgressScreen(QWidget):
             
             if not line.strip():
                 continue
+
+            # The read plan is for the read-ahead only
+            if line.startswith(FILMS_TO_LOAD):
+                self.plan_read_ahead(line[len(FILMS_TO_LOAD):])
+                continue
                 
             cursor = self.console_output.textCursor()
             cursor.movePosition(cursor.MoveOperation.End)
@@ -501,6 +619,22 @@ class AnalysisProgressScreen(QWidget):
             error_text = '\n'.join(filtered_lines)
             self.console_output.append(f"ERROR: {error_text}")
 
+    def plan_read_ahead(self, names):
+        """Octave will load these films from disk ('|'-separated), after the ones announced before"""
+        names = [name for name in names.strip().split('|') if name]
+        extents = analysis_film_extents(self.run_params, names)
+        located = [name for name in names if name in extents]
+        self.read_ahead_names += located
+        self.read_ahead.extend([extents[name] for name in located])
+
+    def read_ahead_reached(self, name):
+        """Octave is loading film `name` from disk"""
+        position = self.read_ahead.position
+        for index in range(position + 1, len(self.read_ahead_names)):
+            if self.read_ahead_names[index] == name:
+                self.read_ahead.reached(index)
+                return
+
     def update_progress_from_output(self, output):
         """Update progress based on console output"""
         lines = output.strip().split('\n')
@@ -508,7 +642,9 @@ class AnalysisProgressScreen(QWidget):
         for line in lines:
             line = line.strip()
             
-            if "Processing main image set" in line:
+            if line.startswith(LOADING_FILM):
+                self.read_ahead_reached(line[len(LOADING_FILM):])
+            elif "Processing main image set" in line:
                 self.progress_bar.setValue(10)
             elif line.startswith("Processed main image"):
                 parts = line.split()
@@ -554,6 +690,13 @@ class AnalysisProgressScreen(QWidget):
 
     def update_results_table(self, data_lines):
         """Update results table with new data"""
+        first_new_row = self.results_table.rowCount()
+        with self.tracer.span('table_update'):
+            self._append_result_rows(data_lines)
+        self.store_result_rows(data_lines[first_new_row:])
+
+    def _append_result_rows(self, data_lines):
+        """Append rows not yet shown in the results table"""
         current_rows = self.results_table.rowCount()
         
         for i in range(current_rows, len(data_lines)):
@@ -591,6 +734,10 @@ class AnalysisProgressScreen(QWidget):
                 
                 y0 = f"{float(parts[10]):.2f}"
                 self.results_table.setItem(i, 8, QTableWidgetItem(y0))
+                
+                self.results_table.blockSignals(True)
+                self.results_table.setItem(i, self.notes_column, QTableWidgetItem(""))
+                self.results_table.blockSignals(False)
 
     # Process control methods
     def toggle_pause(self):
@@ -606,6 +753,7 @@ class AnalysisProgressScreen(QWidget):
 
             self.cleanup_temp_files()
             self.stop_timers()
+            self.finish_results_run(None)
             self.set_navigation_enabled(True)
             self.console_output.append("\n[PAUSED] Processing terminated by user.\n")
 
@@ -621,19 +769,207 @@ class AnalysisProgressScreen(QWidget):
             self.console_output.setTextCursor(cursor)
             self.update_progress_from_output(self.stdout_buffer)
             
+        # Read the last rows before the results file is removed
+        self.check_results_file()
         self.cleanup_temp_files()
 
         # Update UI based on exit status
         if exit_code == 0:
             self.progress_bar.setValue(100)
-            self.check_results_file()
+            self.load_report_data()
+            self.load_roi_windows()
         else:
             self.console_output.append(f"\n=== Analysis failed with exit code {exit_code} ===")
+        self.finish_results_run(exit_code)
+
+        telemetry = self.sampler.summary()
+        if telemetry:
+            self.console_output.append(telemetry)
+        read_ahead = self.read_ahead.summary()
+        if read_ahead:
+            self.console_output.append(read_ahead)
+        trace_path, events = self.tracer.export()
+        self.trace_panel.show_summary(events, trace_path)
+        self.show_profile()
 
         self.set_navigation_enabled(True)
         self.pause_btn.setText("Pause  ▶")
         self.pause_btn.setEnabled(False)
 
+    # Report methods
+    def load_report_data(self):
+        """Load the report data written by Octave and render the PDF report"""
+        if not os.path.exists(REPORT_DATA_FILE):
+            return
+        
+        try:
+            self.report_data = load_report_data(REPORT_DATA_FILE)
+        except (OSError, ValueError) as e:
+            self.console_output.append(f"[WARNING] Could not read report data: {str(e)}")
+            return
+        
+        # Show notes in the editable Notes column
+        self.results_table.blockSignals(True)
+        for row, note in enumerate(self.report_data["film_notes"][:self.results_table.rowCount()]):
+            self.results_table.setItem(row, self.notes_column, QTableWidgetItem(note))
+        self.results_table.blockSignals(False)
+        
+        self.render_report()
+
+    def render_report(self):
+        """Render the PDF report on a background thread"""
+        if self.report_data is None:
+            return
+        
+        if self.report_thread and self.report_thread.isRunning():
+            self.report_rerender_pending = True
+            return
+        
+        self.console_output.append("Rendering PDF report...")
+        report_data = dict(self.report_data, film_notes=list(self.report_data["film_notes"]))
+        self.report_thread = ReportRenderThread(report_data, REPORT_PDF_FILE, self)
+        self.report_thread.report_ready.connect(self.on_report_ready)
+        self.report_thread.report_failed.connect(self.on_report_failed)
+        self.report_thread.finished.connect(self.on_report_thread_finished)
+        self.report_thread.start()
+
+    # Results store methods
+    def begin_results_run(self, params):
+        """Record the run and its parameters in the results store"""
+        self.results_run = None
+        try:
+            if self.results_store is None:
+                self.results_store = ResultsStore(RESULTS_DB)
+            experiment = analysis_experiment(params)
+            calibration = self.results_store.latest_calibration(experiment)
+            self.results_run = self.results_store.begin_run('analysis', experiment, calibration, params)
+        except sqlite3.Error as e:
+            self.console_output.append(f"[WARNING] Results store unavailable: {str(e)}")
+
+    def store_result_rows(self, data_lines):
+        """Stream the result rows read in this poll into the results store"""
+        if self.results_run is None or not data_lines:
+            return
+        
+        # Sweep rows are labeled with their setting; their ROI is part of the label
+        sweep = bool(self.run_params.get('sweep'))
+        roi_shape = None if sweep else self.run_params.get('roi_shape')
+        roi_size = None if sweep else self.run_params.get('roi_size')
+        rows = []
+        for line in data_lines:
+            parts = line.split('\t')
+            if len(parts) < 11:
+                continue
+            try:
+                values = [float(value) for value in parts[2:11]]
+            except ValueError:
+                continue
+            rows.append(dict(zip(["charge", "dose_with_bg", "dose_with_bg_std", "dose_cd", "dose_cd_std",
+                                  "x0", "y0", "xstd", "ystd"], values),
+                             film=parts[1], roi_shape=roi_shape, roi_size=roi_size))
+        try:
+            with self.tracer.span('results_store', 'io'):
+                self.results_store.add_analysis_films(self.results_run, rows)
+        except sqlite3.Error as e:
+            self.console_output.append(f"[WARNING] Could not store film results: {str(e)}")
+            self.results_run = None
+
+    def finish_results_run(self, exit_code):
+        """Record the end of the run in the results store"""
+        if self.results_run is None:
+            return
+        try:
+            self.results_store.finish_run(self.results_run, exit_code)
+        except sqlite3.Error as e:
+            self.console_output.append(f"[WARNING] Could not store run status: {str(e)}")
+        self.results_run = None
+
+    # ROI re-evaluation methods
+    def load_roi_windows(self):
+        """Load the stored ROI windows and set the controls to the ROI of the run"""
+        if not (os.path.exists(ROI_WINDOWS_DATA) and os.path.exists(ROI_WINDOWS_INDEX)):
+            return
+        
+        try:
+            with self.tracer.span('roi_windows_load', 'io'):
+                evaluator = RoiEvaluator(ROI_WINDOWS_DATA, ROI_WINDOWS_INDEX)
+        except (OSError, ValueError, KeyError) as e:
+            self.console_output.append(f"[WARNING] Could not read ROI windows: {str(e)}")
+            return
+        if len(evaluator) != self.results_table.rowCount():
+            return
+        
+        # Set the run's ROI without evaluating it: the table already shows its results
+        self.roi_shape_combo.blockSignals(True)
+        self.roi_size_slider.blockSignals(True)
+        self.roi_shape_combo.setCurrentText(evaluator.roi_shape)
+        self.roi_size_slider.setMaximum(max(1, int(round(evaluator.max_roi_mm * 10))))
+        self.roi_size_slider.setValue(int(round(evaluator.roi_size * 10)))
+        self.roi_shape_combo.blockSignals(False)
+        self.roi_size_slider.blockSignals(False)
+        
+        self.roi_evaluator = evaluator
+        self.roi_size_label.setText(f"{evaluator.roi_size:.1f} mm (analysis)")
+        self.set_roi_controls_enabled(True)
+
+    def reevaluate_roi(self):
+        """Recompute the dose columns of the results table for the selected ROI"""
+        if self.roi_evaluator is None:
+            return
+        
+        roi_size = self.roi_size_slider.value() / 10
+        roi_shape = self.roi_shape_combo.currentText()
+        start = time.perf_counter()
+        results = self.roi_evaluator.evaluate(roi_size, roi_shape)
+        
+        self.results_table.blockSignals(True)
+        for row, (dose_bg, dose_bg_std, dose_cd, dose_cd_std) in enumerate(results):
+            self.results_table.setItem(row, 3, QTableWidgetItem(f"{dose_bg:.2f} ± {dose_bg_std:.2f}"))
+            self.results_table.setItem(row, 4, QTableWidgetItem(f"{dose_cd:.2f} ± {dose_cd_std:.2f}"))
+        self.results_table.blockSignals(False)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.roi_size_label.setText(f"{roi_size:.1f} mm ({elapsed_ms:.1f} ms)")
+
+    def set_roi_controls_enabled(self, enabled):
+        """Enable or disable the ROI re-evaluation controls"""
+        self.roi_shape_combo.setEnabled(enabled)
+        self.roi_size_slider.setEnabled(enabled)
+        if not enabled:
+            self.roi_size_label.setText("available after the analysis")
+
+    def on_report_ready(self, pdf_path, seconds):
+        """Report the rendered PDF"""
+        self.console_output.append(f"PDF report saved to {pdf_path} ({seconds:.2f} s)")
+
+    def on_report_failed(self, message):
+        """Report a rendering error"""
+        self.console_output.append(f"[ERROR] PDF report rendering failed: {message}")
+
+    def on_report_thread_finished(self):
+        """Render again if notes changed while rendering"""
+        if self.report_rerender_pending:
+            self.report_rerender_pending = False
+            self.render_report()
+
+    def on_results_item_changed(self, item):
+        """Re-render the report shortly after a note is edited"""
+        if item.column() != self.notes_column or self.report_data is None:
+            return
+        
+        row = item.row()
+        if row < len(self.report_data["film_notes"]):
+            self.report_data["film_notes"][row] = item.text().strip()
+            self.notes_timer.start(300)
+
+    def save_notes_and_render(self):
+        """Store edited notes with the report data and re-render the PDF"""
+        try:
+            save_report_data(self.report_data, REPORT_DATA_FILE)
+        except OSError as e:
+            self.console_output.append(f"[WARNING] Could not save notes: {str(e)}")
+        self.render_report()
+
     def cleanup_temp_files(self):
         """Remove temporary files"""
         temp_files = [
@@ -648,11 +984,25 @@ class AnalysisProgressScreen(QWidget):
                 except Exception as e:
                     self.console_output.append(f"[WARNING] Failed to delete {file_path}: {str(e)}")
 
+    def show_profile(self):
+        """Write the Octave profile of a profiled run next to the analysis outputs and show it"""
+        try:
+            profile = self.profiler.export('scripts')
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            self.console_output.append(f"[WARNING] Could not read the Octave profile: {str(e)}")
+            return
+        if profile:
+            rows, path = profile
+            self.profile_panel.show_profile(rows, path)
+            self.console_output.append(f"Octave profile saved to: {path}")
+
     def stop_timers(self):
         """Stop all active timers"""
         self.timer.stop()
         self.file_monitor_timer.stop()
         self.keep_alive_timer.stop()
+        self.sampler.stop()
+        self.read_ahead.stop()
 
     # Navigation methods
     def set_navigation_enabled(self, enabled):
@@ -0,0 +1,250 @@
+import os
+import re
+import glob
+import json
+import time
+import queue
+import threading
+import psutil
+
+READ_AHEAD_DEPTH = 2
+READ_CHUNK_BYTES = 4 * 2**20
+# Films waiting in the page cache may take at most this share of the available memory
+READ_AHEAD_MEMORY_FRACTION = 0.25
+# Console lines of the analysis: the films it will load from disk, and each load
+FILMS_TO_LOAD = 'Films to load: '
+LOADING_FILM = 'Loading film '
+
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def _whole_file(path):
+    """Extent (path, offset, length) covering a whole file"""
+    return (path, 0, os.path.getsize(path))
+
+
+def calibration_read_plan(user_data):
+    """Extents in the order the calibration stage reads them (user_inputs.json).
+
+    processExperimentalFilms reads the experimental films in name order (Octave's dir);
+    analyzeLeadRegion then reads the lead films again, so they are listed once more at
+    the end and kept in the page cache.
+    """
+    exp_dir = user_data.get('exp_dir', '')
+    if not exp_dir or not os.path.isdir(exp_dir):
+        return []
+    paths = sorted(glob.glob(os.path.join(exp_dir, '*.tif')), key=os.path.basename)
+    extents = [_whole_file(path) for path in paths]
+
+    names = [os.path.basename(path) for path in paths]
+    for number in user_data.get('lead_films', []):
+        pattern = re.compile(rf'[A-Z]_?{int(number):03d}(\D|$)')
+        match = next((i for i, name in enumerate(names) if pattern.search(name)), None)
+        if match is not None:
+            extents.append(extents[match])
+    return extents
+
+
+def analysis_film_extents(params, names, script_dir='scripts'):
+    """Extents of the named films of the analysis directory (get_user_inputs.json), by name.
+
+    The analysis announces the films it will read from disk ("Films to load: a|b|..."),
+    leaving out films whose intermediates are in the film cache; a film in the dose cube
+    is read from its offset in the cube, as load_calibrated_film does. Films that cannot
+    be located are left out.
+    """
+    directory = os.path.normpath(os.path.join(script_dir, params.get('directory_films', '')))
+    if not params.get('directory_films') or not os.path.isdir(directory):
+        return {}
+
+    cube = {}
+    cube_file = os.path.join(directory, 'dose_cube.f32')
+    try:
+        with open(os.path.join(directory, 'dose_cube.json'), 'r') as f:
+            index = json.load(f)
+        cube_names = index['names'] if isinstance(index['names'], list) else [index['names']]
+        film_bytes = int(index['height']) * int(index['width']) * 4
+        if os.path.getsize(cube_file) == len(cube_names) * film_bytes:
+            cube = {name: (cube_file, k * film_bytes, film_bytes) for k, name in enumerate(cube_names)}
+    except (OSError, KeyError, ValueError, TypeError):
+        pass
+
+    extents = {}
+    for name in names:
+        path = os.path.join(directory, name)
+        if name in cube:
+            extents[name] = cube[name]
+        elif os.path.isfile(path):
+            extents[name] = _whole_file(path)
+    return extents
+
+
+class FilmReadAhead:
+    """Warms the page cache a few films ahead of the Octave process and drops finished films.
+
+    The screens know the order in which Octave reads the films (a list of extents: path,
+    offset, length), up front or as Octave announces them (extend()), and report its
+    position from the console output with reached(). A
+    background thread reads the next `depth` extents (after posix_fadvise WILLNEED where
+    available), so the synchronous imread/load in Octave finds them in memory; extents
+    that will not be read again are released with posix_fadvise DONTNEED, so long
+    campaigns do not evict everything else from the cache.
+    """
+
+    def __init__(self, tracer, depth=READ_AHEAD_DEPTH):
+        self.tracer = tracer
+        self.depth = depth
+        self.thread = None
+        self.run = _ReadAheadRun([])
+
+    @property
+    def position(self):
+        """Index of the extent Octave is reading (-1 before the first)"""
+        return self.run.position
+
+    def start(self, extents=()):
+        """Begin a run that reads `extents` in order"""
+        self.stop()
+        self.run = _ReadAheadRun(list(extents))
+        self.run.budget = int(psutil.virtual_memory().available * READ_AHEAD_MEMORY_FRACTION)
+        # The worker only touches the state of its own run, so a worker of an earlier run
+        # still finishing a slow read cannot take work or counts from this one
+        self.thread = threading.Thread(target=self._worker, args=(self.run,), name='film-read-ahead', daemon=True)
+        self.thread.start()
+        self._queue_ahead(0)
+
+    def extend(self, extents):
+        """Octave will read `extents` after the ones already planned"""
+        if self.thread is None:
+            return
+        run = self.run
+        for extent in extents:
+            run.last_use[extent] = len(run.extents)
+            run.extents.append(extent)
+        self._queue_ahead(run.position + 1)
+
+    def reached(self, index):
+        """Octave has started reading extent `index`"""
+        run = self.run
+        if self.thread is None or index <= run.position or index >= len(run.extents):
+            return
+        for i in range(max(run.position, 0), index):
+            if run.last_use[run.extents[i]] == i:
+                self._drop(run.extents[i])
+        run.position = index
+        run.reached_count += 1
+        if index in run.ready:
+            run.hits += 1
+        self._queue_ahead(index + 1)
+
+    def stop(self):
+        """End the run; the read-ahead spans go to the tracer"""
+        if self.thread is None:
+            return
+        run = self.run
+        run.stopping.set()
+        run.pending.put(None)
+        self.thread.join(timeout=1.0)
+        self.thread = None
+        for name, start, duration in list(run.spans):
+            self.tracer.add_span(name, start, duration, 'io')
+        run.spans = []
+
+    def summary(self):
+        """One-line summary of the run, or None if nothing was read ahead"""
+        run = self.run
+        if not run.reached_count and not run.prefetched_bytes:
+            return None
+        text = (f"[Read-ahead] {run.hits}/{run.reached_count} films already cached when reached, "
+                f"{_format_bytes(run.prefetched_bytes)} read ahead in {run.prefetch_seconds:.1f} s")
+        if run.dropped_bytes:
+            text += f", {_format_bytes(run.dropped_bytes)} of finished films released from the cache"
+        if run.skipped:
+            text += f", {run.skipped} films skipped (larger than the read-ahead budget)"
+        return text
+
+    def _queue_ahead(self, first):
+        run = self.run
+        for i in range(first, min(first + self.depth, len(run.extents))):
+            if i not in run.queued:
+                run.queued.add(i)
+                run.pending.put(i)
+
+    def _drop(self, extent):
+        path, offset, length = extent
+        if not _HAS_FADVISE:
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+            self.run.dropped_bytes += length
+        except OSError:
+            pass
+
+    def _worker(self, run):
+        buffer = bytearray(READ_CHUNK_BYTES)
+        while not run.stopping.is_set():
+            index = run.pending.get()
+            if index is None:
+                return
+            if index <= run.position:
+                continue  # Octave got there first
+            path, offset, length = run.extents[index]
+            if length * min(self.depth, len(run.extents)) > run.budget:
+                run.skipped += 1
+                continue
+
+            start = time.time()
+            try:
+                with open(path, 'rb', buffering=0) as f:
+                    if _HAS_FADVISE:
+                        os.posix_fadvise(f.fileno(), offset, length, os.POSIX_FADV_WILLNEED)
+                    f.seek(offset)
+                    remaining = length
+                    view = memoryview(buffer)
+                    while remaining > 0 and not run.stopping.is_set():
+                        n = f.readinto(view[:min(remaining, READ_CHUNK_BYTES)])
+                        if not n:
+                            break
+                        remaining -= n
+            except OSError:
+                continue
+            duration = time.time() - start
+            run.prefetch_seconds += duration
+            run.prefetched_bytes += length - remaining
+            run.spans.append((f'read_ahead {os.path.basename(path)}', start, duration))
+            if remaining <= 0:
+                run.ready.add(index)
+
+
+class _ReadAheadRun:
+    """State of one read-ahead run, shared by the screen and that run's worker thread only"""
+
+    def __init__(self, extents):
+        self.extents = extents
+        self.last_use = {}
+        for i, extent in enumerate(extents):
+            self.last_use[extent] = i
+        self.position = -1
+        self.queued = set()
+        self.ready = set()
+        self.reached_count = 0
+        self.hits = 0
+        self.skipped = 0
+        self.prefetched_bytes = 0
+        self.prefetch_seconds = 0.0
+        self.dropped_bytes = 0
+        self.spans = []
+        self.budget = 0
+        self.pending = queue.Queue()
+        self.stopping = threading.Event()
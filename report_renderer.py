@@ -0,0 +1,553 @@
+import os
+import json
+import time
+import math
+import statistics
+from PyQt6.QtCore import Qt, QThread, QRectF, QPointF, QLineF, QMarginsF, QSize, pyqtSignal
+from PyQt6.QtGui import (QPdfWriter, QPainter, QPageSize, QPageLayout, QPen, QBrush,
+                         QColor, QFont, QImage, QPolygonF, QFontMetricsF)
+
+PDF_RESOLUTION = 300
+IMAGE_DPI = 150        # Embedded images are downsampled to this resolution
+MAX_X_TICKS = 25       # Film-number ticks are thinned beyond this count
+TABLE_ROW_HEIGHT = 0.035
+
+REPORT_DATA_FILE = os.path.join("scripts", "analysis_report_data.json")
+REPORT_PDF_FILE = os.path.join("scripts", "analysis_report.pdf")
+
+SERIES_FIELDS = [
+    "Dose_CD_all", "Dose_CD_std_all", "Dose_with_BGND_Gy_all", "Dose_with_BGND_Gy_std_all",
+    "Dose_Gy_all", "Dose_Gy_std_all", "Dose_ROI_mask_all", "Dose_ROI_mask_std_all",
+    "x0_all", "y0_all", "xstd_all", "ystd_all", "chargeAll"
+]
+
+
+def _as_list(data, field):
+    """Field of the report data as a list; jsonencode writes 1-element vectors as scalars
+    and NaN as null, so a present null is one NaN and only a missing field is empty"""
+    if field not in data:
+        return []
+    value = data[field]
+    if not isinstance(value, list):
+        value = [value]
+    return [float('nan') if v is None else v for v in value]
+
+
+def _rgb(r, g, b):
+    return QColor.fromRgbF(r, g, b)
+
+
+def load_report_data(path=REPORT_DATA_FILE):
+    """Read the report inputs written by write_report_data.m"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for field in SERIES_FIELDS:
+        data[field] = [float(v) for v in _as_list(data, field)]
+    data["film_names"] = [str(v) for v in _as_list(data, "film_names")]
+    data["selected_masks"] = [int(v) for v in _as_list(data, "selected_masks")]
+
+    notes = [("" if v is None else str(v)) for v in _as_list(data, "film_notes")]
+    notes += [""] * (len(data["film_names"]) - len(notes))
+    data["film_notes"] = notes
+
+    # Image paths are relative to the directory Octave ran in
+    roi_image_path = data.get("roi_image_path") or ""
+    if roi_image_path and not os.path.isabs(roi_image_path):
+        roi_image_path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), roi_image_path))
+    data["roi_image_path"] = roi_image_path
+    return data
+
+
+def save_report_data(data, path=REPORT_DATA_FILE):
+    """Write back report inputs (e.g. after editing notes)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def _mean_std(values):
+    """Mean and sample standard deviation, as Octave mean/std"""
+    values = [v for v in values if v == v]
+    if not values:
+        return float('nan'), float('nan')
+    mean = statistics.fmean(values)
+    std = statistics.stdev(values) if len(values) > 1 else 0.0
+    return mean, std
+
+
+def _ratios(numerators, denominators):
+    return [n / d if d else float('nan') for n, d in zip(numerators, denominators)]
+
+
+def _nice_ticks(lo, hi, count=6):
+    """Round tick values; the first and last ticks enclose [lo, hi]"""
+    if hi <= lo:
+        hi = lo + 1.0
+    raw = (hi - lo) / count
+    magnitude = 10.0 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.floor(lo / step + 1e-9)
+    last = math.ceil(hi / step - 1e-9)
+    return [round(k * step, 10) for k in range(first, last + 1)]
+
+
+def _film_ticks(n):
+    """Film numbers to label on the x axis: every film up to MAX_X_TICKS, evenly thinned beyond"""
+    step = max(1, math.ceil(n / MAX_X_TICKS))
+    return list(range(1, n + 1, step))
+
+
+_image_cache = {}
+
+
+def _report_image(path, size):
+    """Load an image downsampled to fit `size` pixels, cached by file and size"""
+    try:
+        key = (path, os.stat(path).st_mtime_ns, size.width(), size.height())
+    except OSError:
+        return QImage()
+
+    if key not in _image_cache:
+        image = QImage(path)
+        if not image.isNull() and (image.width() > size.width() or image.height() > size.height()):
+            image = image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        if len(_image_cache) >= 8:
+            _image_cache.pop(next(iter(_image_cache)))
+        _image_cache[key] = image
+    return _image_cache[key]
+
+
+class ReportPainter:
+    """Draws the three report pages with the layout of generate_analysis_report.m"""
+
+    def __init__(self, painter, page_rect):
+        self.painter = painter
+        self.page = page_rect
+
+    # Coordinates: figure positions are [left bottom width height] fractions, as in Octave
+    def figure_rect(self, left, bottom, width, height):
+        w = self.page.width()
+        h = self.page.height()
+        return QRectF(self.page.left() + left * w, self.page.top() + (1 - bottom - height) * h,
+                      width * w, height * h)
+
+    def font(self, size, bold=False):
+        font = QFont("Helvetica")
+        font.setPointSizeF(size)
+        font.setBold(bold)
+        self.painter.setFont(font)
+        return font
+
+    def pen(self, color, width_pt=1.0, style=Qt.PenStyle.SolidLine):
+        pen = QPen(color, width_pt * PDF_RESOLUTION / 72.0, style)
+        self.painter.setPen(pen)
+        return pen
+
+    def text(self, x, y, text, size, bold=False, align=Qt.AlignmentFlag.AlignLeft):
+        """Draw text vertically centred on y; align controls anchoring at x"""
+        self.font(size, bold)
+        metrics = QFontMetricsF(self.painter.font())
+        width = metrics.horizontalAdvance(text)
+        if align == Qt.AlignmentFlag.AlignHCenter:
+            x -= width / 2
+        elif align == Qt.AlignmentFlag.AlignRight:
+            x -= width
+        self.painter.drawText(QPointF(x, y + metrics.ascent() / 2 - metrics.descent() / 2), text)
+
+    def marker(self, point, shape, size, color, filled):
+        p = self.painter
+        r = size / 2
+        p.setBrush(QBrush(color) if filled else Qt.BrushStyle.NoBrush)
+        if shape == 'o':
+            p.drawEllipse(point, r, r)
+        elif shape == 's':
+            p.drawRect(QRectF(point.x() - r, point.y() - r, size, size))
+        elif shape == 'd':
+            p.drawPolygon(QPolygonF([QPointF(point.x(), point.y() - r), QPointF(point.x() + r, point.y()),
+                                     QPointF(point.x(), point.y() + r), QPointF(point.x() - r, point.y())]))
+        elif shape == '^':
+            p.drawPolygon(QPolygonF([QPointF(point.x(), point.y() - r), QPointF(point.x() + r, point.y() + r),
+                                     QPointF(point.x() - r, point.y() + r)]))
+        elif shape in ('x', '*'):
+            p.drawLine(QPointF(point.x() - r, point.y() - r), QPointF(point.x() + r, point.y() + r))
+            p.drawLine(QPointF(point.x() - r, point.y() + r), QPointF(point.x() + r, point.y() - r))
+            if shape == '*':
+                p.drawLine(QPointF(point.x() - r, point.y()), QPointF(point.x() + r, point.y()))
+                p.drawLine(QPointF(point.x(), point.y() - r), QPointF(point.x(), point.y() + r))
+        p.setBrush(Qt.BrushStyle.NoBrush)
+
+    def plot(self, rect, n, series, title, ylabel, hlines=(), xlabel='Film #'):
+        """Line plot over film index 1..n with optional error bars and horizontal reference lines.
+
+        series: dicts with label, values, color, marker and optional errors, width, filled.
+        hlines: dicts with label, value, style (drawn across the full x range).
+        """
+        p = self.painter
+        pt = PDF_RESOLUTION / 72.0
+
+        # Data range, including error bars and reference lines
+        points = []
+        for s in series:
+            errors = s.get("errors") or [0] * len(s["values"])
+            for v, e in zip(s["values"], errors):
+                if v == v:
+                    points.extend([v - abs(e), v + abs(e)])
+        points.extend(h["value"] for h in hlines if h["value"] == h["value"])
+        lo, hi = (min(points), max(points)) if points else (0.0, 1.0)
+        if hi == lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        y_ticks = _nice_ticks(lo, hi)
+        y_lo, y_hi = y_ticks[0], y_ticks[-1]
+        x_lo, x_hi = 0.5, n + 0.5
+
+        def to_px(x, y):
+            return QPointF(rect.left() + (x - x_lo) / (x_hi - x_lo) * rect.width(),
+                           rect.bottom() - (y - y_lo) / (y_hi - y_lo) * rect.height())
+
+        # Grid and ticks
+        self.pen(QColor(220, 220, 220), 0.5)
+        x_ticks = _film_ticks(n)
+        p.drawLines([QLineF(to_px(x, y_lo), to_px(x, y_hi)) for x in x_ticks] +
+                    [QLineF(to_px(x_lo, y), to_px(x_hi, y)) for y in y_ticks])
+
+        self.pen(QColor(38, 38, 38), 0.5)
+        p.drawRect(rect)
+        for x in x_ticks:
+            anchor = to_px(x, y_lo)
+            self.text(anchor.x(), anchor.y() + 7 * pt, str(x), 8, align=Qt.AlignmentFlag.AlignHCenter)
+        for y in y_ticks:
+            anchor = to_px(x_lo, y)
+            self.text(anchor.x() - 3 * pt, anchor.y(), f"{y:g}", 8, align=Qt.AlignmentFlag.AlignRight)
+
+        self.text(rect.center().x(), rect.bottom() + 19 * pt, xlabel, 9, align=Qt.AlignmentFlag.AlignHCenter)
+        self.text(rect.center().x(), rect.top() - 9 * pt, title, 10, align=Qt.AlignmentFlag.AlignHCenter)
+        p.save()
+        p.translate(rect.left() - 30 * pt, rect.center().y())
+        p.rotate(-90)
+        self.text(0, 0, ylabel, 9, align=Qt.AlignmentFlag.AlignHCenter)
+        p.restore()
+
+        # Reference lines and data
+        p.save()
+        p.setClipRect(rect)
+        for h in hlines:
+            self.pen(_rgb(0.5, 0.5, 0.5), 1.2, h.get("style", Qt.PenStyle.DashLine))
+            p.drawLine(to_px(x_lo, h["value"]), to_px(x_hi, h["value"]))
+
+        for s in series:
+            color = s["color"]
+            width = s.get("width", 1.2)
+            values = s["values"]
+            if s.get("errors"):
+                self.pen(s.get("error_color", color), width)
+                cap = 2 * pt
+                bars = []
+                for i, (v, e) in enumerate(zip(values, s["errors"])):
+                    if v != v:
+                        continue
+                    top, bottom = to_px(i + 1, v + e), to_px(i + 1, v - e)
+                    bars += [QLineF(top, bottom),
+                             QLineF(top.x() - cap, top.y(), top.x() + cap, top.y()),
+                             QLineF(bottom.x() - cap, bottom.y(), bottom.x() + cap, bottom.y())]
+                p.drawLines(bars)
+
+            self.pen(color, width)
+            line = QPolygonF([to_px(i + 1, v) for i, v in enumerate(values) if v == v])
+            p.drawPolyline(line)
+            for point in line:
+                self.marker(point, s["marker"], s.get("size", 4.5) * pt, color, s.get("filled", True))
+        p.restore()
+
+        # Legend (horizontal, top centre)
+        entries = [(s["label"], s) for s in series] + [(h["label"], h) for h in hlines]
+        self.font(7)
+        metrics = QFontMetricsF(p.font())
+        sample = 14 * pt
+        widths = [sample + 3 * pt + metrics.horizontalAdvance(label) + 8 * pt for label, _ in entries]
+        legend = QRectF(0, 0, sum(widths) + 4 * pt, metrics.height() + 6 * pt)
+        legend.moveCenter(QPointF(rect.center().x(), rect.top() + 4 * pt + legend.height() / 2))
+        p.setBrush(QBrush(Qt.GlobalColor.white))
+        self.pen(_rgb(0.5, 0.5, 0.5), 0.5)
+        p.drawRect(legend)
+        p.setBrush(Qt.BrushStyle.NoBrush)
+
+        x = legend.left() + 4 * pt
+        y = legend.center().y()
+        for (label, entry), width in zip(entries, widths):
+            if "marker" in entry:
+                self.pen(entry["color"], entry.get("width", 1.2))
+                p.drawLine(QPointF(x, y), QPointF(x + sample, y))
+                self.marker(QPointF(x + sample / 2, y), entry["marker"], entry.get("size", 4.5) * pt,
+                            entry["color"], entry.get("filled", True))
+            else:
+                self.pen(_rgb(0.5, 0.5, 0.5), 1.2, entry.get("style", Qt.PenStyle.DashLine))
+                p.drawLine(QPointF(x, y), QPointF(x + sample, y))
+            self.pen(Qt.GlobalColor.black)
+            self.text(x + sample + 3 * pt, y, label, 7)
+            x += width
+
+    def table_columns(self, rows, width):
+        """Column boundaries (relative to the table's left edge) from the widest cell in each column.
+
+        Computed once over all rows so that every page of a long table has the same columns.
+        """
+        pad = 0.008 * width
+        widths = []
+        for c in range(len(rows[0])):
+            widest = 0
+            for r, font_args in ((0, (9, True)), (1, (8.5, False))):
+                self.font(*font_args)
+                metrics = QFontMetricsF(self.painter.font())
+                cells = rows[:1] if r == 0 else rows[1:]
+                widest = max([widest] + [metrics.horizontalAdvance(row[c]) for row in cells])
+            widths.append(widest + 2 * pad)
+        total = sum(widths)
+        col_pos = [0.0]
+        for w in widths:
+            col_pos.append(col_pos[-1] + w / total * width)
+        return col_pos
+
+    def table(self, rect, header, rows, title, col_pos):
+        """Bordered table with a header row; grid lines are drawn in one call"""
+        p = self.painter
+        n_rows = len(rows) + 1
+        row_height = rect.height() / n_rows
+        self.text(rect.center().x(), rect.top() - row_height * 0.7, title, 10, bold=True,
+                  align=Qt.AlignmentFlag.AlignHCenter)
+
+        self.pen(_rgb(0.3, 0.3, 0.3), 1.0)
+        xs = [rect.left() + x for x in col_pos]
+        p.drawLines([QLineF(rect.left(), rect.top() + r * row_height, rect.right(), rect.top() + r * row_height)
+                     for r in range(n_rows + 1)] +
+                    [QLineF(x, rect.top(), x, rect.bottom()) for x in xs])
+
+        pad = 0.008 * rect.width()
+        for r, (row, size, bold) in enumerate([(header, 9, True)] + [(row, 8.5, False) for row in rows]):
+            if r <= 1:
+                self.font(size, bold)
+                metrics = QFontMetricsF(p.font())
+                baseline = metrics.ascent() / 2 - metrics.descent() / 2
+            y = rect.top() + (r + 0.5) * row_height + baseline
+            for x, value in zip(xs, row):
+                p.drawText(QPointF(x + pad, y), value)
+
+    def image(self, path, rect):
+        """Draw an image scaled to fit rect, centred horizontally and aligned to the top"""
+        image = _report_image(path, QSize(int(rect.width() * IMAGE_DPI / PDF_RESOLUTION),
+                                          int(rect.height() * IMAGE_DPI / PDF_RESOLUTION)))
+        if image.isNull():
+            return
+        scale = min(rect.width() / image.width(), rect.height() / image.height())
+        target = QRectF(0, 0, image.width() * scale, image.height() * scale)
+        target.moveTop(rect.top())
+        target.moveLeft(rect.center().x() - target.width() / 2)
+        self.painter.drawImage(target, image)
+
+
+def _page_1(rp, data, derived):
+    n = len(data["film_names"])
+    has_lead = any(v > 0 for v in data["Dose_ROI_mask_all"])
+
+    series = [
+        dict(label='Dose with BG', values=data["Dose_with_BGND_Gy_all"], errors=data["Dose_with_BGND_Gy_std_all"],
+             color=_rgb(0.2, 0.4, 0.8), marker='o'),
+        dict(label='Dose no BG', values=data["Dose_Gy_all"], errors=data["Dose_Gy_std_all"],
+             color=_rgb(0, 0.6, 0), error_color=_rgb(0.2, 0.8, 0.2), marker='d'),
+        dict(label='Dose CD', values=data["Dose_CD_all"], errors=data["Dose_CD_std_all"],
+             color=_rgb(0.8, 0.2, 0.2), marker='s', width=1.0, size=3.5),
+    ]
+    if has_lead:
+        series.append(dict(label='Dose lead', values=data["Dose_ROI_mask_all"], errors=data["Dose_ROI_mask_std_all"],
+                           color=_rgb(0.9, 0.8, 0), marker='^'))
+    series += [
+        dict(label='Avg coeff_bg * CD', values=derived["calibrated_dose_cd1"], color=_rgb(0.5, 0, 0.8),
+             marker='x', width=1.3, size=3),
+        dict(label='Avg coeff * CD', values=derived["calibrated_dose_cd2"], color=_rgb(1, 0.6, 0.8),
+             marker='x', width=1.3, size=3),
+    ]
+    rp.plot(rp.figure_rect(0.1, 0.74, 0.8, 0.20), n, series, 'Measured Doses', 'Dose center [Gy]')
+
+
+def _table_rows(data):
+    """Summary table cells, one row per film"""
+    has_lead = any(v > 0 for v in data["Dose_ROI_mask_all"])
+    rows = []
+    for i in range(len(data["film_names"])):
+        lead = (f"{data['Dose_ROI_mask_all'][i]:.2f} ± {data['Dose_ROI_mask_std_all'][i]:.2f}"
+                if has_lead else 'N/A')
+        rows.append([
+            os.path.splitext(data["film_names"][i])[0],
+            f"{data['Dose_with_BGND_Gy_all'][i]:.2f} ± {data['Dose_with_BGND_Gy_std_all'][i]:.2f}",
+            f"{data['Dose_Gy_all'][i]:.2f} ± {data['Dose_Gy_std_all'][i]:.2f}",
+            f"{data['Dose_CD_all'][i]:.2f} ± {data['Dose_CD_std_all'][i]:.2f}",
+            lead,
+            f"{data['chargeAll'][i]:.2f}",
+            data["film_notes"][i],
+            f"{data['x0_all'][i]:.2f}",
+            f"{data['y0_all'][i]:.2f}",
+            f"{data['xstd_all'][i]:.2f}",
+            f"{data['ystd_all'][i]:.2f}",
+        ])
+    return rows
+
+
+def _summary_table_pages(rp, writer, data):
+    """Summary table below the dose plot, continued on further pages as needed"""
+    headers = ['File', 'Dose w/BG', 'Dose no BG', 'Dose CD', 'Dose lead', 'Charge', 'Notes', 'x0', 'y0', 'xstd', 'ystd']
+    rows = _table_rows(data)
+    col_pos = rp.table_columns([headers] + rows, rp.figure_rect(0.05, 0, 0.9, 1).width())
+
+    # Page 1 table starts below the plot; continuation pages use the full page
+    table_top = 0.74 - 0.05 - 0.025
+    bottom_margin = 0.02
+    title = 'Summary Table'
+    start = 0
+    while True:
+        capacity = max(1, int((table_top - bottom_margin) / TABLE_ROW_HEIGHT) - 1)
+        chunk = rows[start:start + capacity]
+        table_height = TABLE_ROW_HEIGHT * (len(chunk) + 1)
+        rp.table(rp.figure_rect(0.05, table_top - table_height, 0.9, table_height), headers, chunk, title, col_pos)
+        start += len(chunk)
+        if start >= len(rows):
+            break
+        writer.newPage()
+        table_top = 0.97
+        title = 'Summary Table (continued)'
+
+
+def _page_2(rp, data, derived):
+    n = len(data["film_names"])
+    pt = PDF_RESOLUTION / 72.0
+
+    if data.get("include_calib_plot"):
+        series = [
+            dict(label='Coeff_bg', values=derived["calibration_ratios1"], color=_rgb(0.5, 0, 0.8),
+                 marker='x', width=1.3, size=3, filled=False),
+            dict(label='Coeff', values=derived["calibration_ratios2"], color=_rgb(1, 0.6, 0.8),
+                 marker='x', width=1.3, size=3, filled=False),
+        ]
+        hlines = [
+            dict(label='Avg Coeff_bg', value=derived["avg_coeff1"], style=Qt.PenStyle.DashLine),
+            dict(label='Avg Coeff', value=derived["avg_coeff2"], style=Qt.PenStyle.DashDotLine),
+        ]
+        rp.plot(rp.figure_rect(0.1, 0.82, 0.8, 0.15), n, series, 'Calibration Coefficients', 'Coeff.', hlines)
+
+    # Analysis parameters, positioned in the [0.1 0.12 0.8 0.65] axes as in the Octave report
+    area = rp.figure_rect(0.1, 0.12, 0.8, 0.65)
+    line_spacing = 0.06 * area.height()
+    y = area.top() + 0.05 * area.height()
+    x = area.left() + 0.1 * area.width()
+
+    rp.text(area.center().x(), y, 'Analysis Parameters', 14, bold=True, align=Qt.AlignmentFlag.AlignHCenter)
+    y += line_spacing
+
+    if data.get("roi_shape") == "circle":
+        roi_text = f"ROI: circle, Radius (mm): {float(data['roi_size']):.1f}"
+    else:
+        roi_text = f"ROI: square, Side length (mm): {2 * float(data['roi_size']):.1f}"
+    lines = [roi_text]
+    if data.get("bgnd_choice") == "edge":
+        lines.append('Background Type: edge-based')
+    else:
+        lines.append(f"Background Type: {data.get('bgnd_file', '')}")
+
+    for label, avg, std in (("w/BG", derived["avg_coeff1"], derived["std_coeff1"]),
+                            ("no BG", derived["avg_coeff2"], derived["std_coeff2"])):
+        percent = std / avg * 100 if avg else float('nan')
+        lines.append(f"Calibration Coefficient (average {label}): {avg:.3f} ± {std:.3f} ({percent:.1f}%)")
+
+    for text in lines:
+        rp.text(x, y, text, 12, bold=True)
+        y += line_spacing
+
+    roi_image_path = data.get("roi_image_path")
+    if roi_image_path:
+        text = 'Image of the lead films'
+        if data["selected_masks"]:
+            text += f" (selected masks: {', '.join(str(m) for m in data['selected_masks'])})"
+        rp.text(x, y, text, 12, bold=True)
+        y += line_spacing / 2
+
+        margin = 0.01 * rp.page.width()
+        image_area = QRectF(rp.page.left() + margin, y, rp.page.width() - 2 * margin,
+                            rp.page.bottom() - y - 10 * pt)
+        rp.image(roi_image_path, image_area)
+
+
+def _page_3(rp, data):
+    n = len(data["film_names"])
+    blue = _rgb(0.2, 0.4, 0.8)
+    red = _rgb(0.8, 0.2, 0.2)
+
+    rp.plot(rp.figure_rect(0.1, 0.82, 0.8, 0.15), n, [
+        dict(label='xstd', values=data["xstd_all"], color=blue, marker='*', size=3.5),
+        dict(label='ystd', values=data["ystd_all"], color=red, marker='*', size=3.5),
+    ], 'Size Jitter', 'Size [mm]')
+
+    rp.plot(rp.figure_rect(0.1, 0.60, 0.8, 0.15), n, [
+        dict(label='x0', values=data["x0_all"], color=blue, marker='*', size=3.5),
+        dict(label='y0', values=data["y0_all"], color=red, marker='*', size=3.5),
+    ], 'Position Jitter', 'Position [mm]')
+
+
+def derive_report_values(data):
+    """Calibration coefficients shown in the report"""
+    ratios1 = _ratios(data["Dose_with_BGND_Gy_all"], data["Dose_CD_all"])
+    ratios2 = _ratios(data["Dose_Gy_all"], data["Dose_CD_all"])
+    avg1, std1 = _mean_std(ratios1)
+    avg2, std2 = _mean_std(ratios2)
+    return {
+        "calibration_ratios1": ratios1,
+        "calibration_ratios2": ratios2,
+        "avg_coeff1": avg1, "std_coeff1": std1,
+        "avg_coeff2": avg2, "std_coeff2": std2,
+        "calibrated_dose_cd1": [d * avg1 for d in data["Dose_CD_all"]],
+        "calibrated_dose_cd2": [d * avg2 for d in data["Dose_CD_all"]],
+    }
+
+
+def render_report(data, pdf_path=REPORT_PDF_FILE):
+    """Render the A4 analysis report (the summary table continues on extra pages for large campaigns)"""
+    writer = QPdfWriter(pdf_path)
+    writer.setResolution(PDF_RESOLUTION)
+    writer.setPageLayout(QPageLayout(QPageSize(QPageSize.PageSizeId.A4), QPageLayout.Orientation.Portrait,
+                                     QMarginsF(5, 5, 5, 5), QPageLayout.Unit.Millimeter))
+    writer.setTitle("Analysis report")
+
+    derived = derive_report_values(data)
+    painter = QPainter(writer)
+    try:
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        page_rect = QRectF(0, 0, writer.width(), writer.height())
+        rp = ReportPainter(painter, page_rect)
+
+        _page_1(rp, data, derived)
+        _summary_table_pages(rp, writer, data)
+        writer.newPage()
+        _page_2(rp, data, derived)
+        writer.newPage()
+        _page_3(rp, data)
+    finally:
+        painter.end()
+    return pdf_path
+
+
+class ReportRenderThread(QThread):
+    """Renders the PDF report off the GUI thread"""
+    report_ready = pyqtSignal(str, float)
+    report_failed = pyqtSignal(str)
+
+    def __init__(self, data, pdf_path=REPORT_PDF_FILE, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.pdf_path = pdf_path
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            render_report(self.data, self.pdf_path)
+        except Exception as e:
+            self.report_failed.emit(str(e))
+            return
+        self.report_ready.emit(self.pdf_path, time.perf_counter() - start)
@@ -0,0 +1,139 @@
+import os
+import glob
+import json
+import psutil
+from PyQt6.QtGui import QImage, QImageReader, QPixelFormat
+
+# Environment variables read by the BLAS/OpenMP libraries Octave links against
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'GOTO_NUM_THREADS')
+# Read by parallelWorkerCount.m / parallel_worker_count.m
+WORKERS_ENV_VAR = 'FILMDOSIMETRY_WORKERS'
+
+OCTAVE_PROCESS_BYTES = 300 * 2**20   # Octave with io/image loaded, before any film
+MEMORY_BUDGET = 0.8                  # Share of the available RAM the jobs may use
+GUI_RESERVED_CPUS = 1                # Kept free for the GUI when there are enough cores
+DEFAULT_FILM_SIZE = (3000, 2400)     # Rows x columns of a 300 dpi film scan, when unknown
+DEFAULT_SCAN_FORMAT = (3, 2)         # Samples per pixel and bytes per sample (48-bit RGB), when unknown
+# As processExperimentalFilms: scans whose whole-film copies exceed the threshold are
+# calibrated in strips of STRIP_BYTES (FILMDOSIMETRY_STRIP_THRESHOLD_MB overrides it)
+STRIP_THRESHOLD_BYTES = 512 * 2**20
+STRIP_BYTES = 32 * 2**20
+
+
+def tif_film_size(directory):
+    """(height, width, samples, bytes_per_sample) of the first TIF film in a directory,
+    read from its header only"""
+    files = sorted(glob.glob(os.path.join(directory, '*.tif*')))
+    if not files:
+        return None
+    reader = QImageReader(files[0])
+    size = reader.size()
+    if not size.isValid():
+        return None
+
+    pixel_format = QImage.toPixelFormat(reader.imageFormat())
+    if pixel_format.channelCount() == 0:
+        samples, sample_bytes = DEFAULT_SCAN_FORMAT
+    else:
+        # Qt pads RGB to four channels (RGB32, RGBX64); imread returns three
+        samples = 3 if pixel_format.colorModel() == QPixelFormat.ColorModel.RGB else 1
+        sample_bytes = max(1, pixel_format.bitsPerPixel() // pixel_format.channelCount() // 8)
+    return (size.height(), size.width(), samples, sample_bytes)
+
+
+def dose_cube_film_size(calibrated_dir):
+    """(height, width) of the films of a calibrated directory, from its dose cube index"""
+    try:
+        with open(os.path.join(calibrated_dir, 'dose_cube.json'), 'r') as f:
+            index = json.load(f)
+        return int(index['height']), int(index['width'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _strip_threshold_bytes():
+    try:
+        return float(os.environ['FILMDOSIMETRY_STRIP_THRESHOLD_MB']) * 2**20
+    except (KeyError, ValueError):
+        return STRIP_THRESHOLD_BYTES
+
+
+def estimate_film_memory(film_size, single_precision=False):
+    """Peak bytes one Octave worker needs for one film.
+
+    film_size is (height, width), optionally followed by the samples per pixel and bytes
+    per sample of the scan (tif_film_size). The scan as imread returns it and a copy,
+    its green channel and dose map in the working precision, and about two full-size
+    temporaries of polyval and the ROI statistics. Scans that processExperimentalFilms
+    calibrates in strips need a few strips instead, whatever their size.
+    """
+    pixels = film_size[0] * film_size[1]
+    samples, sample_bytes = film_size[2:4] if len(film_size) >= 4 else (3, 1)
+    value_bytes = 4 if single_precision else 8
+    whole_film_bytes = pixels * (2 * samples * sample_bytes + 4 * value_bytes)
+    if len(film_size) >= 4 and whole_film_bytes > _strip_threshold_bytes():
+        # Raw window, green channel, dose and the transposed rows written out, per strip
+        return 4 * STRIP_BYTES
+    return whole_film_bytes
+
+
+def _usable_cpus():
+    """CPUs this process may run on"""
+    try:
+        return sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        # cpu_affinity is not available on macOS
+        return list(range(psutil.cpu_count(logical=True) or 1))
+
+
+class ResourcePlan:
+    """Worker count, threads per worker and CPU set for one Octave job"""
+
+    def __init__(self, workers, threads_per_worker, cpus, worker_bytes, available_bytes):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.cpus = cpus
+        self.worker_bytes = worker_bytes
+        self.available_bytes = available_bytes
+
+    def environment(self):
+        """Environment variables to pass to the Octave process"""
+        env = {name: str(self.threads_per_worker) for name in THREAD_ENV_VARS}
+        env[WORKERS_ENV_VAR] = str(self.workers)
+        return env
+
+    def apply(self, pid):
+        """Restrict the Octave process to the planned CPUs; its parcellfun workers inherit them"""
+        try:
+            psutil.Process(pid).cpu_affinity(self.cpus)
+        except (AttributeError, ValueError, psutil.Error):
+            pass  # Unsupported on macOS, or the process already exited
+
+    def describe(self):
+        return (f"[Resources] {self.workers} worker(s) x {self.threads_per_worker} thread(s) "
+                f"on {len(self.cpus)} CPU(s); ~{self.worker_bytes / 2**20:.0f} MB per worker, "
+                f"{self.available_bytes / 2**30:.1f} GB available")
+
+
+def plan_resources(film_size, n_films, single_precision=False):
+    """Choose how many Octave workers fit this machine for n_films of film_size.
+
+    Workers are limited by the usable CPUs (minus one for the GUI), by the available
+    memory at the estimated per-worker peak, and by the number of films. The CPUs are
+    then split between the workers' BLAS/OpenMP threads so nothing is oversubscribed.
+    """
+    film_size = film_size or DEFAULT_FILM_SIZE
+    cpus = _usable_cpus()
+    if len(cpus) > GUI_RESERVED_CPUS + 1:
+        cpus = cpus[GUI_RESERVED_CPUS:]
+
+    worker_bytes = OCTAVE_PROCESS_BYTES + estimate_film_memory(film_size, single_precision)
+    available_bytes = psutil.virtual_memory().available
+    # The main Octave process is always there next to its workers
+    budget = available_bytes * MEMORY_BUDGET - OCTAVE_PROCESS_BYTES
+    memory_workers = int(budget // worker_bytes)
+
+    workers = max(1, min(len(cpus), memory_workers, n_films))
+    threads_per_worker = max(1, len(cpus) // workers)
+    return ResourcePlan(workers, threads_per_worker, cpus, worker_bytes, available_bytes)
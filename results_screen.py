@@ -0,0 +1,150 @@
+import sqlite3
+import time
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt, QTimer
+from results_store import ResultsStore, RESULTS_DB
+
+NAV_BUTTON_STYLE = """
+    QPushButton {
+        font-size: 24px;
+        border: none;
+        background: transparent;
+        padding: 0px;
+    }
+    QPushButton:hover {
+        background: rgba(128, 128, 128, 30);
+        border-radius: 20px;
+    }
+    QPushButton:pressed {
+        background: rgba(128, 128, 128, 50);
+    }
+"""
+
+
+class ResultsScreen(QWidget):
+    """Query view over the results of all calibration and analysis runs"""
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+        self.store = None
+        self.setProperty("window_title", "Results History")
+
+        # Re-query shortly after the last keystroke in a filter
+        self.query_timer = QTimer()
+        self.query_timer.setSingleShot(True)
+        self.query_timer.timeout.connect(self.run_query)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Initialize filters, results table and footer"""
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        main_layout.setSpacing(15)
+
+        filters = QHBoxLayout()
+        filters.setSpacing(10)
+        self.stage_combo = QComboBox()
+        self.stage_combo.addItems(["Analysis", "Calibration"])
+        self.stage_combo.currentTextChanged.connect(self.run_query)
+        filters.addWidget(QLabel("Stage:"))
+        filters.addWidget(self.stage_combo)
+
+        self.filter_inputs = {}
+        for key, label, placeholder in (("experiment", "Experiment:", "prefix"),
+                                        ("film", "Film:", "prefix"),
+                                        ("calibration", "Calibration:", "prefix"),
+                                        ("date_from", "From:", "YYYY-MM-DD"),
+                                        ("date_to", "To:", "YYYY-MM-DD")):
+            line_edit = QLineEdit()
+            line_edit.setPlaceholderText(placeholder)
+            line_edit.textChanged.connect(lambda: self.query_timer.start(250))
+            filters.addWidget(QLabel(label))
+            filters.addWidget(line_edit, stretch=1)
+            self.filter_inputs[key] = line_edit
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setStyleSheet("font-size: 14px; padding: 5px 15px;")
+        self.refresh_btn.clicked.connect(self.run_query)
+        filters.addWidget(self.refresh_btn)
+
+        self.results_table = QTableWidget()
+        self.results_table.setAlternatingRowColors(True)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.results_table.setStyleSheet("""
+            QTableWidget {
+                gridline-color: #d0d0d0;
+                background-color: transparent;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+            }
+            QHeaderView::section {
+                background-color: transparent;
+                border: 1px solid #ccc;
+                padding: 5px;
+                font-weight: bold;
+            }
+        """)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("font-size: 12px;")
+
+        footer = QHBoxLayout()
+        self.home_btn = QPushButton("🏠")
+        self.home_btn.setFixedSize(40, 40)
+        self.home_btn.setStyleSheet(NAV_BUTTON_STYLE)
+        self.home_btn.clicked.connect(self.go_to_main_screen)
+        footer.addWidget(self.status_label)
+        footer.addStretch()
+        footer.addWidget(self.home_btn)
+
+        main_layout.addLayout(filters)
+        main_layout.addWidget(self.results_table, stretch=1)
+        main_layout.addLayout(footer)
+
+    def showEvent(self, event):
+        """Query again whenever the screen is shown (runs may have added rows)"""
+        super().showEvent(event)
+        self.run_query()
+
+    def run_query(self):
+        """Fill the table with the film rows matching the filters"""
+        try:
+            if self.store is None:
+                self.store = ResultsStore(RESULTS_DB)
+            start = time.perf_counter()
+            names, rows = self.store.query(self.stage_combo.currentText().lower(),
+                                           **{key: edit.text().strip()
+                                              for key, edit in self.filter_inputs.items()})
+        except sqlite3.Error as e:
+            self.status_label.setText(f"Could not query {RESULTS_DB}: {str(e)}")
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.results_table.setSortingEnabled(False)
+        self.results_table.clear()
+        self.results_table.setColumnCount(len(names))
+        self.results_table.setHorizontalHeaderLabels(names)
+        self.results_table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for col, value in enumerate(row):
+                item = QTableWidgetItem()
+                if isinstance(value, float):
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(value, 3))
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                elif value is not None:
+                    item.setData(Qt.ItemDataRole.DisplayRole, value)
+                self.results_table.setItem(r, col, item)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.horizontalHeader().resizeSections(QHeaderView.ResizeMode.ResizeToContents)
+
+        self.status_label.setText(f"{len(rows)} film rows ({elapsed_ms:.1f} ms) from {RESULTS_DB}")
+
+    def go_to_main_screen(self):
+        """Navigate to main screen"""
+        self.main_window.stacked_widget.setCurrentWidget(self.main_window.main_screen)
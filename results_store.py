@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import sqlite3
+
+RESULTS_DIR = '!Results'
+RESULTS_DB = os.path.join(RESULTS_DIR, 'results.sqlite')
+
+CALIBRATION_COLUMNS = ["film", "dose", "dose_std", "charge"]
+ANALYSIS_COLUMNS = ["film", "charge", "dose_with_bg", "dose_with_bg_std", "dose_cd", "dose_cd_std",
+                    "x0", "y0", "xstd", "ystd", "roi_shape", "roi_size"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    stage TEXT NOT NULL,
+    experiment TEXT,
+    calibration TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    exit_code INTEGER,
+    parameters TEXT
+);
+CREATE TABLE IF NOT EXISTS calibration_films (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    experiment TEXT,
+    calibration TEXT,
+    film TEXT,
+    dose REAL,
+    dose_std REAL,
+    charge REAL,
+    recorded_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis_films (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    experiment TEXT,
+    calibration TEXT,
+    film TEXT,
+    charge REAL,
+    dose_with_bg REAL,
+    dose_with_bg_std REAL,
+    dose_cd REAL,
+    dose_cd_std REAL,
+    x0 REAL,
+    y0 REAL,
+    xstd REAL,
+    ystd REAL,
+    roi_shape TEXT,
+    roi_size REAL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_stage_date ON runs(stage, started_at);
+CREATE INDEX IF NOT EXISTS calibration_films_experiment ON calibration_films(experiment, recorded_at);
+CREATE INDEX IF NOT EXISTS calibration_films_film ON calibration_films(film);
+CREATE INDEX IF NOT EXISTS calibration_films_calibration ON calibration_films(calibration);
+CREATE INDEX IF NOT EXISTS calibration_films_date ON calibration_films(recorded_at);
+CREATE INDEX IF NOT EXISTS analysis_films_experiment ON analysis_films(experiment, recorded_at);
+CREATE INDEX IF NOT EXISTS analysis_films_film ON analysis_films(film);
+CREATE INDEX IF NOT EXISTS analysis_films_calibration ON analysis_films(calibration);
+CREATE INDEX IF NOT EXISTS analysis_films_date ON analysis_films(recorded_at);
+"""
+
+
+def _timestamp():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _prefix_upper_bound(prefix):
+    """Smallest string above every string starting with `prefix` (keeps prefix filters on the index)"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def calibration_experiment(user_data):
+    """Experiment and calibration lot of a calibration run (user_inputs.json)"""
+    experiment = os.path.basename(user_data.get('exp_dir', '').rstrip('/\\'))
+    if user_data.get('use_existing_calibration', False):
+        calibration = os.path.splitext(user_data.get('selected_cal', ''))[0]
+    else:
+        calibration = os.path.basename(user_data.get('cal_dir', '').rstrip('/\\'))
+    return experiment, calibration
+
+
+def analysis_experiment(params):
+    """Experiment of an analysis run (get_user_inputs.json): its calibrated films directory"""
+    experiment = os.path.basename(params.get('directory_films', '').rstrip('/\\'))
+    if experiment.endswith('_CALIBRATED'):
+        experiment = experiment[:-len('_CALIBRATED')]
+    return experiment
+
+
+class ResultsStore:
+    """SQLite store of every run's parameters and per-film results (`!Results/results.sqlite`).
+
+    Rows are written as the processing screens read them from Octave, so an interrupted
+    run keeps what it had computed. Experiment and calibration lot are stored with every
+    film row, and the query filters (prefixes and date ranges) run on their indexes.
+    """
+
+    def __init__(self, path=RESULTS_DB):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        # WAL lets the query view read while a run is streaming rows in
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def begin_run(self, stage, experiment, calibration, parameters):
+        """Record the start of a run and return its id"""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (stage, experiment, calibration, started_at, parameters) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (stage, experiment, calibration, _timestamp(), json.dumps(parameters)))
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, exit_code):
+        """Record the end of a run (exit code None for a run stopped by the user)"""
+        with self.connection:
+            self.connection.execute("UPDATE runs SET finished_at = ?, exit_code = ? WHERE run_id = ?",
+                                    (_timestamp(), exit_code, run_id))
+
+    def latest_calibration(self, experiment):
+        """Calibration lot of the last calibration run that processed `experiment`"""
+        row = self.connection.execute(
+            "SELECT calibration FROM runs WHERE stage = 'calibration' AND experiment = ? "
+            "ORDER BY started_at DESC, run_id DESC LIMIT 1", (experiment,)).fetchone()
+        return row[0] if row else ""
+
+    def add_calibration_films(self, run_id, rows, calibration=None):
+        """Append per-film calibration results (dicts with CALIBRATION_COLUMNS) of a run.
+
+        `calibration` overrides the run's calibration lot, for the results of further
+        curves applied to the same films.
+        """
+        self._add_films('calibration_films', CALIBRATION_COLUMNS, run_id, rows, calibration)
+
+    def add_analysis_films(self, run_id, rows):
+        """Append per-film analysis results (dicts with ANALYSIS_COLUMNS) of a run"""
+        self._add_films('analysis_films', ANALYSIS_COLUMNS, run_id, rows)
+
+    def _add_films(self, table, columns, run_id, rows, calibration=None):
+        if not rows:
+            return
+        experiment, run_calibration = self.connection.execute(
+            "SELECT experiment, calibration FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if calibration is None:
+            calibration = run_calibration
+        recorded_at = _timestamp()
+        names = ["run_id", "experiment", "calibration"] + columns + ["recorded_at"]
+        values = [(run_id, experiment, calibration, *(row.get(c) for c in columns), recorded_at)
+                  for row in rows]
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                values)
+
+    def query(self, stage, experiment="", film="", calibration="", date_from="", date_to="", limit=5000):
+        """Film rows of a stage, newest first; text filters match prefixes, dates are YYYY-MM-DD.
+
+        Returns (column_names, rows).
+        """
+        table, columns = (('calibration_films', CALIBRATION_COLUMNS) if stage == 'calibration'
+                          else ('analysis_films', ANALYSIS_COLUMNS))
+        conditions, arguments = [], []
+        for column, prefix in (("experiment", experiment), ("film", film), ("calibration", calibration)):
+            if prefix:
+                conditions.append(f"{column} >= ? AND {column} < ?")
+                arguments += [prefix, _prefix_upper_bound(prefix)]
+        if date_from:
+            conditions.append("recorded_at >= ?")
+            arguments.append(date_from)
+        if date_to:
+            conditions.append("recorded_at <= ?")
+            arguments.append(f"{date_to} 23:59:59")
+
+        names = ["recorded_at", "run_id", "experiment", "calibration"] + columns
+        sql = f"SELECT {', '.join(names)} FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY recorded_at DESC, rowid DESC LIMIT ?"
+        rows = self.connection.execute(sql, arguments + [limit]).fetchall()
+        return names, rows
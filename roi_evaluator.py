@@ -0,0 +1,124 @@
+import os
+import json
+import numpy as np
+
+ROI_WINDOWS_DATA = os.path.join('scripts', 'roi_windows.f32')
+ROI_WINDOWS_INDEX = os.path.join('scripts', 'roi_windows.json')
+
+
+def _matlab_round(values):
+    """Octave's round (halves away from zero) for non-negative values"""
+    return np.floor(np.asarray(values) + 0.5)
+
+
+class _RoiMap:
+    """Float32 window of one dose map around its centroid, with the ROI statistics prepared
+    as cumulative sums over the pixels sorted by distance from the ROI center"""
+
+    def __init__(self, values, entry, nx, ny, pixel_size):
+        self.values = values
+        self.x0 = float(entry['x0'])
+        self.y0 = float(entry['y0'])
+        self.row0 = int(entry['row0'])
+        self.col0 = int(entry['col0'])
+        self.nx = nx
+        self.ny = ny
+        self.pixel_size = pixel_size
+        self._sorted = {}
+
+    def _distances(self, roi_shape):
+        """Distance of every window pixel from the ROI center in the units of the ROI test"""
+        px, py = self.pixel_size
+        rows = np.arange(self.row0, self.row0 + self.values.shape[0])
+        cols = np.arange(self.col0, self.col0 + self.values.shape[1])
+        if roi_shape == 'circle':
+            # Squared distance in mm on the centered axes of plot_dose_function
+            x = cols * px - (self.nx - 1) * px / 2
+            y = rows * py - (self.ny - 1) * py / 2
+            return (y[:, None] - self.y0) ** 2 + (x[None, :] - self.x0) ** 2
+        # Square: Chebyshev distance in pixels from the (1-based) pixel index pix_x0, pix_y0
+        pix_x0 = _matlab_round((self.x0 + (self.nx - 1) * px / 2) / px) - 1
+        pix_y0 = _matlab_round((self.y0 + (self.ny - 1) * py / 2) / py) - 1
+        return np.maximum(np.abs(rows[:, None] - pix_y0), np.abs(cols[None, :] - pix_x0))
+
+    def _prepare(self, roi_shape):
+        if roi_shape not in self._sorted:
+            distances = self._distances(roi_shape).ravel()
+            order = np.argsort(distances, kind='stable')
+            values = self.values.ravel().astype(np.float64)[order]
+            # Shift by the mean so the variance from the sums does not lose precision
+            shift = values.mean()
+            shifted = values - shift
+            sums = np.concatenate(([0.0], np.cumsum(shifted)))
+            squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+            self._sorted[roi_shape] = (distances[order], sums, squares, shift)
+        return self._sorted[roi_shape]
+
+    def statistics(self, roi_size, roi_shape):
+        """Mean and standard deviation (N-1) of the dose in the ROI, as in plot_dose_function"""
+        distances, sums, squares, shift = self._prepare(roi_shape)
+        if roi_shape == 'circle':
+            limit = roi_size ** 2
+        else:
+            limit = _matlab_round(roi_size / self.pixel_size[0])
+        n = int(np.searchsorted(distances, limit, side='right'))
+        if n == 0:
+            return float('nan'), float('nan')
+        mean = sums[n] / n
+        std = np.sqrt(max(squares[n] - n * mean * mean, 0.0) / (n - 1)) if n > 1 else 0.0
+        return mean + shift, std
+
+
+class RoiEvaluator:
+    """Re-evaluates the ROI doses of a finished analysis for any ROI size and shape.
+
+    The analysis script stores, for every film, a float32 window of the dose map with
+    and without background around the respective centroid (roi_windows.f32, column-major
+    windows one after the other, described by roi_windows.json). Sorting each window's
+    pixels by distance once per shape makes every later ROI a binary search.
+    """
+
+    def __init__(self, data_path=ROI_WINDOWS_DATA, index_path=ROI_WINDOWS_INDEX):
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+
+        pixel_size = tuple(float(v) for v in np.atleast_1d(index['pixel_size_mm']))
+        self.max_roi_mm = float(index['max_roi_mm'])
+        self.roi_size = float(index['roi_size'])
+        self.roi_shape = index['roi_shape']
+        data = np.fromfile(data_path, dtype='<f4')
+
+        self.names = []
+        self.cd_factors = []
+        self.maps = []
+        offset = 0
+        films = index['films'] if isinstance(index['films'], list) else [index['films']]
+        for film in films:
+            film_maps = []
+            for entry in film['maps']:
+                rows, cols = int(entry['rows']), int(entry['cols'])
+                values = data[offset:offset + rows * cols].reshape((cols, rows)).T
+                offset += rows * cols
+                film_maps.append(_RoiMap(values, entry, int(film['nx']), int(film['ny']), pixel_size))
+            self.names.append(film['name'])
+            self.cd_factors.append(float(film['cd_factor']))
+            self.maps.append(film_maps)
+        if offset != data.size:
+            raise ValueError(f"{data_path} does not match its index ({data.size} values, expected {offset})")
+
+    def __len__(self):
+        return len(self.names)
+
+    def evaluate(self, roi_size, roi_shape):
+        """Per film: (dose with background, std, dose in CD units, std) for this ROI"""
+        results = []
+        for (with_bgnd, without_bgnd), cd_factor in zip(self.maps, self.cd_factors):
+            dose_bg, dose_bg_std = with_bgnd.statistics(roi_size, roi_shape)
+            dose, dose_std = without_bgnd.statistics(roi_size, roi_shape)
+            results.append((dose_bg, dose_bg_std, dose * cd_factor, dose_std * abs(cd_factor)))
+        return results
+
+
+def has_roi_windows():
+    """True if the last analysis stored its ROI windows"""
+    return os.path.exists(ROI_WINDOWS_DATA) and os.path.exists(ROI_WINDOWS_INDEX)
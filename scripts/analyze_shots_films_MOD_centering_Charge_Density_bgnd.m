@@ -36,8 +36,29 @@ pixsizeY = pixsizeX;
 script_dir = fileparts(mfilename('fullpath'));
 addpath(fullfile(script_dir, 'functions'));
 
+% Octave profiler for the whole run when the GUI asks for it (OCTAVE_PROFILE_FILE)
+profile_file = getenv('OCTAVE_PROFILE_FILE');
+if ~isempty(profile_file)
+    profile clear;
+    profile on;
+    profile_guard = onCleanup(@() write_profile(profile_file));
+endif
+
 npix = 10; % pixels for cross-section analysis
 
+% CD results are derived from the no-background analysis by scaling;
+% set to true to also run the full CD analysis (and its image) and compare
+CD_consistency_check = false;
+
+% Per-film intermediates (cropped maps, projections, fits, rendered images) are cached in
+% cache/ so re-runs only redo what changed; least recently used entries are evicted
+% beyond this size (0 disables the cache)
+film_cache_limit_mb = 4096;
+
+% Largest ROI radius/half-side (mm) the GUI can re-evaluate after the run from the stored
+% float32 windows around each centroid
+roi_window_mm = 10;
+
 % Initialize GUI mode support
 gui_mode = getenv('OCTAVE_GUI_MODE');
 if strcmp(gui_mode, '1')
@@ -52,12 +73,32 @@ endif
 % Get user inputs
 [roi_shape, roi_size, directory_films, ndata, datasets, ...
  roi_image_path, roi_mat_path, selected_masks, ...
- bgnd_choice, bgnd_file, bg_nums, main_nums, include_calib_plot, film_notes] = get_user_inputs();
+ bgnd_choice, bgnd_file, bg_nums, main_nums, include_calib_plot, film_notes, ...
+ precision, sweep] = get_user_inputs();
 
 tic;
 
 n_main = length(main_nums);
 
+% Parameter sweep: each film is loaded once and every ROI/background combination evaluated
+if ~isempty(sweep)
+    if ~strcmp(gui_mode, '1')
+        temp_results_file = '';
+    endif
+    t0 = trace_span();
+    run_parameter_sweep(sweep, directory_films, datasets, main_nums, bgnd_file, bg_nums, precision, ...
+                        [DownCut, UpCut, LeftCut, RightCut], pixsizeX, pixsizeY, T_calibration, temp_results_file);
+    trace_span('parameter_sweep', t0, 'stage');
+
+    if ~isempty(dir(strcat(directory_films, "*.dat")))
+        delete(strcat(directory_films, "*.dat"));
+    endif
+    disp(['Parameter sweep complete! Total time: ', num2str(toc), ' seconds']);
+    return;
+endif
+
+film_cache('init', film_cache_limit_mb);
+
 % Pre-allocate result arrays
 rmaxAll = zeros(1, n_main);
 rmeanAll = zeros(1, n_main);
@@ -79,10 +120,14 @@ Dose_Gy_std_all = zeros(1, n_main);
 Dose_with_BGND_Gy_std_all = zeros(1, n_main);
 Dose_ROI_mask_all = zeros(1, n_main);
 Dose_ROI_mask_std_all = zeros(1, n_main);
+roi_windows = cell(n_main, 2);
+cd_factors = zeros(1, n_main);
 
 % Process background
+t0 = trace_span();
 [use_existing_bgnd, compute_new_bgnd, image_bgnd, chargeAll_bgnd, BGND_Type, bgnd_file] = ...
-    process_background(bgnd_choice, bgnd_file, bg_nums, directory_films, datasets);
+    process_background(bgnd_choice, bgnd_file, bg_nums, directory_films, datasets, precision);
+trace_span('process_background', t0, 'stage');
 
 % Set background for processing
 if use_existing_bgnd || BGND_Type == 0
@@ -91,46 +136,110 @@ else
     current_bgnd = [];
 endif
 
+% Films the main loop reads from disk (not in the film cache), announced for the GUI read-ahead
+film_keys = cell(1, n_main);
+films_to_load = {};
+for i = 1:n_main
+    file_idx = main_nums(i);
+    if file_idx > ndata
+        continue;
+    endif
+    film_keys{i} = film_cache_key(directory_films, datasets(file_idx).name, precision, BGND_Type, bgnd_file, ...
+                                  [DownCut, UpCut, LeftCut, RightCut]);
+    if ~film_cache('has', film_keys{i})
+        films_to_load{end+1} = datasets(file_idx).name;
+    endif
+endfor
+printf("Films to load: %s\n", strjoin(films_to_load, '|'));
+fflush(stdout);
+
 % Process main images
 printf("Processing main image set...\n");
+t_loop = trace_span();
 for i = 1:n_main
     file_idx = main_nums(i);
     if file_idx > ndata
         error(sprintf("Invalid file number: %d. Only %d files available.", file_idx, ndata));
     endif
 
-    nTest = strcat(directory_films, datasets(file_idx).name);
     film_name = datasets(file_idx).name(1:length(datasets(file_idx).name)-4);
     film_name_all{i} = datasets(file_idx).name;
-    data1 = load(nTest);
-    imageF = double(data1.image_film_Gy);
 
-    sizeall = size(imageF);
-    charge = double(data1.charge);
+    % Cropped and background-subtracted maps, reused while film, background and crop are unchanged
+    film_key = film_keys{i};
+    [maps, cached] = film_cache('get', film_key);
+    if cached
+        printf("Using cached intermediates for %s\n", film_name);
+        charge = maps.charge;
+        Dose_Film = maps.Dose_Film;
+        Dose_Film_nobgnd = maps.Dose_Film_nobgnd;
+        CD_scale = maps.CD_scale;
+        Dose_Gauss = Dose_Film_nobgnd * CD_scale;
+    else
+        printf("Loading film %s\n", datasets(file_idx).name);
+        fflush(stdout);
+        t0 = trace_span();
+        [imageF, charge] = load_calibrated_film(directory_films, datasets(file_idx).name, precision);
+        trace_span('load', t0, 'io');
+
+        % Perform image analysis
+        t0 = trace_span();
+        [Dose_Film, Dose_Film_nobgnd, Dose_Gauss, Dose_Exp_EBT3, Dose_Exp_XDWrong, nxF, nyF, nx, ny, CD_scale] = ...
+            image_analysis_function(imageF, charge, current_bgnd, BGND_Type, DownCut, UpCut, LeftCut, RightCut, pixsizeX, pixsizeY);
+        trace_span('image_analysis', t0, 'compute');
+        clear imageF;
+
+        film_cache('put', film_key, struct('charge', charge, 'Dose_Film', Dose_Film, ...
+                                           'Dose_Film_nobgnd', Dose_Film_nobgnd, 'CD_scale', CD_scale));
+    endif
     chargeAll(i) = charge;
 
-    % Perform image analysis
-    [Dose_Film, Dose_Film_nobgnd, Dose_Gauss, Dose_Exp_EBT3, Dose_Exp_XDWrong, nxF, nyF, nx, ny] = ...
-        image_analysis_function(imageF, charge, current_bgnd, BGND_Type, DownCut, UpCut, LeftCut, RightCut, pixsizeX, pixsizeY);
-
     % Process dose with background
     name_output = strcat('Dose_Film_with-BGND_', film_name, '_Gy');
     [Dose_center_Film_with_BGND_Gy, xstd_BGND_Gy, ystd_BGND_Gy, x0_BGND_Gy, y0_BGND_Gy, bgnd_Dose_x, bgnd_Dose_y, Dose_center_Film_with_BGND_Gy_std] = ...
-        plot_dose_function(Dose_Film, name_output, pixsizeX, pixsizeY, roi_size, npix, 1, roi_shape);
+        plot_dose_function(Dose_Film, name_output, pixsizeX, pixsizeY, roi_size, npix, 1, roi_shape, [film_key, '_with_bgnd']);
 
     % Process dose without background
     name_output = strcat('Dose_Film_', film_name, '_Gy');
     [Dose_center_Film_Gy, xstd_Gy, ystd_Gy, x0_Gy, y0_Gy, bgnd_Dose_x, bgnd_Dose_y, Dose_center_Film_Gy_std] = ...
-        plot_dose_function(Dose_Film_nobgnd, name_output, pixsizeX, pixsizeY, roi_size, npix, 1, roi_shape);
+        plot_dose_function(Dose_Film_nobgnd, name_output, pixsizeX, pixsizeY, roi_size, npix, 1, roi_shape, [film_key, '_nobgnd']);
 
-    % Process dose in CD units
-    name_output = strcat('Dose_Film_', film_name, '_CD');
-    [Dose_center_Film_CD, xstd_CD, ystd_CD, x0_CD, y0_CD, bgnd_Dose_x, bgnd_Dose_y, Dose_center_Film_CD_std] = ...
-        plot_dose_function(Dose_Gauss, name_output, pixsizeX, pixsizeY, roi_size, npix, T_calibration, roi_shape);
+    % Windows around the centroids for the ROI re-evaluation in the GUI
+    if strcmp(gui_mode, '1')
+        roi_windows{i, 1} = roi_window(Dose_Film, x0_BGND_Gy, y0_BGND_Gy, pixsizeX, pixsizeY, roi_window_mm);
+        roi_windows{i, 2} = roi_window(Dose_Film_nobgnd, x0_Gy, y0_Gy, pixsizeX, pixsizeY, roi_window_mm);
+        cd_factors(i) = CD_scale * T_calibration;
+    endif
+
+    % Dose in CD units: Dose_Gauss = CD_scale * Dose_Film_nobgnd, so centroid and
+    % widths are unchanged and dose values scale linearly
+    Dose_center_Film_CD = Dose_center_Film_Gy * CD_scale * T_calibration;
+    Dose_center_Film_CD_std = Dose_center_Film_Gy_std * abs(CD_scale * T_calibration);
+    x0_CD = x0_Gy;
+    y0_CD = y0_Gy;
+    xstd_CD = xstd_Gy;
+    ystd_CD = ystd_Gy;
+
+    if CD_consistency_check && charge ~= 0
+        name_output = strcat('Dose_Film_', film_name, '_CD');
+        [Dose_center_check, xstd_check, ystd_check, x0_check, y0_check, bgnd_Dose_x, bgnd_Dose_y, Dose_center_check_std] = ...
+            plot_dose_function(Dose_Gauss, name_output, pixsizeX, pixsizeY, roi_size, npix, T_calibration, roi_shape);
+
+        derived = [Dose_center_Film_CD, Dose_center_Film_CD_std, x0_CD, y0_CD, xstd_CD, ystd_CD];
+        analysed = [Dose_center_check, Dose_center_check_std, x0_check, y0_check, xstd_check, ystd_check];
+        max_rel_diff = max(abs(derived - analysed) ./ max(abs(analysed), eps));
+        if max_rel_diff > 1e-6
+            printf("WARNING: CD consistency check failed for %s (max relative difference %.3g)\n", film_name, max_rel_diff);
+        else
+            printf("CD consistency check passed for %s\n", film_name);
+        endif
+    endif
 
     % Process ROI mask if available
     if ~isempty(roi_mat_path) && ~isempty(selected_masks)
+        t0 = trace_span();
         [Dose_center_ROI_mask, Dose_center_ROI_mask_std] = calculate_roi_mask_dose(Dose_Film, roi_mat_path, selected_masks, DownCut, UpCut, LeftCut, RightCut);
+        trace_span('roi_mask_dose', t0, 'compute');
         Dose_ROI_mask_all(i) = Dose_center_ROI_mask;
         Dose_ROI_mask_std_all(i) = Dose_center_ROI_mask_std;
     else
@@ -165,33 +274,53 @@ for i = 1:n_main
         fclose(fid);
     endif
 
-    % Handle zero charge case
+    % Handle zero charge case (Dose_Film already is the cropped film region)
     if charge == 0
         warning = 1;
         Dose_Gauss = zeros(size(Dose_Film_nobgnd)); % Create zero dose array with correct size
-        Dose_Film = imageF(DownCut:nyF-UpCut, LeftCut:nxF-RightCut); % Extract film region
     endif
 
     % Calculate ratios
-    rmax = max(Dose_Film_nobgnd(:)) / max(Dose_Gauss(:));
-    rmean = mean(Dose_Film_nobgnd(:)) / mean(Dose_Gauss(:));
+    rmax = double(max(Dose_Film_nobgnd(:))) / double(max(Dose_Gauss(:)));
+    rmean = double(mean(Dose_Film_nobgnd(:))) / double(mean(Dose_Gauss(:)));
 
     rmaxAll(i) = rmax;
     rmeanAll(i) = rmean;
 
     printf("Processed main image %d of %d\n", i, n_main);
 endfor
+trace_span('analysis_loop', t_loop, 'stage');
+film_cache('flush');
 
-% Generate analysis report
-generate_analysis_report(film_name_all, Dose_CD_all, Dose_with_BGND_Gy_all, ...
+if strcmp(gui_mode, '1')
+    t0 = trace_span();
+    write_roi_windows(film_name_all, roi_windows, cd_factors, roi_size, roi_shape, roi_window_mm, pixsizeX, pixsizeY);
+    trace_span('write_roi_windows', t0, 'io');
+endif
+clear roi_windows;
+
+% Generate analysis report (in GUI mode the GUI renders the PDF from the saved report data)
+if strcmp(gui_mode, '1')
+    report_function = @write_report_data;
+    report_stage = 'write_report_data';
+else
+    report_function = @generate_analysis_report;
+    report_stage = 'generate_analysis_report';
+endif
+
+t0 = trace_span();
+report_function(film_name_all, Dose_CD_all, Dose_with_BGND_Gy_all, ...
     Dose_Gy_all, Dose_ROI_mask_all, Dose_ROI_mask_std_all, ...
     x0_with_BGND_Gy_all, y0_with_BGND_Gy_all, ...
     xstd_with_BGND_Gy_all, ystd_with_BGND_Gy_all, ...
     Dose_CD_std_all, Dose_with_BGND_Gy_std_all, Dose_Gy_std_all, ...
     chargeAll, roi_shape, roi_size, bgnd_choice, bgnd_file, ...
     roi_image_path, selected_masks, include_calib_plot, film_notes);
+trace_span(report_stage, t0, 'stage');
 
-% Clean up decompressed files
-delete(strcat(directory_films, "*.dat"));
+% Clean up decompressed files (none when the films were read from the dose cube)
+if ~isempty(dir(strcat(directory_films, "*.dat")))
+    delete(strcat(directory_films, "*.dat"));
+endif
 
 disp(['Analysis complete! Total time: ', num2str(toc), ' seconds']);
@@ -0,0 +1,19 @@
+function profile = beam_profile(Dose, x, y)
+% Projections, centroid and RMS widths of a dose map on the centered axes x, y (mm)
+% Totals and profiles are computed in double for single-precision maps
+
+% Normalize image and projections
+Total = sum(Dose(:), 'double');
+imageN = Dose / Total;
+projX = double(sum(imageN, 1));
+projY = double(sum(imageN, 2)).';
+clear imageN;
+
+% Centroid and RMS
+x0 = sum(projX .* x) / sum(projX);
+y0 = sum(projY .* y) / sum(projY);
+profile = struct('projX', projX, 'projY', projY, 'x0', x0, 'y0', y0, ...
+                 'xstd', sqrt(sum(projX .* ((x - x0).^2)) / sum(projX)), ...
+                 'ystd', sqrt(sum(projY .* ((y - y0).^2)) / sum(projY)));
+
+end
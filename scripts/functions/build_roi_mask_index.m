@@ -0,0 +1,35 @@
+function mask_idx = build_roi_mask_index(roi_mat_path, selected_mask_numbers, DownCut, UpCut, LeftCut, RightCut, ny, nx)
+% Build cropped linear indices of the selected lead mask (or intersection of masks)
+% for an analysis window of size ny x nx
+
+    load(roi_mat_path, 'lead_data');
+
+    mask_idx = [];
+    masks_found = 0;
+
+    for mask_num = selected_mask_numbers
+        field_name = sprintf('film_%d', mask_num);
+        if ~isfield(lead_data, field_name)
+            continue;
+        endif
+
+        [mask_rows, mask_cols] = lead_mask_coords(lead_data.(field_name));
+
+        % Adjust coordinates for image cropping
+        rows = mask_rows - DownCut;
+        cols = mask_cols - LeftCut;
+
+        % Keep valid coordinates within image bounds
+        valid_coords = (rows >= 1) & (rows <= ny) & (cols >= 1) & (cols <= nx);
+        current_idx = sort(sub2ind([ny, nx], rows(valid_coords), cols(valid_coords)));
+
+        masks_found = masks_found + 1;
+        if masks_found == 1
+            mask_idx = current_idx;
+        else
+            mask_idx = intersect(mask_idx, current_idx);
+        endif
+    endfor
+
+    mask_idx = mask_idx(:);
+end
@@ -1,78 +1,47 @@
 function [Dose_center_mask, Dose_center_mask_std] = calculate_roi_mask_dose(Dose_Film, roi_mat_path, selected_mask_numbers, DownCut, UpCut, LeftCut, RightCut)
 % Calculate mean dose within ROI mask regions
+% The mask index does not depend on the film, so it is built once per run and reused
 
-    load(roi_mat_path, 'lead_data');
-    [ny, nx] = size(Dose_Film);
-
-    if length(selected_mask_numbers) == 1
-        % Single mask processing
-        mask_num = selected_mask_numbers(1);
-        field_name = sprintf('film_%d', mask_num);
+    persistent mask_index_cache
 
-        if isfield(lead_data, field_name)
-            mask_coords = lead_data.(field_name).mask_pixel_coords;
+    if isempty(mask_index_cache)
+        mask_index_cache = containers.Map('KeyType', 'char', 'ValueType', 'any');
+    endif
 
-            % Adjust coordinates for image cropping
-            adjusted_coords = mask_coords;
-            adjusted_coords(:,1) = adjusted_coords(:,1) - DownCut;
-            adjusted_coords(:,2) = adjusted_coords(:,2) - LeftCut;
+    [ny, nx] = size(Dose_Film);
 
-            % Keep valid coordinates within image bounds
-            valid_coords = (adjusted_coords(:,1) >= 1) & (adjusted_coords(:,1) <= ny) & ...
-                          (adjusted_coords(:,2) >= 1) & (adjusted_coords(:,2) <= nx);
-            adjusted_coords = adjusted_coords(valid_coords, :);
+    % Cache key: ROI MAT file (with modification time), masks, crop and window size
+    mat_info = dir(roi_mat_path);
+    if isempty(mat_info)
+        mat_stamp = 0;
+    else
+        mat_stamp = mat_info(1).datenum;
+    endif
+    cache_key = sprintf('%s|%.10f|%s|%d|%d|%d|%d|%d|%d', roi_mat_path, mat_stamp, ...
+                        mat2str(selected_mask_numbers), DownCut, UpCut, LeftCut, RightCut, ny, nx);
 
-            if ~isempty(adjusted_coords)
-                linear_indices = sub2ind([ny, nx], adjusted_coords(:,1), adjusted_coords(:,2));
-                dose_values_in_mask = Dose_Film(linear_indices);
-                Dose_center_mask = mean(dose_values_in_mask);
-                Dose_center_mask_std = std(dose_values_in_mask);
-            else
-                Dose_center_mask = 0;
-                Dose_center_mask_std = 0;
-            endif
+    if isKey(mask_index_cache, cache_key)
+        mask_idx = mask_index_cache(cache_key);
+    else
+        t_load = tic;
+        mask_idx = build_roi_mask_index(roi_mat_path, selected_mask_numbers, ...
+                                        DownCut, UpCut, LeftCut, RightCut, ny, nx);
+        mask_index_cache(cache_key) = mask_idx;
+        if isempty(mat_info)
+            mat_kb = 0;
         else
-            Dose_center_mask = 0;
-            Dose_center_mask_std = 0;
+            mat_kb = mat_info(1).bytes / 1024;
         endif
+        printf("Lead mask index built: %d pixels (mask file %.1f KB, loaded in %.3f s)\n", ...
+               numel(mask_idx), mat_kb, toc(t_load));
+    endif
 
+    if ~isempty(mask_idx)
+        dose_values_in_mask = double(Dose_Film(mask_idx));
+        Dose_center_mask = mean(dose_values_in_mask);
+        Dose_center_mask_std = std(dose_values_in_mask);
     else
-        % Multiple masks - find intersection
-        intersection_mask = true(ny, nx);
-        masks_found = 0;
-
-        for mask_num = selected_mask_numbers
-            field_name = sprintf('film_%d', mask_num);
-
-            if isfield(lead_data, field_name)
-                masks_found = masks_found + 1;
-                mask_coords = lead_data.(field_name).mask_pixel_coords;
-
-                adjusted_coords = mask_coords;
-                adjusted_coords(:,1) = adjusted_coords(:,1) - DownCut;
-                adjusted_coords(:,2) = adjusted_coords(:,2) - LeftCut;
-
-                valid_coords = (adjusted_coords(:,1) >= 1) & (adjusted_coords(:,1) <= ny) & ...
-                              (adjusted_coords(:,2) >= 1) & (adjusted_coords(:,2) <= nx);
-                adjusted_coords = adjusted_coords(valid_coords, :);
-
-                current_mask = false(ny, nx);
-                if ~isempty(adjusted_coords)
-                    linear_indices = sub2ind([ny, nx], adjusted_coords(:,1), adjusted_coords(:,2));
-                    current_mask(linear_indices) = true;
-                endif
-
-                intersection_mask = intersection_mask & current_mask;
-            endif
-        endfor
-
-        if masks_found > 0 && any(intersection_mask(:))
-            dose_values_in_intersection = Dose_Film(intersection_mask);
-            Dose_center_mask = mean(dose_values_in_intersection);
-            Dose_center_mask_std = std(dose_values_in_intersection);
-        else
-            Dose_center_mask = 0;
-            Dose_center_mask_std = 0;
-        endif
+        Dose_center_mask = 0;
+        Dose_center_mask_std = 0;
     endif
 end
@@ -0,0 +1,106 @@
+function varargout = film_cache(action, varargin)
+% Size-bounded LRU cache of per-film analysis intermediates (one file per entry in cache/)
+% film_cache('init', limit_mb) opens the cache; a limit of 0 disables it
+% [value, hit] = film_cache('get', key) returns a stored struct, hit is false if there is none
+% hit = film_cache('has', key) tells whether a struct is stored, without loading it
+% film_cache('put', key, value) stores a struct, evicting the least recently used entries
+% film_cache('flush') writes the index (entry sizes and last use) for the next run
+% An empty key is always a miss and is never stored
+
+    persistent cache_dir limit_bytes index
+
+    if isempty(index)
+        index = struct('keys', {{}}, 'bytes', [], 'last_used', []);
+        limit_bytes = 0;
+    endif
+
+    switch action
+        case 'init'
+            cache_dir = 'cache/';
+            limit_bytes = varargin{1} * 2^20;
+            index = struct('keys', {{}}, 'bytes', [], 'last_used', []);
+            if limit_bytes <= 0
+                return;
+            endif
+            if ~exist(cache_dir, 'dir')
+                mkdir(cache_dir);
+            endif
+            index_file = strcat(cache_dir, 'index.mat');
+            if exist(index_file, 'file')
+                stored = load(index_file);
+                index = stored.index;
+                % Drop entries whose files were removed by hand
+                present = cellfun(@(k) exist(strcat(cache_dir, k, '.mat'), 'file') > 0, index.keys);
+                index.keys = index.keys(present);
+                index.bytes = index.bytes(present);
+                index.last_used = index.last_used(present);
+            endif
+            % Entries written by an interrupted run are not in the index yet
+            for entry = dir(strcat(cache_dir, '*.mat'))'
+                key = entry.name(1:end-4);
+                if ~strcmp(entry.name, 'index.mat') && ~any(strcmp(index.keys, key))
+                    index.keys{end+1} = key;
+                    index.bytes(end+1) = entry.bytes;
+                    index.last_used(end+1) = entry.datenum;
+                endif
+            endfor
+
+        case 'get'
+            varargout = {[], false};
+            key = varargin{1};
+            if limit_bytes <= 0 || isempty(key)
+                return;
+            endif
+            k = find(strcmp(index.keys, key), 1);
+            if isempty(k)
+                return;
+            endif
+            t0 = trace_span();
+            stored = load(strcat(cache_dir, key, '.mat'));
+            trace_span('cache_load', t0, 'io');
+            index.last_used(k) = now();
+            varargout = {stored.value, true};
+
+        case 'has'
+            key = varargin{1};
+            varargout = {limit_bytes > 0 && ~isempty(key) && any(strcmp(index.keys, key))};
+
+        case 'put'
+            key = varargin{1};
+            value = varargin{2};
+            if limit_bytes <= 0 || isempty(key)
+                return;
+            endif
+            entry_file = strcat(cache_dir, key, '.mat');
+            t0 = trace_span();
+            save('-binary', entry_file, 'value');
+            trace_span('cache_save', t0, 'io');
+            entry_info = dir(entry_file);
+
+            k = find(strcmp(index.keys, key), 1);
+            if isempty(k)
+                k = numel(index.keys) + 1;
+                index.keys{k} = key;
+            endif
+            index.bytes(k) = entry_info(1).bytes;
+            index.last_used(k) = now();
+
+            % Evict least recently used entries until the cache fits its limit
+            while sum(index.bytes) > limit_bytes && ~isempty(index.keys)
+                [~, oldest] = min(index.last_used);
+                delete(strcat(cache_dir, index.keys{oldest}, '.mat'));
+                index.keys(oldest) = [];
+                index.bytes(oldest) = [];
+                index.last_used(oldest) = [];
+            endwhile
+
+        case 'flush'
+            if limit_bytes > 0
+                save('-binary', strcat(cache_dir, 'index.mat'), 'index');
+                printf("Film cache: %d entries, %.1f MB\n", numel(index.keys), sum(index.bytes) / 2^20);
+            endif
+
+        otherwise
+            error('film_cache: unknown action %s', action);
+    endswitch
+end
@@ -0,0 +1,28 @@
+function key = film_cache_key(directory_films, film_name, precision, BGND_Type, bgnd_file, crop)
+% Film cache key of one film's analysis intermediates
+% Identifies the film content (source file stamp), the background setting (edge slices or
+% the stamp of the background file), the crop margins and the working precision
+
+    key_parts = {directory_films, film_name, precision, sprintf('%d,', crop)};
+
+    % Films are read from the dose cube when the directory has one, else from the .dat file
+    source_info = dir(strcat(directory_films, 'dose_cube.f32'));
+    if isempty(source_info)
+        source_info = dir(strcat(directory_films, film_name));
+    endif
+    if ~isempty(source_info)
+        key_parts{end+1} = sprintf('%d@%.10f', source_info(1).bytes, source_info(1).datenum);
+    endif
+
+    if BGND_Type == 0
+        bgnd_info = dir(bgnd_file);
+        key_parts{end+1} = bgnd_file;
+        if ~isempty(bgnd_info)
+            key_parts{end+1} = sprintf('%d@%.10f', bgnd_info(1).bytes, bgnd_info(1).datenum);
+        endif
+    else
+        key_parts{end+1} = sprintf('edge:%d', BGND_Type);
+    endif
+
+    key = hash('md5', strjoin(key_parts, '|'));
+end
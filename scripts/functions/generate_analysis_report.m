@@ -9,6 +9,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     printf("Generating PDF report...\n");
     warning('off', 'all');
     outfile = "analysis_report";
+    report_image_dpi = 150;
     current_toolkit = graphics_toolkit();
     graphics_toolkit("gnuplot");
 
@@ -23,6 +24,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     calibrated_dose_cd2 = Dose_CD_all * avg_calibration_coeff2;
 
     % --- PAGE 1: Analysis Results ---
+    t0 = trace_span();
     figure('visible', 'off', 'PaperUnits', 'centimeters', 'PaperSize', [21 29.7], 'PaperPosition', [0.5 0.5 20 28.7]);
 
     % 1. Doses Plot
@@ -30,6 +32,8 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     hold on;
     n = length(Dose_CD_all);
     x_vals = 1:n;
+    % Thin out film-number ticks for large campaigns (at most ~25 labels)
+    x_ticks = x_vals(1:ceil(n/25):end);
 
     % Plot with proper Octave-compatible error bars
     h1 = errorbar(x_vals, Dose_with_BGND_Gy_all, Dose_with_BGND_Gy_std_all, '~');
@@ -58,7 +62,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
 
     % Format plot to match original
     xlim([0.5, n + 0.5]);
-    xticks(x_vals);
+    xticks(x_ticks);
     xlabel('Film #', 'FontSize', 9);
     ylabel('Dose center [Gy]', 'FontSize', 9);
     title('Measured Doses', 'FontSize', 10);
@@ -89,25 +93,12 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
 
     legend(legend_handles, legend_items, 'Location', 'north', 'FontSize', 7, 'Box', 'on', 'EdgeColor', [0.5 0.5 0.5], 'Orientation', 'horizontal', 'Interpreter', 'none');
 
-    % 2. Measurements Table
-    n_rows = length(film_names) + 1;
+    % 2. Measurements Table (continued on extra pages when it does not fit below the plot)
     row_height = 0.035;
-    table_content_height = row_height * n_rows;
     title_height = 0.025;
     plot_bottom = 0.74;
     gap_size = 0.05;
-    table_title_top = plot_bottom - gap_size;
-    table_title_bottom = table_title_top - title_height;
-    table_bottom = table_title_bottom - table_content_height;
-
-    subplot('Position', [0.05 table_bottom 0.9 table_content_height]);
-    axis off;
-    hold on;
-    xlim([0 1]);
-    ylim([0 1]);
-
-    title_y_pos = 1 + (title_height / table_content_height);
-    text(0.5, title_y_pos, 'Summary Table', 'FontSize', 10, 'FontWeight', 'bold', 'HorizontalAlignment', 'center', 'VerticalAlignment', 'middle');
+    bottom_margin = 0.02;
 
     headers = {'File', 'Dose w/BG', 'Dose no BG', 'Dose CD', 'Dose lead', 'Charge', 'Notes', 'x0', 'y0', 'xstd', 'ystd'};
 
@@ -139,22 +130,11 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
         };
     endfor
 
-    % Compute column widths
-    col_lengths = zeros(1, cols);
-    for c = 1:cols
-        max_len = 0;
-        for r = 1:(rows+1)
-            current_len = length(table_data{r, c});
-            if r == 1
-                current_len = current_len * 1.3;
-            endif
-            if c > 1 && r > 1
-                current_len = current_len * 1.1;
-            endif
-            max_len = max(max_len, current_len);
-        endfor
-        col_lengths(c) = max_len;
-    endfor
+    % Compute column widths once, so every page of the table has the same columns
+    cell_lengths = cellfun(@length, table_data);
+    cell_lengths(1, :) = cell_lengths(1, :) * 1.3;
+    cell_lengths(2:end, 2:end) = cell_lengths(2:end, 2:end) * 1.1;
+    col_lengths = max(cell_lengths, [], 1);
 
     min_widths = [6.1, 7.5, 7.5, 7.5, 7.5, 6.5, 7.2, 7.1, 7.1, 7, 7];
     col_lengths = max(col_lengths, min_widths);
@@ -162,47 +142,34 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     col_norm = col_lengths / total_len;
     col_pos = [0, cumsum(col_norm)];
 
-    norm_row_height = 1 / (rows + 1);
-
-    % Draw table
-    for r = 1:(rows + 1)
-        current_y = 1 - (r-1) * norm_row_height;
-        next_y = current_y - norm_row_height;
-
-        line([0, 1], [current_y, current_y], 'Color', [0.3 0.3 0.3], 'LineWidth', 1.0);
-
-        if r == (rows + 1)
-            line([0, 1], [next_y, next_y], 'Color', [0.3 0.3 0.3], 'LineWidth', 1.0);
+    table_title_top = plot_bottom - gap_size;
+    table_title = 'Summary Table';
+    print_args = {'-dpdf'};
+    first_row = 1;
+    while true
+        capacity = max(1, floor((table_title_top - title_height - bottom_margin) / row_height) - 1);
+        page_rows = first_row:min(rows, first_row + capacity - 1);
+        draw_table(table_data([1, page_rows + 1], :), col_pos, table_title, ...
+                   table_title_top - title_height, row_height, title_height);
+        first_row = first_row + length(page_rows);
+        if first_row > rows
+            break;
         endif
 
-        for c = 1:cols
-            x = col_pos(c);
-            w = col_norm(c);
-            val = table_data{r, c};
-
-            line([x, x], [current_y, next_y], 'Color', [0.3 0.3 0.3], 'LineWidth', 1.0);
-            if c == cols
-                line([x + w, x + w], [current_y, next_y], 'Color', [0.3 0.3 0.3], 'LineWidth', 1.0);
-            endif
-
-            if r == 1
-                fw = 'bold';
-                font_size = 9;
-            else
-                fw = 'normal';
-                font_size = 8.5;
-            endif
-
-            text_x = x + 0.008;
-            text_y = current_y - norm_row_height/2;
-            text(text_x, text_y, val, 'FontSize', font_size, ...
-                 'FontWeight', fw, 'Interpreter', 'none', 'VerticalAlignment', 'middle', 'HorizontalAlignment', 'left');
-        endfor
-    endfor
+        print(outfile, print_args{:});
+        close(gcf);
+        print_args = {'-dpdf', '-append'};
+        figure('visible', 'off', 'PaperUnits', 'centimeters', 'PaperSize', [21 29.7], 'PaperPosition', [0.5 0.5 20 28.7]);
+        table_title_top = 0.99;
+        table_title = 'Summary Table (continued)';
+    endwhile
 
-    print(outfile, '-dpdf');
+    print(outfile, print_args{:});
+    close(gcf);
+    trace_span('pdf_page', t0, 'report');
 
     % --- PAGE 2: Parameters and Calibration ---
+    t0 = trace_span();
     figure('visible', 'off', 'PaperUnits', 'centimeters', ...
            'PaperSize', [21 29.7], 'PaperPosition', [0.5 0.5 20 28.7]);
 
@@ -219,7 +186,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
         line([0.5, n + 0.5], [avg_calibration_coeff2, avg_calibration_coeff2], 'Color', [0.5 0.5 0.5], 'LineStyle', '-.', 'LineWidth', 1.2);
 
         xlim([0.5, n + 0.5]);
-        xticks(x_vals);
+        xticks(x_ticks);
         xlabel('Film #', 'FontSize', 9);
         ylabel('Coeff.', 'FontSize', 9);
         title('Calibration Coefficients', 'FontSize', 10);
@@ -299,9 +266,8 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
         y_pos = y_pos - line_spacing;
 
         % Display ROI image with original positioning
-        roi_img = imread(roi_image_path);
-        [img_height_px, img_width_px, ~] = size(roi_img);
-        aspect_ratio = img_width_px / img_height_px;
+        info = imfinfo(roi_image_path);
+        aspect_ratio = info(1).Width / info(1).Height;
         max_img_height = 0.95;
         max_img_width = 0.99;
 
@@ -313,6 +279,10 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
             img_width_norm = max_img_height * aspect_ratio;
         endif
 
+        % Embed the image at the output resolution rather than at scan resolution
+        target_width_px = round(img_width_norm * 20 / 2.54 * report_image_dpi);
+        roi_img = load_report_image(roi_image_path, target_width_px);
+
         img_x = 0.04 + (0.99 - img_width_norm) / 2;
         img_y = 0.69 - (0.95 - text_end_position) * 0.1 - img_height_norm;
 
@@ -344,8 +314,10 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     endif
 
     print(outfile, '-dpdf', '-append');
+    trace_span('pdf_page', t0, 'report');
 
     % --- PAGE 3: Position and Size Jitter ---
+    t0 = trace_span();
     figure('visible', 'off', 'PaperUnits', 'centimeters', 'PaperSize', [21 29.7], 'PaperPosition', [0.5 0.5 20 28.7]);
 
     % 1. Size Jitter Plot
@@ -355,7 +327,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     plot(x_vals, ystd_all, '-*', 'color', [0.8 0.2 0.2], 'markerfacecolor', [0.8 0.2 0.2], 'linewidth', 1.2, 'markersize', 3.5);
 
     xlim([0.5, n + 0.5]);
-    xticks(x_vals);
+    xticks(x_ticks);
     xlabel('Film #', 'FontSize', 9);
     ylabel('Size [mm]', 'FontSize', 9);
     title('Size Jitter', 'FontSize', 10);
@@ -370,7 +342,7 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     plot(x_vals, y0_all, '-*', 'color', [0.8 0.2 0.2], 'markerfacecolor', [0.8 0.2 0.2], 'linewidth', 1.2, 'markersize', 3.5);
 
     xlim([0.5, n + 0.5]);
-    xticks(x_vals);
+    xticks(x_ticks);
     xlabel('Film #', 'FontSize', 9);
     ylabel('Position [mm]', 'FontSize', 9);
     title('Position Jitter', 'FontSize', 10);
@@ -379,9 +351,76 @@ function generate_analysis_report(film_names, Dose_CD_all, Dose_with_BGND_Gy_all
     legend({'x0', 'y0'}, 'Location', 'north', 'Orientation', 'horizontal', 'FontSize', 8);
 
     print(outfile, '-dpdf', '-append');
+    trace_span('pdf_page', t0, 'report');
 
     % Cleanup
     printf("PDF report saved to %s.pdf\n", outfile);
     graphics_toolkit(current_toolkit);
     close all force;
 end
+
+function draw_table(table_data, col_pos, table_title, table_top, row_height, title_height)
+% Draw a bordered table whose first row is the header, with its top edge at table_top.
+% All grid lines are drawn as one line object and each row style with one text() call,
+% so drawing time does not grow with the number of graphics objects per cell.
+    [n_rows, cols] = size(table_data);
+    table_content_height = row_height * n_rows;
+
+    subplot('Position', [0.05 (table_top - table_content_height) 0.9 table_content_height]);
+    axis off;
+    hold on;
+    xlim([0 1]);
+    ylim([0 1]);
+
+    title_y_pos = 1 + (title_height / table_content_height);
+    text(0.5, title_y_pos, table_title, 'FontSize', 10, 'FontWeight', 'bold', 'HorizontalAlignment', 'center', 'VerticalAlignment', 'middle');
+
+    norm_row_height = 1 / n_rows;
+    row_y = 1 - (0:n_rows) * norm_row_height;
+
+    % Grid: horizontal and vertical segments separated by NaN
+    grid_x = [repmat([0; 1; NaN], 1, n_rows + 1), repmat(col_pos, 3, 1)];
+    grid_y = [repmat(row_y, 3, 1), repmat([1; 0; NaN], 1, cols + 1)];
+    grid_x(3, :) = NaN;
+    grid_y(3, :) = NaN;
+    line(grid_x(:), grid_y(:), 'Color', [0.3 0.3 0.3], 'LineWidth', 1.0);
+
+    % Cell text: header row bold, body rows normal
+    text_x = repmat(col_pos(1:cols) + 0.008, n_rows, 1);
+    text_y = repmat(row_y(1:n_rows)' - norm_row_height/2, 1, cols);
+    text(text_x(1, :), text_y(1, :), table_data(1, :), 'FontSize', 9, ...
+         'FontWeight', 'bold', 'Interpreter', 'none', 'VerticalAlignment', 'middle', 'HorizontalAlignment', 'left');
+    if n_rows > 1
+        body_x = text_x(2:end, :);
+        body_y = text_y(2:end, :);
+        body = table_data(2:end, :);
+        text(body_x(:), body_y(:), body(:), 'FontSize', 8.5, ...
+             'FontWeight', 'normal', 'Interpreter', 'none', 'VerticalAlignment', 'middle', 'HorizontalAlignment', 'left');
+    endif
+end
+
+function img = load_report_image(image_path, target_width_px)
+% Read an image downsampled to at most target_width_px columns. The downsampled copy is
+% cached in report_cache/ and reused while it is newer than the source image.
+    [~, name] = fileparts(image_path);
+    cache_dir = 'report_cache';
+    cache_file = fullfile(cache_dir, sprintf('%s_%dpx.png', name, target_width_px));
+
+    source_info = dir(image_path);
+    cache_info = dir(cache_file);
+    if ~isempty(cache_info) && cache_info.datenum >= source_info.datenum
+        img = imread(cache_file);
+        return;
+    endif
+
+    img = imread(image_path);
+    step = floor(size(img, 2) / target_width_px);
+    if step > 1
+        img = img(1:step:end, 1:step:end, :);
+    endif
+
+    if ~exist(cache_dir, 'dir')
+        mkdir(cache_dir);
+    endif
+    imwrite(img, cache_file);
+end
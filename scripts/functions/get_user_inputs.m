@@ -1,6 +1,7 @@
 function [roi_shape, roi_size, directory_films, ndata, datasets, ...
           roi_image_path, roi_mat_path, selected_masks, ...
-          bgnd_choice, bgnd_file, bg_nums, main_nums, include_calib_plot, film_notes] = get_user_inputs()
+          bgnd_choice, bgnd_file, bg_nums, main_nums, include_calib_plot, film_notes, ...
+          precision, sweep] = get_user_inputs()
 
     pkg load io;
 
@@ -27,6 +28,17 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
         main_nums = user_data.main_nums(:)';
         include_calib_plot = user_data.include_calib_plot;
         film_notes = user_data.film_notes;
+        if isfield(user_data, 'single_precision') && user_data.single_precision
+            precision = 'single';
+        else
+            precision = 'double';
+        endif
+        % Parameter sweep: lists of ROI sizes, ROI shapes and background choices (empty for a normal run)
+        if isfield(user_data, 'sweep') && isfield(user_data.sweep, 'roi_sizes')
+            sweep = user_data.sweep;
+        else
+            sweep = [];
+        endif
 
         % Display loaded settings
         printf("Loaded settings:\n");
@@ -43,6 +55,11 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
         printf("  Image of the lead films: %s\n", roi_image_path);
         printf("  Selected masks: [%s]\n", num2str(selected_masks));
         printf("  Include calibration plot: %d\n", include_calib_plot);
+        printf("  Precision: %s\n", precision);
+        if ~isempty(sweep)
+            printf("  Sweep: ROI sizes [%s] mm, shapes %s, backgrounds %s\n", num2str(sweep.roi_sizes(:)'), ...
+                   strjoin(cellstr(sweep.roi_shapes), '/'), strjoin(cellstr(sweep.bgnd_choices), '/'));
+        endif
 
         % Check directory and find datasets
         if ~exist(directory_films, 'dir')
@@ -51,6 +68,9 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
 
         path = [strcat(directory_films, "*.dat")];
         datasets = dir(path);
+        if isempty(datasets)
+            datasets = dose_cube_datasets(directory_films);
+        endif
         ndata = length(datasets);
         printf("Found %d data files.\n", ndata);
 
@@ -83,6 +103,9 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
     % Check for data files or extract archive
     path = [strcat(directory_films, "*.dat")];
     datasets = dir(path);
+    if isempty(datasets)
+        datasets = dose_cube_datasets(directory_films);
+    endif
     ndata = length(datasets);
 
     if ndata == 0
@@ -248,6 +271,16 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
 
     include_calib_plot = input("Include calibration plot in the pdf report? (1 - yes, 0 - no): ");
 
+    % Working precision of the dose maps
+    if input("Analyse in single precision (float32)? (1 - yes, 0 - no): ") == 1
+        precision = 'single';
+    else
+        precision = 'double';
+    endif
+
+    % Parameter sweeps are started from the GUI
+    sweep = [];
+
     % Get film notes
     n_main = length(main_nums);
     while true
@@ -276,3 +309,15 @@ function [roi_shape, roi_size, directory_films, ndata, datasets, ...
         endif
     endwhile
 endfunction
+
+function datasets = dose_cube_datasets(directory_films)
+    % Film list of the dose cube, if the calibration wrote one; the films are then read
+    % from the cube and the archive does not need to be extracted
+    datasets = struct('name', {});
+    index_file = strcat(directory_films, "dose_cube.json");
+    if exist(index_file, 'file') && exist(strcat(directory_films, "dose_cube.f32"), 'file')
+        index = jsondecode(fileread(index_file));
+        datasets = struct('name', sort(cellstr(index.names))');
+        printf("Reading films from the dose cube in %s\n", directory_films);
+    endif
+endfunction
@@ -1,4 +1,4 @@
-function [Dose_Film, Dose_Film_nobgnd, Dose_Gauss, Dose_Exp_EBT3, Dose_Exp_XDWrong, nxF, nyF, nx, ny] = ...
+function [Dose_Film, Dose_Film_nobgnd, Dose_Gauss, Dose_Exp_EBT3, Dose_Exp_XDWrong, nxF, nyF, nx, ny, CD_scale] = ...
     image_analysis_function(imageF, charge, imageBGND_F, BGND_Type, DownCut, UpCut, LeftCut, RightCut, pixsizeX, pixsizeY)
 
 charge
@@ -22,8 +22,8 @@ if (BGND_Type == 0)
     % Use pre-recorded background image
     imageBGND = imageBGND_F(DownCut:nyF-UpCut, LeftCut:nxF-RightCut);
 
-    total_pix_BGND = sum(imageBGND(:));
-    total_pix = sum(image(:));
+    total_pix_BGND = sum(imageBGND(:), 'double');
+    total_pix = sum(image(:), 'double');
     Ratio = total_pix_BGND / total_pix;
 
     printf("Total pre-recorded background to image: %d%%\n", round(Ratio*100));
@@ -45,9 +45,9 @@ else
     bgnd_std = std(a);
 
     imageC = image - bgnd;
-    total_pix = sum(image(:));
+    total_pix = sum(image(:), 'double');
     imageBGND_FLAT = image - imageC;
-    total_pix_BGND = sum(imageBGND_FLAT(:));
+    total_pix_BGND = sum(imageBGND_FLAT(:), 'double');
     Ratio = total_pix_BGND / total_pix;
     image = imageC;
     Dose_Film_nobgnd = image;
@@ -56,13 +56,13 @@ else
     printf("Total background to image from edges: %d%%\n", round(Ratio*100));
 end
 
-% Normalize image to total charge
-total_pix = sum(image(:));
-imageN = double(image / total_pix);
+% Normalize image to total charge (maps keep the working precision, totals are double)
+total_pix = sum(image(:), 'double');
+imageN = image / total_pix;
 
 % Scale by charge measurement
 imageNC = imageN * charge;
-totalCharge_nC = sum(imageNC(:));
+totalCharge_nC = sum(imageNC(:), 'double');
 printf("Total charge check: %.3f nC\n", totalCharge_nC);
 
 % Calculate charge density
@@ -87,4 +87,7 @@ coeff_theory = Dose_1Gy / Density2D0;
 
 Dose_Gauss = Density2D * coeff_theory;
 
+% Dose_Gauss is the no-background map times a single scalar
+CD_scale = charge / total_pix / pixel_area * coeff_theory;
+
 end
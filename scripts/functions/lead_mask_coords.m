@@ -0,0 +1,32 @@
+function [rows, cols] = lead_mask_coords(entry)
+% Pixel coordinates (in the cropped film) of one lead mask stored by analyzeLeadRegion
+% Compact entries (bounding box + run-length encoded bitmap) are decoded here, so only
+% the selected masks are ever expanded; older files store mask_pixel_coords directly
+
+    if ~isfield(entry, 'mask_runs')
+        rows = entry.mask_pixel_coords(:,1);
+        cols = entry.mask_pixel_coords(:,2);
+        return;
+    endif
+
+    bbox = double(entry.mask_bbox);
+    runs = double(entry.mask_runs);
+    if isempty(runs)
+        rows = zeros(0, 1);
+        cols = zeros(0, 1);
+        return;
+    endif
+
+    box_h = bbox(2) - bbox(1) + 1;
+    box_w = bbox(4) - bbox(3) + 1;
+
+    % +1 at each run start, -1 just past its end; the running sum is the bitmap
+    marks = zeros(box_h * box_w + 1, 1);
+    marks(runs(1,:)) = 1;
+    marks(runs(1,:) + runs(2,:)) = -1;
+    box = reshape(cumsum(marks(1:end-1)) > 0, box_h, box_w);
+
+    [r, c] = find(box);
+    rows = r + bbox(1) - 1;
+    cols = c + bbox(3) - 1;
+end
@@ -0,0 +1,51 @@
+function [image_film, charge] = load_calibrated_film(directory_films, film_name, precision)
+% Load one calibrated film (dose map in Gy and charge) by its .dat name
+% The dose map is returned in the requested precision ('double' or 'single')
+% If the calibrated directory has a dose cube (dose_cube.f32 + dose_cube.json), the film is
+% read directly at its offset in the cube; otherwise the extracted .dat file is loaded
+
+    persistent cube_dir cube
+
+    if ~strcmp(cube_dir, directory_films)
+        cube_dir = directory_films;
+        cube = open_dose_cube(directory_films);
+    endif
+
+    if ~isempty(cube)
+        k = find(strcmp(cube.names, film_name), 1);
+        if ~isempty(k)
+            film_values = cube.height * cube.width;
+            fid = fopen(cube.file, 'r', 'ieee-le');
+            fseek(fid, (k - 1) * film_values * 4, 'bof');
+            image_film = reshape(fread(fid, film_values, ['float32=>', precision]), cube.height, cube.width);
+            fclose(fid);
+            charge = cube.charges(k);
+            return;
+        endif
+    endif
+
+    data1 = load(strcat(directory_films, film_name));
+    image_film = cast(data1.image_film_Gy, precision);
+    charge = double(data1.charge);
+end
+
+function cube = open_dose_cube(directory_films)
+% Read the dose cube index; empty if the directory has no (complete) cube
+    cube = [];
+    index_file = strcat(directory_films, 'dose_cube.json');
+    cube_file = strcat(directory_films, 'dose_cube.f32');
+    if ~exist(index_file, 'file') || ~exist(cube_file, 'file')
+        return;
+    endif
+
+    index = jsondecode(fileread(index_file));
+    names = cellstr(index.names);
+    cube_info = dir(cube_file);
+    if cube_info(1).bytes ~= numel(names) * index.height * index.width * 4
+        printf("Dose cube %s is incomplete; loading .dat files instead\n", cube_file);
+        return;
+    endif
+
+    cube = struct('file', cube_file, 'height', index.height, 'width', index.width, ...
+                  'names', {names(:)'}, 'charges', double(index.charges(:)'));
+end
@@ -1,8 +1,14 @@
 function [Dose_center, xstd, ystd, x0, y0, bgnd_Dose_x, bgnd_Dose_y, Dose_center_std] = ...
-         plot_dose_function(Dose, name_output, pixsizeX, pixsizeY, roi_size, npix, T_calibration, roi_shape)
+         plot_dose_function(Dose, name_output, pixsizeX, pixsizeY, roi_size, npix, T_calibration, roi_shape, cache_key)
 
 global calibration charge_calibration name_screen
 
+% With a cache_key (identifying the map), the projections and Gaussian fits and the rendered
+% image are reused from the film cache; only the ROI dose is always recomputed
+if nargin < 9
+    cache_key = '';
+endif
+
 sizeall = size(Dose);
 ny = sizeall(1);
 nx = sizeall(2);
@@ -13,68 +19,92 @@ center_y = (ny - 1) * pixsizeY / 2;
 x = ((0:nx-1) * pixsizeX) - center_x;
 y = ((0:ny-1) * pixsizeY) - center_y;
 
-% Normalize image and projections
-Total = sum(Dose(:));
-imageN = Dose / Total;
-projX = sum(imageN, 1);
-projY = sum(imageN, 2).';
+% Gaussian model
+f = @(param, x) param(1) * exp(-(x-param(2)).^2/(2*param(3)^2)) + param(4);
+
+% Inline deterministic Gaussian fitting
+fit_gaussian = @(init_param, xv, yv) ...
+    fminsearch(@(p) sum((f(p, xv) - yv).^2), init_param, optimset('TolX',1e-8,'TolFun',1e-8,'MaxIter',1e4,'MaxFunEvals',1e4,'Display','off'));
+
+profile_key = '';
+if ~isempty(cache_key)
+    profile_key = hash('md5', sprintf('%s|profile|%d|%.17g|%.17g|%.17g', cache_key, npix, T_calibration, pixsizeX, pixsizeY));
+endif
+[profile, cached] = film_cache('get', profile_key);
 
-% Centroid and RMS
-x0 = sum(projX .* x) / sum(projX);
-y0 = sum(projY .* y) / sum(projY);
-xstd = sqrt(sum(projX .* ((x - x0).^2)) / sum(projX));
-ystd = sqrt(sum(projY .* ((y - y0).^2)) / sum(projY));
+if ~cached
+    profile = beam_profile(Dose, x, y);
+endif
+projX = profile.projX;
+projY = profile.projY;
+x0 = profile.x0;
+y0 = profile.y0;
+xstd = profile.xstd;
+ystd = profile.ystd;
 
 % Pixel coordinates
 pix_x0 = round((x0 + center_x) / pixsizeX);
 pix_y0 = round((y0 + center_y) / pixsizeY);
-[XX, YY] = meshgrid(x, y);
-dpix = round(roi_size / pixsizeX);
 
 % ROI dose
-if strcmp(roi_shape, "circle")
-    circlePixels = (YY - y0).^2 + (XX - x0).^2 <= roi_size.^2;
-    vals = Dose(circlePixels);
-    Dose_center = mean(vals);
-    Dose_center_std = std(vals);
-    region_desc = strcat(" circle (r=", num2str(roi_size), " mm)");
-else
-    vals = Dose(pix_y0-dpix:pix_y0+dpix, pix_x0-dpix:pix_x0+dpix);
-    Dose_center = mean(vals(:));
-    Dose_center_std = std(vals(:));
-    region_desc = strcat(" square (side=", num2str(2*roi_size), " mm)");
-endif
+[Dose_center, Dose_center_std, region_desc] = roi_dose_stats(Dose, x, y, x0, y0, roi_size, roi_shape, pixsizeX, pixsizeY);
 
 Dose_center_no_calibration = Dose_center;
 
-% Gaussian model
-f = @(param, x) param(1) * exp(-(x-param(2)).^2/(2*param(3)^2)) + param(4);
+% Central slices
+xslice = T_calibration * double(mean(Dose(pix_y0-npix/2:pix_y0+npix/2, :)));
+yslice = double(mean(Dose(:, pix_x0-npix/2:pix_x0+npix/2), 2)).';
 
-% Inline deterministic Gaussian fitting
-fit_gaussian = @(init_param, xv, yv) ...
-    fminsearch(@(p) sum((f(p, xv) - yv).^2), init_param, optimset('TolX',1e-8,'TolFun',1e-8,'MaxIter',1e4,'MaxFunEvals',1e4,'Display','off'));
+if ~cached
+    % Fit projections
+    t0 = trace_span();
+    profile.param_x = fit_gaussian([1.0;1.0;1.0;0.0], x-x0, projX);
+    trace_span('fminsearch', t0, 'compute');
+
+    t0 = trace_span();
+    profile.param_y = fit_gaussian([1.0;1.0;1.0;0.0], y-y0, projY);
+    trace_span('fminsearch', t0, 'compute');
+
+    % Fit central slices
+    t0 = trace_span();
+    profile.param_xs = fit_gaussian([18.0;1.0;1.0;0.0], x-x0, xslice);
+    trace_span('fminsearch', t0, 'compute');
 
-% Fit projections
-param = fit_gaussian([1.0;1.0;1.0;0.0], x-x0, projX);
-sigma_x = param(3);
-GaussX = f(param, x-x0);
+    t0 = trace_span();
+    profile.param_ys = fit_gaussian([18.0;1.0;1.0;0.0], y-y0, yslice);
+    trace_span('fminsearch', t0, 'compute');
 
-param = fit_gaussian([1.0;1.0;1.0;0.0], y-y0, projY);
-sigma_y = param(3);
-GaussY = f(param, y-y0);
+    film_cache('put', profile_key, profile);
+endif
 
-% Fit central slices
-xslice = T_calibration * mean(Dose(pix_y0-npix/2:pix_y0+npix/2, :));
-param = fit_gaussian([18.0;1.0;1.0;0.0], x-x0, xslice);
-bgnd_Dose_x = param(4);
-GaussXS = f(param, x-x0);
+sigma_x = profile.param_x(3);
+GaussX = f(profile.param_x, x-x0);
+sigma_y = profile.param_y(3);
+GaussY = f(profile.param_y, y-y0);
+bgnd_Dose_x = profile.param_xs(4);
+GaussXS = f(profile.param_xs, x-x0);
+bgnd_Dose_y = profile.param_ys(4);
+GaussYS = f(profile.param_ys, y-y0);
 
-yslice = mean(Dose(:, pix_x0-npix/2:pix_x0+npix/2), 2).';
-param = fit_gaussian([18.0;1.0;1.0;0.0], y-y0, yslice);
-bgnd_Dose_y = param(4);
-GaussYS = f(param, y-y0);
+% Skip rendering if this image was rendered from the same map and ROI and is unchanged since
+if ~exist("images","dir"); mkdir("images"); endif
+image_file = strcat('images/', name_output, '.png');
+image_key = '';
+if ~isempty(cache_key)
+    image_key = hash('md5', sprintf('%s|image|%s|%s|%.17g|%d|%.17g|%.17g', cache_key, name_output, ...
+                                    roi_shape, roi_size, npix, T_calibration, calibration));
+endif
+[rendered, rendered_before] = film_cache('get', image_key);
+image_info = dir(image_file);
+if rendered_before && ~isempty(image_info) && ...
+   strcmp(rendered.stamp, sprintf('%d@%.10f', image_info(1).bytes, image_info(1).datenum))
+    Dose_center = Dose_center*T_calibration;
+    Dose_center_std = Dose_center_std*T_calibration;
+    return;
+endif
 
 % Plots
+t0 = trace_span();
 clf;
 figure(1, 'visible', 'off', 'position', [20,400,1350,800]);
 
@@ -112,8 +142,14 @@ title(strcat('Average profile, bgnd x//y:', num2str(bgnd_Dose_x),'//',num2str(bg
 xlabel('coordinate [mm]'); ylabel(strcat(num2str(npix),'-slice-mean dose [Gy]'));
 legend('x','y','x-G','y-G','Dose center','location','eastoutside');
 
-if ~exist("images","dir"); mkdir("images"); endif
-saveas(gcf,strcat('images/',name_output,'.png'));
+trace_span('plot', t0, 'compute');
+
+t0 = trace_span();
+saveas(gcf, image_file);
+trace_span('saveas', t0, 'io');
+
+image_info = dir(image_file);
+film_cache('put', image_key, struct('stamp', sprintf('%d@%.10f', image_info(1).bytes, image_info(1).datenum)));
 
 % Calibration
 Dose_center = Dose_center*T_calibration;
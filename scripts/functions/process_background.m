@@ -1,6 +1,7 @@
 function [use_existing_bgnd, compute_new_bgnd, image_bgnd, chargeAll_bgnd, BGND_Type, bgnd_file] = ...
-    process_background(bgnd_choice, bgnd_file, bg_nums, directory_films, datasets)
+    process_background(bgnd_choice, bgnd_file, bg_nums, directory_films, datasets, precision)
 % Process background images based on user selection
+% The background image is returned in the working precision of the analysis ('double' or 'single')
 
     use_existing_bgnd = false;
     compute_new_bgnd = false;
@@ -10,7 +11,29 @@ function [use_existing_bgnd, compute_new_bgnd, image_bgnd, chargeAll_bgnd, BGND_
 
     switch bgnd_choice
         case 'existing'
-            load(bgnd_file);
+            % The user's file is read as it is; a legacy text-format file is read once and
+            % a binary copy kept in cache/backgrounds/ (keyed by the file's stamp) for later runs
+            if is_binary_background_file(bgnd_file)
+                stored = load(bgnd_file);
+            else
+                file_info = dir(bgnd_file);
+                copy_key = hash('md5', sprintf('%s|%d@%.10f', bgnd_file, file_info(1).bytes, file_info(1).datenum));
+                copy_file = strcat('cache/backgrounds/', copy_key, '.mat');
+                if exist(copy_file, 'file')
+                    stored = load(copy_file);
+                else
+                    stored = load(bgnd_file);
+                    if ~exist('cache/backgrounds', 'dir')
+                        mkdir('cache');
+                        mkdir('cache/backgrounds');
+                    endif
+                    save('-binary', copy_file, '-struct', 'stored');
+                endif
+            endif
+            image_bgnd = cast(stored.image_bgnd, precision);
+            if isfield(stored, 'chargeAll_bgnd')
+                chargeAll_bgnd = stored.chargeAll_bgnd;
+            endif
             use_existing_bgnd = true;
             BGND_Type = 0;
 
@@ -21,25 +44,61 @@ function [use_existing_bgnd, compute_new_bgnd, image_bgnd, chargeAll_bgnd, BGND_
             experiment_id = dir_name(1:calib_pos-1);
 
             n_bg = length(bg_nums);
+            bg_names = cell(1, n_bg);
+            for i = 1:n_bg
+                bg_names{i} = datasets(bg_nums(i)).name;
+            endfor
+
+            bgnd_file = sprintf('bgnd_avg_%d-%d_from_%s.mat', min(bg_nums), max(bg_nums), experiment_id);
+            bgnd_key = background_cache_key(directory_films, bg_names, precision);
+
+            % Reuse a stored background built from the same source films
+            if exist(bgnd_file, 'file')
+                stored = load(bgnd_file);
+                if isfield(stored, 'bgnd_key') && strcmp(stored.bgnd_key, bgnd_key)
+                    printf("Reusing stored background: %s\n", bgnd_file);
+                    image_bgnd = stored.image_bgnd;
+                    chargeAll_bgnd = stored.chargeAll_bgnd;
+                    use_existing_bgnd = true;
+                    BGND_Type = 0;
+                    return;
+                endif
+            endif
+
+            printf("Films to load: %s\n", strjoin(bg_names, '|'));
+            fflush(stdout);
+
+            % Running sum: only one batch of background films is held in memory
             chargeAll_bgnd = zeros(1, n_bg);
+            image_sum = [];
+            n_workers = parallel_worker_count();
+            load_member = @(name) load_calibrated_film(directory_films, name, precision);
 
-            % Load first image to get dimensions
-            nTest = strcat(directory_films, datasets(bg_nums(1)).name);
-            data1 = load(nTest);
-            bg_images = zeros([size(data1.image_film_Gy), n_bg]);
+            for batch_start = 1:n_workers:n_bg
+                batch = batch_start:min(batch_start + n_workers - 1, n_bg);
+                printf("Loading film %s\n", bg_names{batch});
+                fflush(stdout);
 
-            % Load and average background images
-            for i = 1:n_bg
-                file_idx = bg_nums(i);
-                nTest = strcat(directory_films, datasets(file_idx).name);
-                data1 = load(nTest);
-                bg_images(:,:,i) = double(data1.image_film_Gy);
-                chargeAll_bgnd(i) = double(data1.charge);
+                if numel(batch) > 1
+                    [images, charges] = parcellfun(numel(batch), load_member, bg_names(batch), ...
+                                                   'UniformOutput', false, 'VerboseLevel', 0);
+                else
+                    [images, charges] = cellfun(load_member, bg_names(batch), 'UniformOutput', false);
+                endif
+
+                for k = 1:numel(batch)
+                    if isempty(image_sum)
+                        image_sum = images{k};
+                    else
+                        image_sum = image_sum + images{k};
+                    endif
+                    chargeAll_bgnd(batch(k)) = charges{k};
+                endfor
+                clear images;
             endfor
 
-            image_bgnd = mean(bg_images, 3);
-            bgnd_file = sprintf('bgnd_avg_%d-%d_from_%s.mat', min(bg_nums), max(bg_nums), experiment_id);
-            save(bgnd_file, 'image_bgnd', 'chargeAll_bgnd', 'bg_nums');
+            image_bgnd = image_sum / n_bg;
+            save('-binary', bgnd_file, 'image_bgnd', 'chargeAll_bgnd', 'bg_nums', 'bgnd_key');
 
             use_existing_bgnd = true;
             compute_new_bgnd = true;
@@ -49,3 +108,41 @@ function [use_existing_bgnd, compute_new_bgnd, image_bgnd, chargeAll_bgnd, BGND_
             BGND_Type = 5; % Use edge-based background detection
     endswitch
 end
+
+function key = background_cache_key(directory_films, bg_names, precision)
+% Identify a background by source directory, film set, source file stamps and precision
+    key_parts = {directory_films};
+    if ~strcmp(precision, 'double')
+        key_parts{end+1} = precision;
+    endif
+
+    for source = {'experimental_films_data.tar.gz', 'dose_cube.f32'}
+        source_info = dir(strcat(directory_films, source{1}));
+        if ~isempty(source_info)
+            key_parts{end+1} = sprintf('%d@%.10f', source_info(1).bytes, source_info(1).datenum);
+        endif
+    endfor
+
+    for i = 1:numel(bg_names)
+        file_info = dir(strcat(directory_films, bg_names{i}));
+        if isempty(file_info)
+            key_parts{end+1} = bg_names{i};  % Read from the dose cube
+        else
+            key_parts{end+1} = sprintf('%s:%d', bg_names{i}, file_info(1).bytes);
+        endif
+    endfor
+
+    key = hash('md5', strjoin(key_parts, '|'));
+end
+
+function is_binary = is_binary_background_file(file_path)
+% Check for the Octave binary format signature
+    is_binary = false;
+    fid = fopen(file_path, 'r');
+    if fid == -1
+        return;
+    endif
+    header = fread(fid, 10, 'char=>char')';
+    fclose(fid);
+    is_binary = strncmp(header, 'Octave-1-', 9);
+end
@@ -0,0 +1,28 @@
+function [Dose_center, Dose_center_std, region_desc] = roi_dose_stats(Dose, x, y, x0, y0, roi_size, roi_shape, pixsizeX, pixsizeY)
+% Mean and standard deviation of the dose in the ROI centered on (x0, y0), in mm on the axes x, y
+% The ROI is a circle of radius roi_size or a square of side 2*roi_size; values are taken in double
+
+if strcmp(roi_shape, "circle")
+    % Only the bounding box of the circle is tested, not the whole map
+    cols = find(abs(x - x0) <= roi_size);
+    rows = find(abs(y - y0) <= roi_size);
+    [XX, YY] = meshgrid(x(cols), y(rows));
+    circlePixels = (YY - y0).^2 + (XX - x0).^2 <= roi_size.^2;
+    window = Dose(rows, cols);
+    vals = double(window(circlePixels));
+    Dose_center = mean(vals);
+    Dose_center_std = std(vals);
+    region_desc = strcat(" circle (r=", num2str(roi_size), " mm)");
+else
+    center_x = (numel(x) - 1) * pixsizeX / 2;
+    center_y = (numel(y) - 1) * pixsizeY / 2;
+    pix_x0 = round((x0 + center_x) / pixsizeX);
+    pix_y0 = round((y0 + center_y) / pixsizeY);
+    dpix = round(roi_size / pixsizeX);
+    vals = double(Dose(pix_y0-dpix:pix_y0+dpix, pix_x0-dpix:pix_x0+dpix));
+    Dose_center = mean(vals(:));
+    Dose_center_std = std(vals(:));
+    region_desc = strcat(" square (side=", num2str(2*roi_size), " mm)");
+endif
+
+end
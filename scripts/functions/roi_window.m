@@ -0,0 +1,15 @@
+function window = roi_window(Dose, x0, y0, pixsizeX, pixsizeY, max_roi_mm)
+% Float32 window of a dose map around the centroid (x0, y0) in mm, large enough for any
+% circle or square ROI up to max_roi_mm; the GUI re-evaluates the ROI dose from it
+
+    [ny, nx] = size(Dose);
+    center_col = round((x0 + (nx - 1) * pixsizeX / 2) / pixsizeX);
+    center_row = round((y0 + (ny - 1) * pixsizeY / 2) / pixsizeY);
+    half = ceil(max_roi_mm / min(pixsizeX, pixsizeY)) + 2;
+
+    rows = max(1, center_row - half):min(ny, center_row + half + 1);
+    cols = max(1, center_col - half):min(nx, center_col + half + 1);
+
+    window = struct('values', single(Dose(rows, cols)), 'x0', x0, 'y0', y0, ...
+                    'row0', rows(1) - 1, 'col0', cols(1) - 1, 'nx', nx, 'ny', ny);
+end
@@ -0,0 +1,158 @@
+function run_parameter_sweep(sweep, directory_films, datasets, main_nums, bgnd_file, bg_nums, precision, ...
+                             crop, pixsizeX, pixsizeY, T_calibration, temp_results_file)
+% Evaluate every combination of ROI size, ROI shape and background choice in one pass
+% Each film is loaded once and background-subtracted once per background choice; the
+% centroid is computed once per map, so each setting only adds its ROI statistics.
+% Writes sweep_results.txt (one row per film and setting) and images/sweep_comparison.png;
+% with a temp_results_file (GUI mode) every row is also appended there as it is computed
+
+roi_sizes = sweep.roi_sizes(:)';
+roi_shapes = cellstr(sweep.roi_shapes);
+bgnd_choices = cellstr(sweep.bgnd_choices);
+n_main = length(main_nums);
+n_bgnd = numel(bgnd_choices);
+
+% ROI settings in shape-major order
+n_roi = numel(roi_shapes) * numel(roi_sizes);
+[size_idx, shape_idx] = ind2sub([numel(roi_sizes), numel(roi_shapes)], 1:n_roi);
+
+printf("Parameter sweep: %d ROI setting(s) x %d background(s) on %d films\n", n_roi, n_bgnd, n_main);
+
+% Backgrounds are prepared once for the whole sweep
+backgrounds = cell(1, n_bgnd);
+for b = 1:n_bgnd
+    t0 = trace_span();
+    [~, ~, image_bgnd, ~, BGND_Type, ~] = ...
+        process_background(bgnd_choices{b}, bgnd_file, bg_nums, directory_films, datasets, precision);
+    trace_span('process_background', t0, 'compute');
+    backgrounds{b} = struct('image', image_bgnd, 'type', BGND_Type);
+endfor
+clear image_bgnd;
+
+% Results by film, background and ROI setting
+charges = zeros(1, n_main);
+dose_bg = zeros(n_main, n_roi);
+dose_bg_std = zeros(n_main, n_roi);
+dose = zeros(n_main, n_bgnd, n_roi);
+dose_std = zeros(n_main, n_bgnd, n_roi);
+dose_cd = zeros(n_main, n_bgnd, n_roi);
+dose_cd_std = zeros(n_main, n_bgnd, n_roi);
+centroids = zeros(n_main, n_bgnd, 4);
+film_names = cell(1, n_main);
+row = 0;
+
+printf("Processing main image set...\n");
+for i = 1:n_main
+    film_file = datasets(main_nums(i)).name;
+    film_names{i} = film_file(1:end-4);
+
+    t0 = trace_span();
+    [imageF, charge] = load_calibrated_film(directory_films, film_file, precision);
+    trace_span('load', t0, 'io');
+    charges(i) = charge;
+
+    for b = 1:n_bgnd
+        t0 = trace_span();
+        [Dose_Film, Dose_Film_nobgnd, ~, ~, ~, ~, ~, nx, ny, CD_scale] = ...
+            image_analysis_function(imageF, charge, backgrounds{b}.image, backgrounds{b}.type, ...
+                                    crop(1), crop(2), crop(3), crop(4), pixsizeX, pixsizeY);
+        trace_span('image_analysis', t0, 'compute');
+
+        x = ((0:nx-1) * pixsizeX) - (nx - 1) * pixsizeX / 2;
+        y = ((0:ny-1) * pixsizeY) - (ny - 1) * pixsizeY / 2;
+
+        t0 = trace_span();
+        profile = beam_profile(Dose_Film_nobgnd, x, y);
+        if b == 1
+            % The map with background is the same for every background choice
+            profile_bg = beam_profile(Dose_Film, x, y);
+            for r = 1:n_roi
+                [dose_bg(i, r), dose_bg_std(i, r)] = roi_dose_stats(Dose_Film, x, y, profile_bg.x0, profile_bg.y0, ...
+                                                                    roi_sizes(size_idx(r)), roi_shapes{shape_idx(r)}, pixsizeX, pixsizeY);
+            endfor
+        endif
+        centroids(i, b, :) = [profile.x0, profile.y0, profile.xstd, profile.ystd];
+
+        for r = 1:n_roi
+            [d, d_std] = roi_dose_stats(Dose_Film_nobgnd, x, y, profile.x0, profile.y0, ...
+                                        roi_sizes(size_idx(r)), roi_shapes{shape_idx(r)}, pixsizeX, pixsizeY);
+            % Dose in CD units scales the no-background dose, as in the main analysis
+            dose(i, b, r) = d;
+            dose_std(i, b, r) = d_std;
+            dose_cd(i, b, r) = d * CD_scale * T_calibration;
+            dose_cd_std(i, b, r) = d_std * abs(CD_scale * T_calibration);
+
+            if ~isempty(temp_results_file)
+                row = row + 1;
+                fid = fopen(temp_results_file, 'a');
+                fprintf(fid, '%d\t%s\t%.2f\t%.2f\t%.2f\t%.2f\t%.2f\t%.2f\t%.2f\t%.2f\t%.2f\n', ...
+                        row, sweep_label(film_names{i}, roi_shapes{shape_idx(r)}, roi_sizes(size_idx(r)), bgnd_choices{b}), ...
+                        charge, dose_bg(i, r), dose_bg_std(i, r), dose_cd(i, b, r), dose_cd_std(i, b, r), ...
+                        profile.x0, profile.y0, profile.xstd, profile.ystd);
+                fclose(fid);
+            endif
+        endfor
+        trace_span('sweep_statistics', t0, 'compute');
+    endfor
+    clear imageF Dose_Film Dose_Film_nobgnd;
+
+    printf("Processed main image %d of %d\n", i, n_main);
+endfor
+
+% Combined table
+fid = fopen('sweep_results.txt', 'w');
+fprintf(fid, 'Film\tCharge_nC\tBackground\tROI_shape\tROI_size_mm\tDose_with_BG_Gy\tDose_with_BG_std\tDose_Gy\tDose_std\tDose_CD\tDose_CD_std\tx0_mm\ty0_mm\txstd_mm\tystd_mm\n');
+for i = 1:n_main
+    for b = 1:n_bgnd
+        for r = 1:n_roi
+            fprintf(fid, '%s\t%.4f\t%s\t%s\t%g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\t%.6g\n', ...
+                    film_names{i}, charges(i), bgnd_choices{b}, roi_shapes{shape_idx(r)}, roi_sizes(size_idx(r)), ...
+                    dose_bg(i, r), dose_bg_std(i, r), dose(i, b, r), dose_std(i, b, r), ...
+                    dose_cd(i, b, r), dose_cd_std(i, b, r), centroids(i, b, 1), centroids(i, b, 2), ...
+                    centroids(i, b, 3), centroids(i, b, 4));
+        endfor
+    endfor
+endfor
+fclose(fid);
+printf("Sweep results saved to: sweep_results.txt\n");
+
+% Comparison plot: dose per film for every setting, and relative to the first setting
+t0 = trace_span();
+hfig = figure('visible', 'off', 'position', [20, 100, 1350, 800]);
+labels = {};
+reference = dose(:, 1, 1);
+for b = 1:n_bgnd
+    for r = 1:n_roi
+        subplot(2, 1, 1);
+        errorbar(1:n_main, dose(:, b, r), dose_std(:, b, r), '-o'); hold on;
+        subplot(2, 1, 2);
+        plot(1:n_main, 100 * (dose(:, b, r) - reference) ./ max(abs(reference), eps), '-o'); hold on;
+        labels{end+1} = sweep_label('', roi_shapes{shape_idx(r)}, roi_sizes(size_idx(r)), bgnd_choices{b});
+    endfor
+endfor
+subplot(2, 1, 1);
+title('ROI dose without background per setting');
+ylabel('Dose [Gy]');
+set(gca, 'xtick', 1:n_main, 'xticklabel', film_names);
+legend(labels, 'location', 'eastoutside', 'interpreter', 'none');
+subplot(2, 1, 2);
+title(['Difference to ', labels{1}], 'interpreter', 'none');
+ylabel('Difference [%]');
+set(gca, 'xtick', 1:n_main, 'xticklabel', film_names);
+legend(labels, 'location', 'eastoutside', 'interpreter', 'none');
+
+if ~exist("images", "dir"); mkdir("images"); endif
+print(hfig, '-dpng', '-r100', 'images/sweep_comparison.png');
+close(hfig);
+trace_span('sweep_plot', t0, 'io');
+printf("Sweep comparison plot saved to: images/sweep_comparison.png\n");
+
+end
+
+function label = sweep_label(film_name, roi_shape, roi_size, bgnd_choice)
+% Row label of one sweep setting, e.g. "C001 (circle 2 mm, edge)"
+label = sprintf('%s %g mm, %s', roi_shape, roi_size, bgnd_choice);
+if ~isempty(film_name)
+    label = sprintf('%s (%s)', film_name, label);
+endif
+end
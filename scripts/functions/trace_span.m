@@ -0,0 +1,35 @@
+function t0 = trace_span(name, t0, category)
+% Record a timed span in the trace file named by OCTAVE_TRACE_FILE (no-op if unset)
+% t0 = trace_span() opens a span, trace_span(name, t0, category) closes it
+
+    persistent trace_fid
+
+    if isempty(trace_fid)
+        trace_file = getenv('OCTAVE_TRACE_FILE');
+        if isempty(trace_file)
+            trace_fid = -1;
+        else
+            trace_fid = fopen(trace_file, 'a');
+        endif
+    endif
+
+    if trace_fid == -1
+        t0 = [];
+        return;
+    endif
+
+    now_us = time() * 1e6;
+    if nargin == 0
+        t0 = now_us;
+        return;
+    endif
+    if nargin < 3
+        category = 'octave';
+    endif
+
+    fprintf(trace_fid, '{"name":"%s","cat":"%s","ph":"X","ts":%.0f,"dur":%.0f,"pid":%d,"tid":1}\n', ...
+        name, category, t0, now_us - t0, getpid());
+    % Unbuffered: a run stopped with Pause is killed, and forked parcellfun workers
+    % would write out a copy of the parent's unflushed events
+    fflush(trace_fid);
+end
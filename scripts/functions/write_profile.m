@@ -0,0 +1,15 @@
+function write_profile(profile_file)
+% Stop the profiler and write profile('info') as JSON to profile_file
+% Called through onCleanup when OCTAVE_PROFILE_FILE is set, so the profile of a run that
+% fails is written as well. The GUI turns it into the flat and hierarchical tables
+% (octave_profile.py).
+
+    profile off;
+    fid = fopen(profile_file, 'w');
+    if fid == -1
+        warning('Could not write the profile to %s', profile_file);
+        return;
+    endif
+    fputs(fid, jsonencode(profile('info')));
+    fclose(fid);
+end
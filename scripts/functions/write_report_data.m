@@ -0,0 +1,42 @@
+function write_report_data(film_names, Dose_CD_all, Dose_with_BGND_Gy_all, Dose_Gy_all, ...
+                           Dose_ROI_mask_all, Dose_ROI_mask_std_all, ...
+                           x0_all, y0_all, xstd_all, ystd_all, ...
+                           Dose_CD_std_all, Dose_with_BGND_Gy_std_all, Dose_Gy_std_all, ...
+                           chargeAll, roi_shape, roi_size, bgnd_choice, bgnd_file, ...
+                           roi_image_path, selected_masks, include_calib_plot, film_notes)
+% Save the inputs of generate_analysis_report as JSON for the GUI report renderer
+
+    outfile = "analysis_report_data.json";
+
+    report.film_names = film_names;
+    report.Dose_CD_all = Dose_CD_all;
+    report.Dose_CD_std_all = Dose_CD_std_all;
+    report.Dose_with_BGND_Gy_all = Dose_with_BGND_Gy_all;
+    report.Dose_with_BGND_Gy_std_all = Dose_with_BGND_Gy_std_all;
+    report.Dose_Gy_all = Dose_Gy_all;
+    report.Dose_Gy_std_all = Dose_Gy_std_all;
+    report.Dose_ROI_mask_all = Dose_ROI_mask_all;
+    report.Dose_ROI_mask_std_all = Dose_ROI_mask_std_all;
+    report.x0_all = x0_all;
+    report.y0_all = y0_all;
+    report.xstd_all = xstd_all;
+    report.ystd_all = ystd_all;
+    report.chargeAll = chargeAll;
+    report.roi_shape = roi_shape;
+    report.roi_size = roi_size;
+    report.bgnd_choice = bgnd_choice;
+    report.bgnd_file = bgnd_file;
+    report.roi_image_path = roi_image_path;
+    report.selected_masks = selected_masks;
+    report.include_calib_plot = include_calib_plot;
+    report.film_notes = film_notes;
+
+    fid = fopen(outfile, 'w');
+    if fid == -1
+        error('Could not write report data file: %s', outfile);
+    endif
+    fputs(fid, jsonencode(report));
+    fclose(fid);
+
+    printf("Report data saved to %s\n", outfile);
+end
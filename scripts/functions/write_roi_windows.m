@@ -0,0 +1,37 @@
+function write_roi_windows(film_names, windows, cd_factors, roi_size, roi_shape, max_roi_mm, pixsizeX, pixsizeY)
+% Save the ROI windows of every film (with and without background) for the GUI ROI evaluator
+% roi_windows.f32 holds the float32 windows one after the other (column-major),
+% roi_windows.json their positions, centroids and the CD factor of each film
+
+    data_file = "roi_windows.f32";
+    index_file = "roi_windows.json";
+
+    fid = fopen(data_file, 'w', 'ieee-le');
+    if fid == -1
+        error('Could not write ROI windows file: %s', data_file);
+    endif
+
+    n_films = numel(film_names);
+    films = cell(1, n_films);
+    for i = 1:n_films
+        maps = cell(1, 2);
+        for m = 1:2
+            w = windows{i, m};
+            fwrite(fid, w.values, 'float32');
+            maps{m} = struct('x0', w.x0, 'y0', w.y0, 'row0', w.row0, 'col0', w.col0, ...
+                             'rows', rows(w.values), 'cols', columns(w.values));
+        endfor
+        films{i} = struct('name', film_names{i}, 'cd_factor', cd_factors(i), ...
+                          'nx', windows{i, 1}.nx, 'ny', windows{i, 1}.ny, 'maps', {maps});
+    endfor
+    fclose(fid);
+
+    index = struct('pixel_size_mm', [pixsizeX, pixsizeY], 'max_roi_mm', max_roi_mm, ...
+                   'roi_size', roi_size, 'roi_shape', roi_shape, 'films', {films});
+    fid = fopen(index_file, 'w');
+    fputs(fid, jsonencode(index));
+    fclose(fid);
+
+    data_info = dir(data_file);
+    printf("ROI windows saved to %s (%.1f MB)\n", data_file, data_info(1).bytes / 2^20);
+end
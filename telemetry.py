@@ -0,0 +1,232 @@
+import time
+import psutil
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import Qt, QObject, QTimer, QPointF, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+
+SAMPLE_INTERVAL_MS = 1000
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+class ProcessTreeSampler(QObject):
+    """Samples CPU, memory, I/O and open files of the Octave process and its workers.
+
+    Each sample sums the process tree (the Octave process and every child, e.g. the
+    parcellfun workers). The I/O counters of workers that have exited stay in the totals,
+    so the cumulative read, write and I/O wait only ever grow. Samples are also recorded as counter events in the stage's
+    trace, so they are saved with the run and plotted alongside its spans.
+    """
+
+    sampled = pyqtSignal(dict)
+
+    def __init__(self, tracer, parent=None):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.root = None
+        self.processes = {}
+        self.io_last = {}
+        self.io_exited = (0, 0, 0.0)
+        self.samples = []
+        self.peak_rss = 0
+        self.swap_start = None
+        self.iowait_start = None
+
+    def start(self, pid):
+        try:
+            self.root = psutil.Process(pid)
+        except psutil.Error:
+            return
+        self.processes = {}
+        self.io_last = {}
+        self.io_exited = (0, 0, 0.0)
+        self.samples = []
+        self.peak_rss = 0
+        self.swap_start = self._swap_in()
+        self.iowait_start = self._system_iowait()
+        self.sample()
+        self.timer.start(SAMPLE_INTERVAL_MS)
+
+    def stop(self):
+        self.timer.stop()
+        self.root = None
+
+    @staticmethod
+    def _swap_in():
+        """Bytes swapped in since boot (0 where the OS does not report it)"""
+        try:
+            return psutil.swap_memory().sin
+        except (psutil.Error, RuntimeError):
+            return 0
+
+    @staticmethod
+    def _system_iowait():
+        """Seconds all CPUs have waited on I/O since boot (0 where the OS does not report it)"""
+        return getattr(psutil.cpu_times(), 'iowait', 0.0)
+
+    def _tree(self):
+        """Current processes of the tree, reusing Process objects so cpu_percent has a baseline"""
+        try:
+            members = [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return []
+        tree = {p.pid: self.processes.get(p.pid, p) for p in members}
+        self.processes = tree
+        return list(tree.values())
+
+    def sample(self):
+        """Take one sample of the process tree"""
+        if self.root is None:
+            return
+        cpu = rss = open_files = 0
+        tree = self._tree()
+        if not tree:
+            self.stop()
+            return
+
+        io_current = {}
+        for p in tree:
+            try:
+                with p.oneshot():
+                    cpu += p.cpu_percent()
+                    rss += p.memory_info().rss
+                    read = written = 0
+                    if hasattr(p, 'io_counters'):  # Not available on macOS
+                        io = p.io_counters()
+                        read, written = io.read_bytes, io.write_bytes
+                    open_files += len(p.open_files())
+                    # Block I/O delay of the process (Linux, with task delay accounting)
+                    io_current[p.pid] = (read, written, getattr(p.cpu_times(), 'iowait', 0.0))
+            except psutil.Error:
+                # Worker exited between listing and sampling; it keeps its last counters
+                if p.pid in self.io_last:
+                    io_current[p.pid] = self.io_last[p.pid]
+        read_bytes, write_bytes, io_wait = self._io_totals(io_current)
+
+        self.peak_rss = max(self.peak_rss, rss)
+        sample = {
+            "time": time.time(), "processes": len(tree), "cpu_percent": cpu,
+            "rss": rss, "peak_rss": self.peak_rss,
+            "read_bytes": read_bytes, "write_bytes": write_bytes, "open_files": open_files,
+            "swap_in": self._swap_in() - self.swap_start,
+            "io_wait": io_wait, "system_io_wait": self._system_iowait() - self.iowait_start
+        }
+        self.samples.append(sample)
+
+        pid = self.root.pid
+        self.tracer.add_counter("cpu_percent", sample["time"], {"cpu": cpu}, pid)
+        self.tracer.add_counter("memory_MB", sample["time"],
+                                {"rss": rss / 2**20, "swap_in": sample["swap_in"] / 2**20}, pid)
+        self.tracer.add_counter("io_MB", sample["time"],
+                                {"read": read_bytes / 2**20, "written": write_bytes / 2**20}, pid)
+        self.tracer.add_counter("open_files", sample["time"], {"files": open_files}, pid)
+        self.tracer.add_counter("io_wait_s", sample["time"],
+                                {"process": io_wait, "system": sample["system_io_wait"]}, pid)
+        self.sampled.emit(sample)
+
+    def _io_totals(self, io_current):
+        """Read bytes, written bytes and I/O wait of the tree, including exited processes.
+
+        io_current holds the counters per pid of this sample; a process that is gone (or
+        whose counters went back, its pid reused) contributes its last counters.
+        """
+        exited = list(self.io_exited)
+        for pid, last in self.io_last.items():
+            current = io_current.get(pid)
+            if current is None or current[0] < last[0] or current[1] < last[1]:
+                exited = [total + value for total, value in zip(exited, last)]
+        self.io_exited = tuple(exited)
+        self.io_last = io_current
+        return tuple(total + sum(counters[k] for counters in io_current.values())
+                     for k, total in enumerate(self.io_exited))
+
+    def summary(self):
+        """One-line summary of the run, or None if nothing was sampled"""
+        if not self.samples:
+            return None
+        last = self.samples[-1]
+        mean_cpu = sum(s["cpu_percent"] for s in self.samples) / len(self.samples)
+        text = (f"[Telemetry] CPU mean {mean_cpu:.0f}%, peak RSS {_format_bytes(self.peak_rss)}, "
+                f"read {_format_bytes(last['read_bytes'])}, written {_format_bytes(last['write_bytes'])}, "
+                f"max open files {max(s['open_files'] for s in self.samples)}")
+        if last["io_wait"] > 0:
+            text += f", I/O wait {last['io_wait']:.1f} s"
+        elif last["system_io_wait"] > 0:
+            text += f", I/O wait {last['system_io_wait']:.1f} s (system)"
+        if last["swap_in"] > 0:
+            text += f", swapped in {_format_bytes(last['swap_in'])} (system)"
+        return text
+
+
+class TelemetryStrip(QWidget):
+    """Compact strip chart of the sampler's CPU (blue) and RSS (orange) over the run"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.samples = []
+        self.setFixedSize(220, 34)
+        self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.setToolTip("Octave CPU and memory will be shown while processing")
+
+    def add_sample(self, sample):
+        self.samples.append(sample)
+        previous = self.samples[-2] if len(self.samples) > 1 else None
+        if previous:
+            seconds = max(sample["time"] - previous["time"], 1e-3)
+            read_rate = (sample["read_bytes"] - previous["read_bytes"]) / seconds
+            write_rate = (sample["write_bytes"] - previous["write_bytes"]) / seconds
+        else:
+            read_rate = write_rate = 0
+        self.setToolTip(
+            f"CPU {sample['cpu_percent']:.0f}% ({sample['processes']} processes)\n"
+            f"RSS {_format_bytes(sample['rss'])} (peak {_format_bytes(sample['peak_rss'])})\n"
+            f"Read {_format_bytes(read_rate)}/s, write {_format_bytes(write_rate)}/s\n"
+            f"Open files {sample['open_files']}, swapped in {_format_bytes(sample['swap_in'])}")
+        self.update()
+
+    def clear(self):
+        self.samples = []
+        self.setToolTip("Octave CPU and memory will be shown while processing")
+        self.update()
+
+    def _polyline(self, values, top, height, scale):
+        step = self.width() / max(1, len(values) - 1)
+        return QPolygonF([QPointF(i * step, top + height - min(v / scale, 1.0) * height)
+                          for i, v in enumerate(values)])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor(128, 128, 128, 100)))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        if len(self.samples) < 2:
+            return
+
+        # Newest samples at the right, one pixel per sample at most
+        samples = self.samples[-self.width():]
+        height = self.height() - 10
+        cpu = [s["cpu_percent"] for s in samples]
+        rss = [s["rss"] for s in samples]
+        cpu_scale = max(100.0, max(cpu))
+        rss_scale = max(1.0, max(rss))
+
+        painter.setPen(QPen(QColor(31, 119, 180), 1.2))
+        painter.drawPolyline(self._polyline(cpu, 2, height, cpu_scale))
+        painter.setPen(QPen(QColor(255, 127, 14), 1.2))
+        painter.drawPolyline(self._polyline(rss, 2, height, rss_scale))
+
+        font = painter.font()
+        font.setPixelSize(9)
+        painter.setFont(font)
+        painter.setPen(self.palette().text().color())
+        last = samples[-1]
+        painter.drawText(self.rect().adjusted(3, 0, -3, 0),
+                         Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft,
+                         f"CPU {last['cpu_percent']:.0f}%  RSS {_format_bytes(last['rss'])}")
@@ -0,0 +1,75 @@
+import pytest
+
+from octave_profile import parse_profile
+
+
+def _by_function(rows):
+    return {row["function"]: row for row in rows}
+
+
+def test_one_element_tables_are_objects():
+    # jsonencode writes a one-element struct array as an object
+    info = {
+        "FunctionTable": {"FunctionName": "main", "TotalTime": 2.0, "NumCalls": 1},
+        "Hierarchical": {"Index": 1, "SelfTime": 2.0, "TotalTime": 2.0, "NumCalls": 1, "Children": []},
+    }
+    rows, tree = parse_profile(info)
+    assert rows == [{"function": "main", "self_s": 2.0, "total_s": 2.0, "calls": 1}]
+    assert len(tree) == 1 and tree[0]["children"] == []
+
+
+@pytest.mark.parametrize("info", [{}, {"FunctionTable": [], "Hierarchical": []}])
+def test_empty_profile(info):
+    assert parse_profile(info) == ([], [])
+
+
+def test_flat_rows_without_call_tree():
+    info = {"FunctionTable": [{"FunctionName": "a", "TotalTime": 1.0, "NumCalls": 3},
+                              {"FunctionName": "b", "TotalTime": 4.0, "NumCalls": 1}]}
+    rows, tree = parse_profile(info)
+    assert tree == []
+    assert [(row["function"], row["self_s"], row["total_s"]) for row in rows] == [("b", 4.0, 4.0),
+                                                                                  ("a", 1.0, 1.0)]
+
+
+def test_recursive_calls_count_inclusive_time_once():
+    # main -> fib -> fib -> leaf, and main -> leaf
+    info = {
+        "FunctionTable": [{"FunctionName": "main", "NumCalls": 1},
+                          {"FunctionName": "fib", "NumCalls": 2},
+                          {"FunctionName": "leaf", "NumCalls": 2}],
+        "Hierarchical": {
+            "Index": 1, "SelfTime": 0.5, "TotalTime": 6.5, "NumCalls": 1,
+            "Children": [
+                {"Index": 2, "SelfTime": 1.0, "TotalTime": 5.0, "NumCalls": 1,
+                 "Children": {"Index": 2, "SelfTime": 3.0, "TotalTime": 4.0, "NumCalls": 1,
+                              "Children": {"Index": 3, "SelfTime": 1.0, "TotalTime": 1.0, "NumCalls": 1}}},
+                {"Index": 3, "SelfTime": 1.0, "TotalTime": 1.0, "NumCalls": 1, "Children": []},
+            ],
+        },
+    }
+    rows, tree = parse_profile(info)
+    flat = _by_function(rows)
+    assert flat["fib"]["self_s"] == 4.0
+    assert flat["fib"]["total_s"] == 5.0
+    assert flat["leaf"]["self_s"] == flat["leaf"]["total_s"] == 2.0
+    assert flat["main"]["total_s"] == 6.5
+    assert [row["function"] for row in rows] == ["fib", "leaf", "main"]
+    assert tree[0]["children"][0]["children"][0]["function"] == "fib"
+
+
+def test_older_format_derives_inclusive_time():
+    # Older Octave releases record only the time spent in the node itself, as TotalTime
+    info = {
+        "FunctionTable": [{"FunctionName": "main", "NumCalls": 1},
+                          {"FunctionName": "fib", "NumCalls": 2}],
+        "Hierarchical": [{"Index": 1, "TotalTime": 0.5, "NumCalls": 1,
+                          "Children": {"Index": 2, "TotalTime": 1.0, "NumCalls": 1,
+                                       "Children": {"Index": 2, "TotalTime": 3.0, "NumCalls": 1}}}],
+    }
+    rows, tree = parse_profile(info)
+    flat = _by_function(rows)
+    assert tree[0]["total_s"] == 4.5
+    assert flat["fib"]["self_s"] == 4.0
+    assert flat["fib"]["total_s"] == 4.0
+    assert flat["main"]["self_s"] == 0.5
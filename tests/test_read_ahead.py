@@ -0,0 +1,68 @@
+import threading
+import time
+
+import read_ahead
+from read_ahead import FilmReadAhead
+
+
+class _Tracer:
+    def __init__(self):
+        self.spans = []
+
+    def add_span(self, name, start, duration, category='gui'):
+        self.spans.append(name)
+
+
+def _films(tmp_path, prefix, sizes):
+    extents = []
+    for k, size in enumerate(sizes):
+        path = tmp_path / f"{prefix}_{k}.dat"
+        path.write_bytes(b"\0" * size)
+        extents.append((str(path), 0, size))
+    return extents
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_worker_of_a_stopped_run_does_not_touch_the_next_run(tmp_path, monkeypatch):
+    first_run = _films(tmp_path, "first", [1000, 1000])
+    second_run = _films(tmp_path, "second", [300, 500])
+
+    # The first run's worker is stuck in a slow read until released
+    release = threading.Event()
+    real_open = open
+
+    def slow_open(path, *args, **kwargs):
+        if "first_" in str(path):
+            release.wait(10)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(read_ahead, 'open', slow_open, raising=False)
+
+    prefetcher = FilmReadAhead(_Tracer())
+    prefetcher.start(first_run)
+    old_thread = prefetcher.thread
+    old_run = prefetcher.run
+    prefetcher.stop()
+    assert old_thread.is_alive()
+
+    prefetcher.start(second_run)
+    new_run = prefetcher.run
+    release.set()
+    old_thread.join(5)
+    assert not old_thread.is_alive()
+
+    assert _wait_for(lambda: new_run.ready == {0, 1})
+    prefetcher.reached(0)
+    prefetcher.reached(1)
+    prefetcher.stop()
+
+    assert new_run.prefetched_bytes == 800
+    assert new_run.hits == 2 and new_run.reached_count == 2
+    assert old_run.prefetched_bytes <= 1000 and not old_run.reached_count
+    assert "2/2 films" in prefetcher.summary()
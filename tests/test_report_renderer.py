@@ -0,0 +1,49 @@
+import os
+import json
+import math
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+import report_renderer
+
+
+def _one_film_report(tmp_path, **overrides):
+    """Report data of a one-film run as jsonencode writes it: every series a scalar"""
+    data = {field: 1.5 for field in report_renderer.SERIES_FIELDS}
+    data.update(film_names="EB_001.dat", roi_shape="circle", roi_size=2, bgnd_choice="edge", bgnd_file="",
+                roi_image_path="", selected_masks=1, include_calib_plot=False, film_notes="")
+    data.update(overrides)
+    path = tmp_path / "analysis_report_data.json"
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def test_one_film_nan_series_is_one_nan(tmp_path):
+    path = _one_film_report(tmp_path, Dose_ROI_mask_all=None, Dose_ROI_mask_std_all=None)
+    data = report_renderer.load_report_data(path)
+
+    assert data["film_names"] == ["EB_001.dat"]
+    assert len(data["Dose_ROI_mask_all"]) == 1 and math.isnan(data["Dose_ROI_mask_all"][0])
+    assert data["Dose_Gy_all"] == [1.5]
+    assert len(report_renderer._table_rows(data)) == 1
+
+
+def test_missing_series_is_empty(tmp_path):
+    path = _one_film_report(tmp_path)
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    del raw["x0_all"]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(raw, f)
+
+    assert report_renderer.load_report_data(path)["x0_all"] == []
+
+
+def test_one_film_nan_report_renders(tmp_path):
+    app = QApplication.instance() or QApplication([])
+    data = report_renderer.load_report_data(_one_film_report(tmp_path, Dose_Gy_all=None, Dose_ROI_mask_all=None))
+    pdf_path = str(tmp_path / "analysis_report.pdf")
+    report_renderer.render_report(data, pdf_path)
+    assert app is not None and os.path.getsize(pdf_path) > 0
@@ -0,0 +1,80 @@
+import pytest
+
+import results_store
+from results_store import ResultsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def set_stamps(monkeypatch):
+    """Make results_store._timestamp return the given timestamps, one per call"""
+    def set_stamps(*stamps):
+        monkeypatch.setattr(results_store, '_timestamp', iter(stamps).__next__)
+    return set_stamps
+
+
+def _calibration_rows(*films):
+    return [{"film": film, "dose": 2.0 + k, "dose_std": 0.1, "charge": 1.0} for k, film in enumerate(films)]
+
+
+def test_prefix_filters(store, set_stamps):
+    set_stamps(*(f"2026-01-05 10:00:0{k}" for k in range(6)))
+    first = store.begin_run('calibration', 'Exp_A1', 'Lot1', {})
+    store.add_calibration_films(first, _calibration_rows('EB_001', 'EB_002', 'EC_001'))
+    second = store.begin_run('calibration', 'Exp_B', 'Lot2', {})
+    store.add_calibration_films(second, _calibration_rows('EB_001'))
+    third = store.begin_run('calibration', 'Exp_A2', 'Lot10', {})
+    store.add_calibration_films(third, _calibration_rows('EB_010'))
+
+    names, rows = store.query('calibration', experiment='Exp_A')
+    assert names[:4] == ["recorded_at", "run_id", "experiment", "calibration"]
+    assert sorted(row[2] for row in rows) == ['Exp_A1', 'Exp_A1', 'Exp_A1', 'Exp_A2']
+
+    _, rows = store.query('calibration', film='EB_00')
+    assert sorted((row[2], row[4]) for row in rows) == [('Exp_A1', 'EB_001'), ('Exp_A1', 'EB_002'),
+                                                        ('Exp_B', 'EB_001')]
+
+    _, rows = store.query('calibration', calibration='Lot1', film='EB_01')
+    assert [(row[3], row[4]) for row in rows] == [('Lot10', 'EB_010')]
+
+    # Newest first
+    _, rows = store.query('calibration')
+    assert [row[1] for row in rows] == [third, second, first, first, first]
+
+
+def test_date_filters(store, set_stamps):
+    set_stamps("2026-03-01 09:00:00", "2026-03-01 09:00:00", "2026-03-02 23:59:59",
+               "2026-03-02 23:59:59", "2026-03-03 00:00:00", "2026-03-03 00:00:00")
+    for film in ('EB_001', 'EB_002', 'EB_003'):
+        run_id = store.begin_run('calibration', 'Exp', 'Lot', {})
+        store.add_calibration_films(run_id, _calibration_rows(film))
+
+    def films(**filters):
+        return sorted(row[4] for row in store.query('calibration', **filters)[1])
+
+    assert films(date_from='2026-03-02') == ['EB_002', 'EB_003']
+    assert films(date_to='2026-03-02') == ['EB_001', 'EB_002']
+    assert films(date_from='2026-03-02', date_to='2026-03-02') == ['EB_002']
+    assert films(date_from='2026-03-04') == []
+
+
+def test_comparison_curve_rows_keep_their_calibration(store, set_stamps):
+    set_stamps(*(["2026-04-01 12:00:00"] * 3))
+    run_id = store.begin_run('calibration', 'Exp', 'Lot1', {})
+    store.add_calibration_films(run_id, _calibration_rows('EB_001', 'EB_002'))
+    store.add_calibration_films(run_id, _calibration_rows('EB_001', 'EB_002'), calibration='polynomial_calibration_Lot2')
+    store.add_calibration_films(run_id, [])
+
+    _, rows = store.query('calibration', film='EB_001')
+    assert sorted(row[3] for row in rows) == ['Lot1', 'polynomial_calibration_Lot2']
+    assert {row[1] for row in rows} == {run_id}
+
+    _, rows = store.query('calibration', calibration='polynomial')
+    assert sorted(row[4] for row in rows) == ['EB_001', 'EB_002']
+    assert store.latest_calibration('Exp') == 'Lot1'
@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pytest
+
+from roi_evaluator import RoiEvaluator
+
+PIXEL_SIZE = 25.4 / 300
+MAX_ROI_MM = 3.0
+
+
+def _octave_round(value):
+    return np.floor(value + 0.5)
+
+
+def _dose_map(ny, nx, seed):
+    """Float32 Gaussian spot with noise, as the windows store it"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:ny, 0:nx]
+    dose = 5 * np.exp(-((x - nx * 0.55) ** 2 + (y - ny * 0.45) ** 2) / (2 * 25.0 ** 2))
+    return (dose + rng.normal(0, 0.05, dose.shape)).astype(np.float32)
+
+
+def _window(dose, x0, y0):
+    """roi_window.m: window around the centroid, 0-based row0/col0"""
+    ny, nx = dose.shape
+    center_col = int(_octave_round((x0 + (nx - 1) * PIXEL_SIZE / 2) / PIXEL_SIZE))
+    center_row = int(_octave_round((y0 + (ny - 1) * PIXEL_SIZE / 2) / PIXEL_SIZE))
+    half = int(np.ceil(MAX_ROI_MM / PIXEL_SIZE)) + 2
+    rows = np.arange(max(1, center_row - half), min(ny, center_row + half + 1) + 1)
+    cols = np.arange(max(1, center_col - half), min(nx, center_col + half + 1) + 1)
+    values = dose[rows[0] - 1:rows[-1], cols[0] - 1:cols[-1]]
+    return values, {"x0": x0, "y0": y0, "row0": int(rows[0] - 1), "col0": int(cols[0] - 1),
+                    "rows": values.shape[0], "cols": values.shape[1]}
+
+
+def _reference(dose, x0, y0, roi_size, roi_shape):
+    """roi_dose_stats.m over the whole map, on plot_dose_function's centered axes"""
+    ny, nx = dose.shape
+    center_x = (nx - 1) * PIXEL_SIZE / 2
+    center_y = (ny - 1) * PIXEL_SIZE / 2
+    x = np.arange(nx) * PIXEL_SIZE - center_x
+    y = np.arange(ny) * PIXEL_SIZE - center_y
+    values = dose.astype(np.float64)
+    if roi_shape == 'circle':
+        xx, yy = np.meshgrid(x, y)
+        vals = values[(yy - y0) ** 2 + (xx - x0) ** 2 <= roi_size ** 2]
+    else:
+        pix_x0 = int(_octave_round((x0 + center_x) / PIXEL_SIZE))
+        pix_y0 = int(_octave_round((y0 + center_y) / PIXEL_SIZE))
+        dpix = int(_octave_round(roi_size / PIXEL_SIZE))
+        vals = values[pix_y0 - dpix - 1:pix_y0 + dpix, pix_x0 - dpix - 1:pix_x0 + dpix]
+    return vals.mean(), vals.std(ddof=1)
+
+
+@pytest.fixture
+def stored_windows(tmp_path):
+    """Two films written as write_roi_windows.m writes them"""
+    films, data, maps = [], [], {}
+    for k, (x0, y0) in enumerate([(0.42, -0.37), (-0.13, 0.21)]):
+        with_bgnd = _dose_map(120, 140, seed=2 * k) + 0.3
+        without_bgnd = _dose_map(120, 140, seed=2 * k + 1)
+        entries = []
+        for dose in (with_bgnd, without_bgnd):
+            values, entry = _window(dose, x0, y0)
+            data.append(values.T.ravel())  # Column-major
+            entries.append(entry)
+        films.append({"name": f"EB_{k + 1:03d}.dat", "cd_factor": 1.5 + k, "nx": 140, "ny": 120, "maps": entries})
+        maps[k] = (with_bgnd, without_bgnd, x0, y0)
+
+    data_path = tmp_path / "roi_windows.f32"
+    index_path = tmp_path / "roi_windows.json"
+    np.concatenate(data).astype('<f4').tofile(data_path)
+    index_path.write_text(json.dumps({"pixel_size_mm": [PIXEL_SIZE, PIXEL_SIZE], "max_roi_mm": MAX_ROI_MM,
+                                      "roi_size": 2, "roi_shape": "circle", "films": films}))
+    return RoiEvaluator(str(data_path), str(index_path)), maps, films
+
+
+@pytest.mark.parametrize("roi_shape", ["circle", "square"])
+@pytest.mark.parametrize("roi_size", [0.5, 1.0, 2.0, 3.0])
+def test_statistics_match_roi_dose_stats(stored_windows, roi_shape, roi_size):
+    evaluator, maps, films = stored_windows
+    results = evaluator.evaluate(roi_size, roi_shape)
+    assert len(results) == len(films)
+
+    for k, (dose_bg, dose_bg_std, dose_cd, dose_cd_std) in enumerate(results):
+        with_bgnd, without_bgnd, x0, y0 = maps[k]
+        cd_factor = films[k]["cd_factor"]
+        mean, std = _reference(with_bgnd, x0, y0, roi_size, roi_shape)
+        assert dose_bg == pytest.approx(mean, rel=1e-9, abs=1e-9)
+        assert dose_bg_std == pytest.approx(std, rel=1e-6)
+        mean, std = _reference(without_bgnd, x0, y0, roi_size, roi_shape)
+        assert dose_cd == pytest.approx(mean * cd_factor, rel=1e-9, abs=1e-9)
+        assert dose_cd_std == pytest.approx(std * cd_factor, rel=1e-6)
+
+
+def test_window_size_mismatch_is_rejected(stored_windows, tmp_path):
+    data_path = tmp_path / "roi_windows.f32"
+    data_path.write_bytes(data_path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        RoiEvaluator(str(data_path), str(tmp_path / "roi_windows.json"))
@@ -0,0 +1,13 @@
+from telemetry import ProcessTreeSampler
+from tracing import get_tracer
+
+
+def test_io_of_exited_workers_stays_in_the_totals():
+    sampler = ProcessTreeSampler(get_tracer('analysis'))
+    assert sampler._io_totals({1: (100, 10, 0.5)}) == (100, 10, 0.5)
+    # A parcellfun worker appears, then exits
+    assert sampler._io_totals({1: (150, 10, 0.5), 2: (40, 4, 0.25)}) == (190, 14, 0.75)
+    assert sampler._io_totals({1: (160, 10, 0.5)}) == (200, 14, 0.75)
+    # Its pid is reused by a new worker with fresh counters
+    assert sampler._io_totals({1: (160, 10, 0.5), 2: (40, 4, 0.25)}) == (240, 18, 1.0)
+    assert sampler._io_totals({1: (160, 10, 0.5), 2: (5, 0, 0.0)}) == (205 + 40, 18, 1.0)
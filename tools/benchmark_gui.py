@@ -0,0 +1,318 @@
+"""Offscreen micro-benchmarks of the GUI hot paths.
+
+The screens are built under QT_QPA_PLATFORM=offscreen in a temporary workspace with
+synthetic inputs, and every operation is timed call by call:
+  results_table_poll   AnalysisProgressScreen.update_results_table, one poll of new rows
+                       at a time up to --rows rows
+  add_film_data        ProcessingScreen._add_film_data, --rows films
+  stdout_analysis      AnalysisProgressScreen.handle_stdout, --stdout-mb of console output
+  stdout_processing    ProcessingScreen._handle_stdout, the same with '\\r' progress lines
+  scale_calibration    ProcessingScreen._scale_image_to_panel_height of a --dpi page (A4)
+  scale_lead_image     AnalysisScreen.scale_image_to_panel_height of the same page
+  resize_columns       AnalysisProgressScreen.resize_table_columns with --rows rows
+  show_calibration     CalibrationScreen.showEvent refresh (directory cache cleared)
+  show_analysis        AnalysisScreen.showEvent refresh
+  show_results         ResultsScreen.showEvent query over --rows stored films
+
+Latency percentiles (p50, p90, p99, max) are printed per operation. The run fails
+(exit code 1) when an operation's p90 exceeds its budget in BUDGETS_MS, or, with
+--baseline, exceeds the baseline p90 by more than --tolerance.
+
+Usage:
+    python tools/benchmark_gui.py --rows 10000 --stdout-mb 4 --save-baseline gui_baseline.json
+    python tools/benchmark_gui.py --baseline gui_baseline.json --tolerance 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QT_VERSION_STR
+from PyQt6.QtGui import QImage, QPixmap, QColor, QShowEvent
+
+# p90 budgets per call at the default sizes: two to three times the p90 measured on a
+# desktop machine when the suite was added, so they catch an operation that turns from
+# incremental into quadratic; --baseline compares against a recorded run more tightly
+BUDGETS_MS = {
+    'results_table_poll': 10.0,
+    'add_film_data': 25.0,
+    'stdout_analysis': 1000.0,
+    'stdout_processing': 10.0,
+    'scale_calibration': 50.0,
+    'scale_lead_image': 50.0,
+    'resize_columns': 4000.0,
+    'show_calibration': 60.0,
+    'show_analysis': 60.0,
+    'show_results': 1000.0,
+}
+# Baseline comparisons ignore differences below this (timer and scheduler noise)
+NOISE_FLOOR_MS = 0.2
+
+
+class ChunkedOutput:
+    """Console output source for the stdout handlers: hands out one chunk per read"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    def readAllStandardOutput(self):
+        return next(self.chunks, b'')
+
+
+def percentiles(samples):
+    """p50, p90, p99 and max of a list of milliseconds"""
+    ordered = sorted(samples)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {'calls': len(ordered), 'p50': at(0.50), 'p90': at(0.90), 'p99': at(0.99), 'max': ordered[-1]}
+
+
+def timed_calls(app, operation, arguments):
+    """Call operation(argument) for every argument; per-call milliseconds.
+
+    Pending events (deferred layouts and repaints) are processed after every call, so
+    work the call queues is not billed to the next one.
+    """
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        operation(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+        app.processEvents()
+    return samples
+
+
+def result_lines(n_rows):
+    """Rows of temp_analysis_results.txt as the analysis writes them"""
+    return [f"{i + 1}\tEB_{i + 1:05d}.dat\t{1 + i % 7:.2f}\t{2.5 + i % 11 * 0.1:.2f}\t0.05\t"
+            f"{2.7 + i % 13 * 0.1:.2f}\t0.06\t3.10\t3.20\t{0.01 * (i % 50):.2f}\t{-0.01 * (i % 40):.2f}"
+            for i in range(n_rows)]
+
+
+def console_chunks(megabytes, progress_lines, chunk_bytes=64 * 1024):
+    """Octave-like console output in pipe-sized chunks"""
+    lines = []
+    size = i = 0
+    while size < megabytes * 2**20:
+        i += 1
+        if progress_lines:
+            line = f"\rProcessing experimental film {i} of 100000"
+        else:
+            line = (f"Processed main image {i} of 100000\n"
+                    f"CD consistency check passed for EB_{i:05d}\n"
+                    f"Using cached intermediates for EB_{i:05d}\n")
+        lines.append(line)
+        size += len(line)
+    text = ''.join(lines).encode('utf-8')
+    return [text[k:k + chunk_bytes] for k in range(0, len(text), chunk_bytes)]
+
+
+def page_image(path, dpi):
+    """An A4 page at `dpi` with some structure, saved as PNG"""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor('white'))
+    for y in range(0, height, max(1, height // 64)):
+        for x in range(width):
+            image.setPixelColor(x, y, QColor(30, 80, 160))
+    image.save(path)
+    return path
+
+
+def build_workspace(root, args):
+    """Directory tree the screens scan in showEvent"""
+    for d in range(args.dirs):
+        exp_dir = os.path.join(root, f'Experiment_{d:03d}')
+        os.makedirs(exp_dir)
+        os.makedirs(exp_dir + '_CALIBRATED')
+        for f in range(20):
+            open(os.path.join(exp_dir, f'EB_{f:03d}.tif'), 'wb').close()
+
+    small_png = os.path.join(root, 'small.png')
+    image = QImage(64, 48, QImage.Format.Format_RGB32)
+    image.fill(QColor('gray'))
+    image.save(small_png)
+    for folder, prefix, mat_prefix in (('!CalibrationCurves', 'polynomial_calibration_', 'data_polynomial_calibration_'),
+                                       ('!ROIlead', 'ROIlead_', 'ROIlead_')):
+        os.makedirs(os.path.join(root, folder))
+        for k in range(args.dirs):
+            shutil.copy(small_png, os.path.join(root, folder, f'{prefix}{k:03d}.png'))
+            open(os.path.join(root, folder, f'{mat_prefix}{k:03d}.mat'), 'wb').close()
+
+    os.makedirs(os.path.join(root, 'scripts'))
+    for k in range(args.dirs):
+        open(os.path.join(root, 'scripts', f'bgnd_avg_1-{k}_from_Experiment_{k:03d}.mat'), 'wb').close()
+    return page_image(os.path.join(root, 'page.png'), args.dpi)
+
+
+def run_benchmarks(app, args, page_png):
+    """Per-operation latency samples in milliseconds"""
+    from processing_screen import ProcessingScreen
+    from progress_screen import AnalysisProgressScreen
+    from analysis_screen import AnalysisScreen
+    from calibration_screen import CalibrationScreen
+    from results_screen import ResultsScreen
+    from results_store import ResultsStore, RESULTS_DB
+
+    processing = ProcessingScreen(None)
+    progress = AnalysisProgressScreen(None)
+    analysis = AnalysisScreen(None)
+    calibration = CalibrationScreen(None)
+    results = ResultsScreen(None)
+    for screen in (processing, progress, analysis, calibration, results):
+        screen.resize(1600, 1000)
+        screen.show()
+    app.processEvents()
+
+    samples = {}
+
+    # The results file grows by a few rows between polls of the file monitor
+    lines = result_lines(args.rows)
+    polls = [lines[:end] for end in range(args.batch, args.rows + args.batch, args.batch)]
+    samples['results_table_poll'] = timed_calls(app, progress.update_results_table, polls)
+
+    films = [{"num": f"EB_{i:05d}", "dose": 2.5, "std": 0.05, "charge": 1.0} for i in range(args.rows)]
+    samples['add_film_data'] = timed_calls(app, processing._add_film_data, films)
+
+    chunks = console_chunks(args.stdout_mb, progress_lines=False)
+    progress.process = ChunkedOutput(chunks)
+    samples['stdout_analysis'] = timed_calls(app, lambda _: progress.handle_stdout(), chunks)
+    progress.process = None
+
+    chunks = console_chunks(args.stdout_mb, progress_lines=True)
+    processing.process = ChunkedOutput(chunks)
+    samples['stdout_processing'] = timed_calls(app, lambda _: processing._handle_stdout(), chunks)
+    processing.process = None
+
+    pixmap = QPixmap(page_png)
+    samples['scale_calibration'] = timed_calls(app, processing._scale_image_to_panel_height, [pixmap] * args.repeat)
+    samples['scale_lead_image'] = timed_calls(app, analysis.scale_image_to_panel_height, [pixmap] * args.repeat)
+
+    widths = [1200 + 40 * (k % 10) for k in range(args.repeat)]
+    samples['resize_columns'] = timed_calls(
+        app, lambda width: (progress.resize(width, 1000), progress.resize_table_columns()), widths)
+
+    def show_calibration(_):
+        calibration._dir_cache = None
+        calibration.showEvent(QShowEvent())
+    samples['show_calibration'] = timed_calls(app, show_calibration, range(args.repeat))
+    samples['show_analysis'] = timed_calls(app, lambda _: analysis.showEvent(QShowEvent()), range(args.repeat))
+
+    store = ResultsStore(RESULTS_DB)
+    run_id = store.begin_run('calibration', 'Experiment_000', 'LOT_000', {})
+    store.add_calibration_films(run_id, [{"film": f"EB_{i:05d}", "dose": 2.5, "dose_std": 0.05, "charge": 1.0}
+                                         for i in range(args.rows)])
+    store.close()
+    results.stage_combo.setCurrentText("Calibration")
+    samples['show_results'] = timed_calls(app, lambda _: results.showEvent(QShowEvent()), range(args.repeat))
+    return samples
+
+
+def check(stats, baseline, tolerance):
+    """Failures against the budgets and the baseline"""
+    failures = []
+    for name, values in stats.items():
+        budget = BUDGETS_MS.get(name)
+        if budget is not None and values['p90'] > budget:
+            failures.append(f"{name}: p90 {values['p90']:.2f} ms over the budget of {budget:.0f} ms")
+        reference = baseline.get(name)
+        if reference is not None:
+            limit = reference['p90'] * (1 + tolerance) + NOISE_FLOOR_MS
+            if values['p90'] > limit:
+                failures.append(f"{name}: p90 {values['p90']:.2f} ms against {reference['p90']:.2f} ms "
+                                f"in the baseline (limit {limit:.2f} ms)")
+    return failures
+
+
+def machine_info():
+    """Host and library versions recorded with the results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'commit': commit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='Rows for the table and results store benchmarks')
+    parser.add_argument('--batch', type=int, default=20, help='Rows added per results file poll')
+    parser.add_argument('--stdout-mb', type=float, default=4.0, help='Console output per stdout benchmark')
+    parser.add_argument('--dpi', type=int, default=300, help='Resolution of the page image to scale')
+    parser.add_argument('--dirs', type=int, default=200, help='Experiment directories, curves and lead images')
+    parser.add_argument('--repeat', type=int, default=50, help='Calls of the image, resize and refresh benchmarks')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed relative p90 growth over the baseline')
+    parser.add_argument('--save-baseline', help='Write this run as a baseline JSON file')
+    parser.add_argument('--output', help='JSON results file')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated workspace')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['operations']
+
+    app = QApplication(sys.argv[:1])
+    workdir = tempfile.mkdtemp(prefix='gui_bench_')
+    current_dir = os.getcwd()
+    try:
+        os.chdir(workdir)
+        page_png = build_workspace(workdir, args)
+        samples = run_benchmarks(app, args, page_png)
+    finally:
+        os.chdir(current_dir)
+        if args.keep:
+            print(f"Workspace kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = {name: percentiles(values) for name, values in samples.items()}
+    print(f"{'operation':<20} {'calls':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, values in stats.items():
+        print(f"{name:<20} {values['calls']:>6} {values['p50']:9.3f} {values['p90']:9.3f} "
+              f"{values['p99']:9.3f} {values['max']:9.3f}")
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine_info(),
+        'settings': {'rows': args.rows, 'batch': args.batch, 'stdout_mb': args.stdout_mb,
+                     'dpi': args.dpi, 'dirs': args.dirs, 'repeat': args.repeat},
+        'operations': stats,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+
+    failures = check(stats, baseline, args.tolerance)
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
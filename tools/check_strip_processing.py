@@ -0,0 +1,162 @@
+"""Check the strip processing path of the experimental films against the whole-film path.
+
+Synthetic experiments are scanned at a low and a high resolution (300 and 1200 dpi by
+default) and processed by processExperimentalFilms and analyzeLeadRegion:
+  whole   at the high resolution, every film loaded as one image
+  strips  at both resolutions, every film processed in strips of rows
+          (FILMDOSIMETRY_STRIP_THRESHOLD_MB=0)
+The calibrated .dat files of the two high-resolution runs must agree, and the peak
+resident memory of the strip runs may only grow by a fixed margin (a few strips,
+--memory-margin-mb) from the low to the high resolution, however large the films are.
+Exits with 1 if either check fails.
+
+Usage:
+    python tools/check_strip_processing.py --dpi 300 1200 --films 3 --size-mm 60
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+import numpy as np
+
+from generate_synthetic_data import generate_experiment
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Any smooth response will do: both paths apply the same polynomial
+COEFF1 = [1.2e-13, -4.0e-9, -3.0e-4, 19.0]
+
+
+def run_octave(octave, workdir, command, log_name, env_overrides):
+    """Run an Octave command to completion and return its peak resident memory in bytes"""
+    env = os.environ.copy()
+    env['QT_QPA_PLATFORM'] = 'offscreen'
+    env.pop('OCTAVE_GUI_MODE', None)
+    env.update(env_overrides)
+
+    with open(os.path.join(workdir, log_name), 'w') as log:
+        process = subprocess.Popen([octave, '--no-gui', '--quiet', '--eval', command],
+                                   cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+            peak_rss = None
+
+    if process.returncode != 0:
+        with open(os.path.join(workdir, log_name), 'r') as log:
+            raise RuntimeError(f"Octave failed ({log_name}):\n{log.read()[-2000:]}")
+    return peak_rss
+
+
+def process_films(octave, workdir, manifest, mode):
+    """Process the experiment in one mode; returns (calibrated_dir, peak_rss)"""
+    exp_dir = manifest['experiment'] + '/'
+    command = (f"pkg load image; addpath('{os.path.join(REPO_DIR, 'functions').replace(os.sep, '/')}'); "
+               "set(0, 'defaultfigurevisible', 'off'); "
+               f"coeff1 = {json.dumps(COEFF1)}; "
+               f"processExperimentalFilms('{exp_dir}', [200 300; 180 220], coeff1, "
+               f"{json.dumps(manifest['charges'])}, true, false, false, 'double'); "
+               f"analyzeLeadRegion('{exp_dir}', coeff1, {json.dumps(manifest['lead_films'])}, 'full', 0);")
+    threshold = '0' if mode == 'strips' else '1e9'
+    peak_rss = run_octave(octave, workdir, command, f'{mode}.log',
+                          {'FILMDOSIMETRY_STRIP_THRESHOLD_MB': threshold})
+
+    calibrated_dir = os.path.join(workdir, f"{manifest['experiment']}_{mode}_CALIBRATED")
+    os.rename(os.path.join(workdir, manifest['experiment'] + '_CALIBRATED'), calibrated_dir)
+    return calibrated_dir, peak_rss
+
+
+def read_dat_files(calibrated_dir):
+    """Dose maps of the archived .dat files (Octave text format), by file name"""
+    maps = {}
+    with tarfile.open(os.path.join(calibrated_dir, 'experimental_films_data.tar.gz'), 'r') as tar:
+        for member in tar.getmembers():
+            if not member.name.endswith('.dat'):
+                continue
+            lines = tar.extractfile(member).read().decode('ascii').splitlines()
+            start = next(i for i, line in enumerate(lines) if line.strip() == '# name: image_film_Gy')
+            rows = int(lines[start + 2].split(':')[1])
+            maps[os.path.basename(member.name)] = np.loadtxt(lines[start + 4:start + 4 + rows], ndmin=2)
+    return maps
+
+
+def compare_maps(reference, values):
+    """Largest absolute difference between the dose maps of two runs"""
+    if sorted(reference) != sorted(values):
+        raise RuntimeError("The two runs produced different films")
+    max_abs = 0.0
+    for name, dose in reference.items():
+        if dose.shape != values[name].shape:
+            raise RuntimeError(f"{name}: {dose.shape} against {values[name].shape}")
+        max_abs = max(max_abs, float(np.max(np.abs(dose - values[name]))))
+    return max_abs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dpi', type=int, nargs=2, default=[300, 1200], help='Low and high scan resolution')
+    parser.add_argument('--films', type=int, default=3, help='Number of beam films')
+    parser.add_argument('--lead', type=int, default=1, help='Number of lead-shadow films')
+    parser.add_argument('--size-mm', type=float, default=60.0, help='Film side length in mm')
+    parser.add_argument('--memory-margin-mb', type=float, default=160,
+                        help='Allowed growth of the strip peak memory from the low to the high resolution')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--octave', default=shutil.which('octave') or 'octave', help='Octave executable')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated workspaces')
+    args = parser.parse_args()
+
+    low_dpi, high_dpi = args.dpi
+    peaks = {}
+    failures = []
+    for dpi in (low_dpi, high_dpi):
+        workdir = tempfile.mkdtemp(prefix=f'film_strips_{dpi}_')
+        try:
+            print(f"Generating {args.films + args.lead} films at {dpi} dpi...")
+            _, manifest = generate_experiment(workdir, 'Strip_Experiment', args.films, args.lead, 0,
+                                              dpi, 16, args.size_mm, np.random.default_rng(args.seed))
+            modes = ('whole', 'strips') if dpi == high_dpi else ('strips',)
+            outputs = {}
+            for mode in modes:
+                calibrated_dir, peaks[(dpi, mode)] = process_films(args.octave, workdir, manifest, mode)
+                outputs[mode] = calibrated_dir
+            if dpi == high_dpi:
+                max_abs = compare_maps(read_dat_files(outputs['whole']), read_dat_files(outputs['strips']))
+                print(f"  dose maps, strips vs whole: max abs difference {max_abs:.3g} Gy")
+                if max_abs > 1e-9:
+                    failures.append(f"strip dose maps differ from the whole-film maps by {max_abs:.3g} Gy")
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        finally:
+            if args.keep:
+                print(f"Workspace kept: {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\nPeak resident memory of Octave (MB)")
+    for (dpi, mode), peak in sorted(peaks.items()):
+        print(f"  {dpi:>5} dpi {mode:<8} {peak / 2**20:10.1f}" if peak else f"  {dpi:>5} dpi {mode:<8} {'n/a':>10}")
+
+    low, high = peaks.get((low_dpi, 'strips')), peaks.get((high_dpi, 'strips'))
+    if low and high and high - low > args.memory_margin_mb * 2**20:
+        failures.append(f"strip peak memory grows with resolution: {high / 2**20:.0f} MB at {high_dpi} dpi "
+                        f"against {low / 2**20:.0f} MB at {low_dpi} dpi")
+
+    for failure in failures:
+        print(f"FAILED: {failure}", file=sys.stderr)
+    if not failures:
+        print("Strip processing matches the whole-film path")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+function compare_lead_mask_storage(mat_path)
+% Compare the compact !ROIlead mask layout with the previous full-mask layout.
+% Writes both layouts of the masks in mat_path (either layout) to temporary files and
+% prints their sizes and the time to load them and rebuild every mask's coordinates.
+%
+% Usage (from the application root):
+%   octave --eval "addpath('tools'); compare_lead_mask_storage('!ROIlead/ROIlead_25_from_Exp.mat')"
+
+    repo_dir = fileparts(fileparts(mfilename('fullpath')));
+    addpath(fullfile(repo_dir, 'functions'));
+    addpath(fullfile(repo_dir, 'scripts', 'functions'));
+
+    load(mat_path, 'lead_data');
+    fields = fieldnames(lead_data);
+
+    legacy = struct();
+    compact = struct();
+    for k = 1:numel(fields)
+        entry = lead_data.(fields{k});
+        [rows, cols] = lead_mask_coords(entry);
+        if isfield(entry, 'mask_size')
+            mask_size = double(entry.mask_size);
+        else
+            mask_size = size(entry.full_mask);
+        end
+        full_mask = false(mask_size);
+        full_mask(sub2ind(mask_size, rows, cols)) = true;
+
+        legacy.(fields{k}) = struct(...
+            'film_number', entry.film_number, ...
+            'mask_pixel_coords', [rows, cols], ...
+            'full_mask', full_mask, ...
+            'roi_coords', entry.roi_coords);
+        roi = entry.roi_coords;
+        compact.(fields{k}) = encodeLeadMask(full_mask(roi.y1:roi.y2, roi.x1:roi.x2), ...
+                                             entry.film_number, roi, mask_size);
+    end
+
+    printf("%d masks from %s\n", numel(fields), mat_path);
+    printf("%-10s %12s %14s\n", 'layout', 'size, KB', 'load+decode, ms');
+    report_layout('full mask', legacy, fields);
+    report_layout('compact', compact, fields);
+end
+
+function report_layout(label, lead_data, fields)
+    tmp_file = [tempname(), '.mat'];
+    save('-v7', tmp_file, 'lead_data');
+    info = dir(tmp_file);
+
+    repeats = 5;
+    t = tic;
+    for r = 1:repeats
+        loaded = load(tmp_file, 'lead_data');
+        for k = 1:numel(fields)
+            lead_mask_coords(loaded.lead_data.(fields{k}));
+        end
+    end
+    elapsed_ms = toc(t) / repeats * 1000;
+    delete(tmp_file);
+
+    printf("%-10s %12.1f %14.2f\n", label, info.bytes / 1024, elapsed_ms);
+end
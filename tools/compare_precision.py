@@ -0,0 +1,272 @@
+"""Accuracy, memory and disk comparison of the single- and double-precision pipelines.
+
+A synthetic dataset is calibrated and analysed twice, with the real calibration and
+analysis scripts, once per precision. The report lists:
+  accuracy  every number of temp_analysis_results.txt (and of the full-precision
+            analysis_report_data.json), single against double: max absolute and
+            relative difference per column
+  disk      .dat files, archive and background file of each run
+  memory    peak resident memory of the Octave process of each stage
+
+The analysis uses a computed background and the lead masks of the calibration, so
+background averaging and the mask statistics are covered as well.
+
+Usage:
+    python tools/compare_precision.py --films 20 --output precision_report.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from generate_synthetic_data import generate_dataset
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRECISIONS = ('double', 'single')
+RESULT_COLUMNS = ['Charge_nC', 'Dose_with_BG_Gy', 'Dose_with_BG_std', 'Dose_CD', 'Dose_CD_std',
+                  'x0_mm', 'y0_mm', 'xstd_mm', 'ystd_mm']
+REPORT_FIELDS = ['Dose_CD_all', 'Dose_CD_std_all', 'Dose_with_BGND_Gy_all', 'Dose_with_BGND_Gy_std_all',
+                 'Dose_Gy_all', 'Dose_Gy_std_all', 'Dose_ROI_mask_all', 'Dose_ROI_mask_std_all',
+                 'x0_all', 'y0_all', 'xstd_all', 'ystd_all']
+
+
+def run_octave(octave, workdir, command, log_name, gui_mode=False):
+    """Run an Octave command to completion and return its peak resident memory in bytes"""
+    env = os.environ.copy()
+    env['QT_QPA_PLATFORM'] = 'offscreen'
+    env.pop('OCTAVE_GUI_MODE', None)
+    if gui_mode:
+        env['OCTAVE_GUI_MODE'] = '1'
+
+    with open(os.path.join(workdir, log_name), 'w') as log:
+        process = subprocess.Popen([octave, '--no-gui', '--quiet', '--eval', command],
+                                   cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+            peak_rss = None
+
+    if process.returncode != 0:
+        with open(os.path.join(workdir, log_name), 'r') as log:
+            raise RuntimeError(f"Octave failed ({log_name}):\n{log.read()[-2000:]}")
+    return peak_rss
+
+
+def calibrate(octave, workdir, manifest, precision, args):
+    """Run the calibration script; returns (calibrated_dir, peak_rss)"""
+    user_inputs = {
+        "use_existing_calibration": False,
+        "selected_cal": "",
+        "selected_mat": "",
+        "cal_dir": manifest['calibration_dir'] + '/',
+        "exp_dir": manifest['experiment_dir'] + '/',
+        "chargeAll": manifest['charges'],
+        "lead_films": manifest['lead_films'],
+        "validate_calibration": False,
+        "polynomial_degree": args.polynomial_degree,
+        "lead_mask_type": "full",
+        "rect_height_mm": 0,
+        "write_dose_cube": False,  # The cube is float32 in both modes
+        "single_precision": precision == 'single',
+    }
+    with open(os.path.join(workdir, 'user_inputs.json'), 'w') as f:
+        json.dump(user_inputs, f)
+
+    command = (f"pkg load io; pkg load image; addpath('{REPO_DIR.replace(os.sep, '/')}'); "
+               "Check_calibration_XD_add_films();")
+    peak_rss = run_octave(octave, workdir, command, f'calibration_{precision}.log')
+
+    # Keep each run's output apart; the analysis finds the experiment ID before '_CALIBRATED'
+    calibrated_dir = os.path.join(workdir, f"{manifest['experiment_dir']}_{precision}_CALIBRATED")
+    os.rename(os.path.join(workdir, manifest['experiment_dir'] + '_CALIBRATED'), calibrated_dir)
+    return calibrated_dir, peak_rss
+
+
+def analyse(octave, workdir, manifest, calibrated_dir, precision):
+    """Run the analysis script in GUI mode; returns (results rows, report data, background file, peak_rss)"""
+    scripts_dir = os.path.join(workdir, 'scripts')
+    exp_name = manifest['experiment_dir']
+    lead_str = '_'.join(str(n) for n in manifest['lead_films'])
+    main_nums = manifest['main_films']
+
+    user_inputs = {
+        "roi_shape": "circle",
+        "roi_size": 2,
+        "directory_films": f"../{os.path.basename(calibrated_dir)}/",
+        "roi_image_path": f"../!ROIlead/ROIlead_{lead_str}_from_{exp_name}.png",
+        "roi_mat_path": f"../!ROIlead/ROIlead_{lead_str}_from_{exp_name}.mat",
+        "selected_masks": manifest['lead_films'],
+        "bgnd_choice": "compute",
+        "bgnd_file": "",
+        "bg_nums": manifest['background_films'],
+        "main_nums": main_nums,
+        "include_calib_plot": 0,
+        "film_notes": [''] * len(main_nums),
+        "single_precision": 1 if precision == 'single' else 0,
+    }
+    with open(os.path.join(scripts_dir, 'get_user_inputs.json'), 'w') as f:
+        json.dump(user_inputs, f)
+
+    # The calibration archives the .dat files and removes them; the analysis screen
+    # extracts them before the analysis runs
+    with tarfile.open(os.path.join(calibrated_dir, 'experimental_films_data.tar.gz'), 'r') as tar:
+        tar.extractall(path=calibrated_dir)
+
+    command = "pkg load io; pkg load image; analyze_shots_films_MOD_centering_Charge_Density_bgnd();"
+    peak_rss = run_octave(octave, scripts_dir, command, f'analysis_{precision}.log', gui_mode=True)
+
+    with open(os.path.join(scripts_dir, 'temp_analysis_results.txt'), 'r') as f:
+        rows = [line.rstrip('\n').split('\t') for line in f.readlines()[1:] if line.strip()]
+    with open(os.path.join(scripts_dir, 'analysis_report_data.json'), 'r') as f:
+        report = json.load(f)
+
+    bgnd_files = [name for name in os.listdir(scripts_dir) if name.startswith('bgnd_avg_')]
+    bgnd_file = os.path.join(scripts_dir, bgnd_files[0]) if bgnd_files else None
+    return rows, report, bgnd_file, peak_rss
+
+
+def disk_usage(calibrated_dir, bgnd_file):
+    """Bytes of the calibrated outputs of one run"""
+    archive = os.path.join(calibrated_dir, 'experimental_films_data.tar.gz')
+    with tarfile.open(archive, 'r') as tar:
+        dat_bytes = sum(member.size for member in tar.getmembers() if member.name.endswith('.dat'))
+    return {
+        'dat_files': dat_bytes,
+        'archive': os.path.getsize(archive),
+        'background': os.path.getsize(bgnd_file) if bgnd_file else 0,
+    }
+
+
+def column_differences(reference, values):
+    """Max absolute and relative difference between two equally long lists of numbers"""
+    max_abs = 0.0
+    max_rel = 0.0
+    for ref, val in zip(reference, values):
+        diff = abs(val - ref)
+        max_abs = max(max_abs, diff)
+        if ref != 0:
+            max_rel = max(max_rel, diff / abs(ref))
+    return {'max_abs': max_abs, 'max_rel': max_rel}
+
+
+def compare_results(runs):
+    """Per-column differences of single against double"""
+    ref_rows, test_rows = runs['double']['rows'], runs['single']['rows']
+    if [row[1] for row in ref_rows] != [row[1] for row in test_rows]:
+        raise RuntimeError("The two runs analysed different films")
+
+    results_txt = {}
+    for col, name in enumerate(RESULT_COLUMNS, start=2):
+        results_txt[name] = column_differences([float(row[col]) for row in ref_rows],
+                                               [float(row[col]) for row in test_rows])
+        # Values are written with 2 decimals; count how many printed values changed
+        results_txt[name]['changed'] = sum(ref[col] != test[col] for ref, test in zip(ref_rows, test_rows))
+
+    report_data = {}
+    for field in REPORT_FIELDS:
+        reference = runs['double']['report'].get(field, [])
+        values = runs['single']['report'].get(field, [])
+        reference = reference if isinstance(reference, list) else [reference]
+        values = values if isinstance(values, list) else [values]
+        report_data[field] = column_differences(reference, values)
+
+    return {'temp_analysis_results': results_txt, 'report_data': report_data}
+
+
+def print_report(report):
+    n = report['films']
+    print(f"\nAccuracy, single vs double ({n} analysed films)")
+    print(f"  {'temp_analysis_results.txt':<28} {'max abs':>12} {'max rel':>12} {'changed':>8}")
+    for name, diff in report['accuracy']['temp_analysis_results'].items():
+        print(f"  {name:<28} {diff['max_abs']:12.3g} {diff['max_rel']:12.3g} {diff['changed']:>5}/{n}")
+    print(f"  {'analysis_report_data.json':<28} {'max abs':>12} {'max rel':>12}")
+    for name, diff in report['accuracy']['report_data'].items():
+        print(f"  {name:<28} {diff['max_abs']:12.3g} {diff['max_rel']:12.3g}")
+
+    print("\nDisk (bytes)")
+    print(f"  {'':<28} {'double':>14} {'single':>14} {'saving':>8}")
+    for key in report['disk']['double']:
+        double, single = report['disk']['double'][key], report['disk']['single'][key]
+        saving = f"{100 * (1 - single / double):.0f}%" if double else '-'
+        print(f"  {key:<28} {double:>14} {single:>14} {saving:>8}")
+
+    print("\nPeak resident memory of Octave (MB)")
+    for stage in ('calibration', 'analysis'):
+        double, single = report['memory']['double'][stage], report['memory']['single'][stage]
+        if double and single:
+            print(f"  {stage:<28} {double / 2**20:14.1f} {single / 2**20:14.1f} "
+                  f"{100 * (1 - single / double):7.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--films', type=int, default=20, help='Number of beam films')
+    parser.add_argument('--lead', type=int, default=2, help='Number of lead-shadow films')
+    parser.add_argument('--background', type=int, default=3, help='Number of background-only films')
+    parser.add_argument('--dpi', type=int, default=300, help='Scan resolution')
+    parser.add_argument('--bits', type=int, choices=[8, 16], default=16, help='Bits per sample')
+    parser.add_argument('--size-mm', type=float, default=40.0, help='Experimental film side length in mm')
+    parser.add_argument('--polynomial-degree', type=int, default=3, help='Calibration polynomial degree')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--octave', default=shutil.which('octave') or 'octave', help='Octave executable')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated workspace')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='film_precision_')
+    try:
+        manifest = generate_dataset(workdir, films=args.films, lead=args.lead, background=args.background,
+                                    dpi=args.dpi, bits=args.bits, size_mm=args.size_mm, seed=args.seed)
+        shutil.copytree(os.path.join(REPO_DIR, 'scripts'), os.path.join(workdir, 'scripts'),
+                        ignore=shutil.ignore_patterns('images', 'report_cache', '*.json', '*.txt', '*.pdf', '*.mat'))
+
+        runs = {}
+        for precision in PRECISIONS:
+            print(f"Running the {precision}-precision pipeline...")
+            calibrated_dir, calibration_rss = calibrate(args.octave, workdir, manifest, precision, args)
+            rows, report_data, bgnd_file, analysis_rss = analyse(args.octave, workdir, manifest,
+                                                                 calibrated_dir, precision)
+            runs[precision] = {
+                'rows': rows,
+                'report': report_data,
+                'disk': disk_usage(calibrated_dir, bgnd_file),
+                'memory': {'calibration': calibration_rss, 'analysis': analysis_rss},
+            }
+            if bgnd_file:
+                os.remove(bgnd_file)  # Each run computes its own background
+
+        report = {
+            'films': len(runs['double']['rows']),
+            'film_size_px': manifest['film_size_px'],
+            'accuracy': compare_results(runs),
+            'disk': {precision: runs[precision]['disk'] for precision in PRECISIONS},
+            'memory': {precision: runs[precision]['memory'] for precision in PRECISIONS},
+        }
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        if args.keep:
+            print(f"Workspace kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
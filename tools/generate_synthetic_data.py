@@ -0,0 +1,243 @@
+"""Generate a synthetic film dosimetry dataset for benchmarking.
+
+Writes, into an output directory laid out like the application root:
+  - Calibration_<lot>/      step-dose calibration TIFFs (2 films per dose level)
+                            + doses.xlsx with delivered doses in column F from row 2
+  - <experiment>/           experimental TIFFs with Gaussian beam spots, lead-shadow
+                            films and background-only films
+  - <experiment>_manifest.json  charges and film numbers for building user inputs
+
+Usage:
+    python tools/generate_synthetic_data.py OUTPUT_DIR --films 100 --dpi 300
+"""
+import argparse
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+CALIBRATION_DOSES_GY = [0.0, 0.5, 1.0, 2.0, 3.0, 4.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0, 25.0]
+
+
+def dose_to_intensity(dose, max_value):
+    """Film response: scanner intensity of the green channel for a dose in Gy"""
+    net_od = 0.65 * dose / (dose + 6.0)
+    return 0.92 * max_value * np.power(10.0, -net_od)
+
+
+def write_tiff(path, rgb, dpi):
+    """Write an uncompressed, strip-organised RGB TIFF (8 or 16 bits per sample)"""
+    height, width, _ = rgb.shape
+    bits = 16 if rgb.dtype == np.uint16 else 8
+    data = np.ascontiguousarray(rgb.astype('<u2' if bits == 16 else 'u1'))
+    row_bytes = width * 3 * bits // 8
+    rows_per_strip = max(1, 65536 // row_bytes)
+    n_strips = (height + rows_per_strip - 1) // rows_per_strip
+
+    entries = 13
+    ifd_offset = 8
+    ifd_size = 2 + entries * 12 + 4
+    bits_offset = ifd_offset + ifd_size
+    xres_offset = bits_offset + 6
+    yres_offset = xres_offset + 8
+    strip_offsets_offset = yres_offset + 8
+    strip_counts_offset = strip_offsets_offset + 4 * n_strips
+    data_offset = strip_counts_offset + 4 * n_strips
+
+    strip_offsets = []
+    strip_counts = []
+    for s in range(n_strips):
+        rows = min(rows_per_strip, height - s * rows_per_strip)
+        strip_offsets.append(data_offset + s * rows_per_strip * row_bytes)
+        strip_counts.append(rows * row_bytes)
+
+    def entry(tag, type_, count, value):
+        if type_ == 3 and count == 1:
+            return struct.pack('<HHIHH', tag, type_, count, value, 0)
+        return struct.pack('<HHII', tag, type_, count, value)
+
+    ifd = [
+        entry(256, 4, 1, width),
+        entry(257, 4, 1, height),
+        entry(258, 3, 3, bits_offset),
+        entry(259, 3, 1, 1),
+        entry(262, 3, 1, 2),
+        entry(273, 4, n_strips, strip_offsets[0] if n_strips == 1 else strip_offsets_offset),
+        entry(277, 3, 1, 3),
+        entry(278, 4, 1, rows_per_strip),
+        entry(279, 4, n_strips, strip_counts[0] if n_strips == 1 else strip_counts_offset),
+        entry(282, 5, 1, xres_offset),
+        entry(283, 5, 1, yres_offset),
+        entry(284, 3, 1, 1),
+        entry(296, 3, 1, 2),
+    ]
+
+    with open(path, 'wb') as f:
+        f.write(b'II*\x00' + struct.pack('<I', ifd_offset))
+        f.write(struct.pack('<H', entries) + b''.join(ifd) + struct.pack('<I', 0))
+        f.write(struct.pack('<HHH', bits, bits, bits))
+        f.write(struct.pack('<II', int(dpi), 1))
+        f.write(struct.pack('<II', int(dpi), 1))
+        f.write(struct.pack(f'<{n_strips}I', *strip_offsets))
+        f.write(struct.pack(f'<{n_strips}I', *strip_counts))
+        f.write(data.tobytes())
+
+
+def write_dose_xlsx(path, doses):
+    """Write a minimal xlsx workbook with the doses in column F starting from row 2"""
+    rows = ''.join(f'<row r="{i}"><c r="F{i}"><v>{dose}</v></c></row>'
+                   for i, dose in enumerate(doses, start=2))
+    parts = {
+        '[Content_Types].xml':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>',
+        '_rels/.rels':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>',
+        'xl/workbook.xml':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        'xl/_rels/workbook.xml.rels':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>',
+        'xl/worksheets/sheet1.xml':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'<sheetData>{rows}</sheetData></worksheet>',
+    }
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, content in parts.items():
+            zf.writestr(name, content)
+
+
+def film_image(dose_map, bits, rng, noise=0.004):
+    """Convert a dose map to a noisy RGB scan"""
+    max_value = 65535 if bits == 16 else 255
+    green = dose_to_intensity(dose_map, max_value)
+    green *= 1.0 + noise * rng.standard_normal(dose_map.shape)
+    rgb = np.empty(dose_map.shape + (3,), dtype=np.float64)
+    rgb[..., 0] = green * 1.08
+    rgb[..., 1] = green
+    rgb[..., 2] = green * 0.85
+    dtype = np.uint16 if bits == 16 else np.uint8
+    return np.clip(np.rint(rgb), 0, max_value).astype(dtype)
+
+
+def generate_calibration(root, lot, dpi, bits, rng):
+    """Write calibration films (two per dose level) and the dose workbook"""
+    cal_dir = os.path.join(root, f'Calibration_{lot}')
+    os.makedirs(cal_dir, exist_ok=True)
+    # The calibration code crops rows 10:460 and columns 10:400
+    height = max(480, int(round(42 / 25.4 * dpi)))
+    width = max(420, int(round(38 / 25.4 * dpi)))
+
+    index = 1
+    for dose in CALIBRATION_DOSES_GY:
+        for _ in range(2):
+            dose_map = np.full((height, width), dose)
+            write_tiff(os.path.join(cal_dir, f'CAL{index:03d}.tif'), film_image(dose_map, bits, rng), dpi)
+            index += 1
+
+    write_dose_xlsx(os.path.join(cal_dir, 'doses.xlsx'), CALIBRATION_DOSES_GY)
+    return cal_dir
+
+
+def generate_experiment(root, name, n_films, n_lead, n_background, dpi, bits, size_mm, rng):
+    """Write experimental films: beam spots, lead-shadow films and background-only films"""
+    exp_dir = os.path.join(root, name)
+    os.makedirs(exp_dir, exist_ok=True)
+
+    height = width = int(round(size_mm / 25.4 * dpi))
+    pix_mm = 25.4 / dpi
+    y, x = np.mgrid[0:height, 0:width]
+    x_mm = (x - width / 2) * pix_mm
+    y_mm = (y - height / 2) * pix_mm
+    background_gy = 0.25
+
+    total = n_films + n_lead + n_background
+    lead_numbers = list(range(n_films + 1, n_films + n_lead + 1))
+    background_numbers = list(range(n_films + n_lead + 1, total + 1))
+    charges = []
+
+    for number in range(1, total + 1):
+        is_background = number in background_numbers
+        charge = 0.0 if is_background else float(np.round(rng.uniform(5.0, 15.0), 2))
+        charges.append(charge)
+
+        dose_map = np.full((height, width), background_gy)
+        if not is_background:
+            x0, y0 = rng.uniform(-1.0, 1.0, size=2)
+            sx, sy = rng.uniform(1.5, 3.0, size=2)
+            peak = 1.2 * charge
+            dose_map += peak * np.exp(-((x_mm - x0) ** 2 / (2 * sx ** 2) + (y_mm - y0) ** 2 / (2 * sy ** 2)))
+
+        if number in lead_numbers:
+            # Lead shadow above the beam centre, inside the central segmentation window
+            shadow = (np.abs(x_mm) <= 2.0) & (y_mm >= -3.0) & (y_mm <= -0.5)
+            dose_map[shadow] *= 0.1
+
+        write_tiff(os.path.join(exp_dir, f'C{number:03d}.tif'), film_image(dose_map, bits, rng), dpi)
+
+    manifest = {
+        'experiment': name,
+        'dpi': dpi,
+        'bits': bits,
+        'film_size_px': [height, width],
+        'charges': charges,
+        'main_films': list(range(1, n_films + 1)),
+        'lead_films': lead_numbers,
+        'background_films': background_numbers,
+    }
+    with open(os.path.join(root, f'{name}_manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return exp_dir, manifest
+
+
+def generate_dataset(root, films=10, lead=4, background=3, dpi=300, bits=16,
+                     size_mm=40.0, lot='SYNTH', experiment='Synthetic_Experiment', seed=0):
+    """Generate a full calibration + experiment dataset and return its manifest"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(root, exist_ok=True)
+    cal_dir = generate_calibration(root, lot, dpi, bits, rng)
+    exp_dir, manifest = generate_experiment(root, experiment, films, lead, background,
+                                            dpi, bits, size_mm, rng)
+    manifest['calibration_dir'] = os.path.basename(cal_dir)
+    manifest['experiment_dir'] = os.path.basename(exp_dir)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='Output directory (laid out like the application root)')
+    parser.add_argument('--films', type=int, default=10, help='Number of beam films')
+    parser.add_argument('--lead', type=int, default=4, help='Number of lead-shadow films')
+    parser.add_argument('--background', type=int, default=3, help='Number of background-only films')
+    parser.add_argument('--dpi', type=int, default=300, help='Scan resolution')
+    parser.add_argument('--bits', type=int, choices=[8, 16], default=16, help='Bits per sample')
+    parser.add_argument('--size-mm', type=float, default=40.0, help='Experimental film side length in mm')
+    parser.add_argument('--lot', default='SYNTH', help='Calibration lot ID')
+    parser.add_argument('--experiment', default='Synthetic_Experiment', help='Experiment folder name')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    manifest = generate_dataset(args.output, args.films, args.lead, args.background, args.dpi,
+                                args.bits, args.size_mm, args.lot, args.experiment, args.seed)
+    print(f"Generated {len(manifest['charges'])} experimental films in "
+          f"{os.path.join(args.output, manifest['experiment_dir'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""End-to-end stage benchmarks on synthetic datasets.
+
+For each film count a synthetic dataset is generated in a temporary workspace and the
+real entry points run on it, as the GUI runs them (user_inputs.json and
+Check_calibration_XD_add_films, then get_user_inputs.json and the analysis script):
+  createCalibrationCurve, processExperimentalFilms, analyzeLeadRegion    (calibration)
+  extraction                                                  (Python, as in the GUI)
+  process_background, analysis_loop, generate_analysis_report            (analysis)
+
+Stage times are the stage spans the entry points record in OCTAVE_TRACE_FILE; the spans
+inside the stages (imread, tar, fminsearch, plot, saveas, ...) are reported as well,
+summed over calls and over parcellfun workers. The wall time of each Octave process
+(including start-up) is recorded alongside.
+
+Results are written as JSON (one run per film count); with --history every run is also
+appended as one JSON line, for tracking regressions across commits.
+
+Usage:
+    python tools/run_stage_benchmarks.py --films 10 100 500 --output benchmark_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+
+from generate_synthetic_data import generate_dataset
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from tracing import summarize_spans
+
+CALIBRATION_COMMAND = "pkg load io; pkg load image; addpath('{repo}'); Check_calibration_XD_add_films();"
+ANALYSIS_COMMAND = ("pkg load io; pkg load image; addpath('{repo}scripts/'); "
+                    "analyze_shots_films_MOD_centering_Charge_Density_bgnd();")
+
+
+def octave_path(path):
+    """Directory path in the form the Octave functions expect (forward slashes, trailing slash)"""
+    return path.replace('\\', '/').rstrip('/') + '/'
+
+
+def run_octave_entry_point(octave, workdir, command, label):
+    """Run an Octave entry point in workdir with span tracing.
+
+    Returns (stages, spans, wall_seconds): seconds per stage span, and calls and seconds
+    per span inside the stages.
+    """
+    trace_file = os.path.join(workdir, f'octave_trace_{label}.jsonl')
+    if os.path.exists(trace_file):
+        os.remove(trace_file)
+    env = os.environ.copy()
+    env['QT_QPA_PLATFORM'] = 'offscreen'
+    env['OCTAVE_TRACE_FILE'] = trace_file
+    env.pop('OCTAVE_GUI_MODE', None)
+    env.pop('OCTAVE_PROFILE_FILE', None)
+
+    start = time.perf_counter()
+    result = subprocess.run([octave, '--no-gui', '--quiet', '--eval', command],
+                            cwd=workdir, env=env, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Octave {label} run failed:\n{result.stderr[-2000:]}")
+
+    events = []
+    if os.path.exists(trace_file):
+        with open(trace_file, 'r') as f:
+            events = [json.loads(line) for line in f if line.strip()]
+
+    stages, spans = {}, {}
+    for category, name, calls, total_s, _, _ in summarize_spans(events):
+        if category == 'stage':
+            stages[name] = total_s
+        else:
+            spans[f'{label}/{name}'] = {'category': category, 'calls': calls, 'seconds': total_s}
+    if not stages:
+        raise RuntimeError(f"Octave {label} run recorded no stage spans")
+    return stages, spans, wall_seconds
+
+
+def extract_archive(calibrated_dir):
+    """Extract the processed films the same way the analysis screen does"""
+    start = time.perf_counter()
+    with tarfile.open(os.path.join(calibrated_dir, 'experimental_films_data.tar.gz'), 'r') as tar:
+        tar.extractall(path=calibrated_dir)
+    return time.perf_counter() - start
+
+
+def run_benchmark(octave, n_films, args):
+    """Generate a dataset with n_films beam films and time every stage"""
+    workdir = tempfile.mkdtemp(prefix=f'film_bench_{n_films}_')
+    try:
+        start = time.perf_counter()
+        manifest = generate_dataset(workdir, films=n_films, lead=args.lead, background=args.background,
+                                    dpi=args.dpi, bits=args.bits, size_mm=args.size_mm, seed=args.seed)
+        generation_time = time.perf_counter() - start
+
+        exp_dir = os.path.join(workdir, manifest['experiment_dir'])
+        calibrated_dir = exp_dir + '_CALIBRATED'
+
+        with open(os.path.join(workdir, 'user_inputs.json'), 'w') as f:
+            json.dump({
+                "use_existing_calibration": False,
+                "selected_cal": "",
+                "selected_mat": "",
+                "cal_dir": octave_path(manifest['calibration_dir']),
+                "exp_dir": octave_path(manifest['experiment_dir']),
+                "chargeAll": manifest['charges'],
+                "lead_films": manifest['lead_films'],
+                "validate_calibration": False,
+                "polynomial_degree": args.polynomial_degree,
+                "lead_mask_type": "full",
+                "rect_height_mm": 0,
+                "write_dose_cube": False,
+                "single_precision": False,
+                "compare_cals": [],
+            }, f, indent=2)
+        stages, spans, calibration_wall = run_octave_entry_point(
+            octave, workdir, CALIBRATION_COMMAND.format(repo=octave_path(REPO_DIR)), 'calibration')
+
+        stages['extraction'] = extract_archive(calibrated_dir)
+
+        # The analysis runs in scripts/ and reads the films relative to it, as in the GUI
+        analysis_dir = os.path.join(workdir, 'scripts')
+        os.makedirs(analysis_dir, exist_ok=True)
+        background = manifest['background_films']
+        with open(os.path.join(analysis_dir, 'get_user_inputs.json'), 'w') as f:
+            json.dump({
+                "roi_shape": "circle",
+                "roi_size": 2,
+                "directory_films": octave_path(os.path.join('..', os.path.basename(calibrated_dir))),
+                "roi_image_path": "",
+                "roi_mat_path": "",
+                "selected_masks": [],
+                "bgnd_choice": "compute" if background else "edge",
+                "bgnd_file": "",
+                "bg_nums": background,
+                "main_nums": manifest['main_films'],
+                "include_calib_plot": 1,
+                "single_precision": 0,
+                "sweep": {},
+                "film_notes": [""] * len(manifest['main_films']),
+            }, f, separators=(',', ':'))
+        analysis_stages, analysis_spans, analysis_wall = run_octave_entry_point(
+            octave, analysis_dir, ANALYSIS_COMMAND.format(repo=octave_path(REPO_DIR)), 'analysis')
+        stages.update(analysis_stages)
+        spans.update(analysis_spans)
+
+        return {
+            'films': n_films,
+            'total_films': len(manifest['charges']),
+            'dpi': args.dpi,
+            'bits': args.bits,
+            'film_size_px': manifest['film_size_px'],
+            'generation_seconds': generation_time,
+            'stages': stages,
+            'spans': spans,
+            'octave_wall_seconds': {'calibration': calibration_wall, 'analysis': analysis_wall},
+            'total_seconds': sum(stages.values()),
+        }
+    finally:
+        if args.keep:
+            print(f"Workspace kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def machine_info(octave):
+    """Host and tool versions recorded with every result"""
+    try:
+        version = subprocess.run([octave, '--version'], capture_output=True, text=True).stdout.splitlines()[0]
+    except (OSError, IndexError):
+        version = 'unknown'
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'octave': version,
+        'commit': commit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--films', type=int, nargs='+', default=[10, 100, 500], help='Beam film counts to benchmark')
+    parser.add_argument('--lead', type=int, default=4, help='Number of lead-shadow films')
+    parser.add_argument('--background', type=int, default=3, help='Number of background-only films')
+    parser.add_argument('--dpi', type=int, default=300, help='Scan resolution')
+    parser.add_argument('--bits', type=int, choices=[8, 16], default=16, help='Bits per sample')
+    parser.add_argument('--size-mm', type=float, default=40.0, help='Experimental film side length in mm')
+    parser.add_argument('--polynomial-degree', type=int, default=3, help='Calibration polynomial degree')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--octave', default=shutil.which('octave') or 'octave', help='Octave executable')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file')
+    parser.add_argument('--history', help='JSON-lines file to append each run to')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated workspaces')
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine_info(args.octave),
+        'runs': [],
+    }
+
+    for n_films in args.films:
+        print(f"Benchmarking {n_films} films...")
+        try:
+            run = run_benchmark(args.octave, n_films, args)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        results['runs'].append(run)
+        for stage, seconds in run['stages'].items():
+            print(f"  {stage:<28} {seconds:10.3f} s")
+        for span, timing in sorted(run['spans'].items(), key=lambda item: -item[1]['seconds']):
+            print(f"    {span:<36} {timing['seconds']:10.3f} s  ({timing['calls']} calls)")
+
+        if args.history:
+            with open(args.history, 'a') as f:
+                f.write(json.dumps({'timestamp': results['timestamp'], 'machine': results['machine'], **run}) + '\n')
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget,
+                           QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt
+
+TRACE_DIR = '!Traces'
+
+_tracers = {}
+
+
+def get_tracer(stage):
+    """Return the shared span tracer for a processing stage ('calibration' or 'analysis')"""
+    if stage not in _tracers:
+        _tracers[stage] = SpanTracer(stage)
+    return _tracers[stage]
+
+
+class SpanTracer:
+    """Collects timed spans from the GUI and the Octave process of one stage.
+
+    Octave appends one trace event per line to `octave_trace_file` (passed to it as
+    OCTAVE_TRACE_FILE); export() merges those with the GUI spans into a Chrome trace
+    event file in `!Traces/` that loads in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.octave_trace_file = os.path.abspath(f'octave_trace_{stage}.jsonl')
+        self.events = []
+
+    def begin_run(self):
+        """Remove Octave spans left over from an interrupted run"""
+        if os.path.exists(self.octave_trace_file):
+            os.remove(self.octave_trace_file)
+
+    @contextmanager
+    def span(self, name, category='gui'):
+        """Time the enclosed block as one span"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.time() - start, category)
+
+    def add_span(self, name, start, duration, category='gui'):
+        """Record a span that started at `start` (epoch seconds) and lasted `duration` seconds"""
+        self.events.append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": round(start * 1e6), "dur": round(duration * 1e6),
+            "pid": os.getpid(), "tid": 1
+        })
+
+    def add_counter(self, name, timestamp, values, pid=None):
+        """Record counter values (e.g. CPU or memory samples) at `timestamp` (epoch seconds)"""
+        self.events.append({
+            "name": name, "cat": "telemetry", "ph": "C",
+            "ts": round(timestamp * 1e6), "pid": pid or os.getpid(), "args": values
+        })
+
+    def export(self):
+        """Write the merged trace and return (trace_path, span_events)"""
+        events = self.events
+        self.events = []
+
+        if os.path.exists(self.octave_trace_file):
+            with open(self.octave_trace_file, 'r') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Last line may be incomplete if Octave was terminated
+            os.remove(self.octave_trace_file)
+
+        if not events:
+            return None, []
+
+        process_names = {os.getpid(): "FilmDosimetryGUI"}
+        for event in events:
+            process_names.setdefault(event.get("pid"), f"Octave ({self.stage})")
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+                    for pid, name in process_names.items()]
+
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        trace_path = os.path.join(TRACE_DIR, f"{self.stage}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(trace_path, 'w') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+        return trace_path, events
+
+
+def summarize_spans(events):
+    """Aggregate spans by name into rows of (category, name, calls, total_s, mean_ms, max_ms).
+
+    Stage spans come first, the rest are sorted by total time.
+    """
+    totals = {}
+    for event in events:
+        if event.get("ph") != "X":
+            continue
+        key = (event.get("cat", ""), event["name"])
+        calls, total, longest = totals.get(key, (0, 0, 0))
+        duration = event.get("dur", 0)
+        totals[key] = (calls + 1, total + duration, max(longest, duration))
+
+    rows = [(cat, name, calls, total / 1e6, total / calls / 1e3, longest / 1e3)
+            for (cat, name), (calls, total, longest) in totals.items()]
+    rows.sort(key=lambda row: (row[0] != 'stage', -row[3]))
+    return rows
+
+
+class TraceSummaryPanel(QWidget):
+    """Per-stage timing table shown on the processing screens after a run"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        self.title_label = QLabel("Stage timings will be shown when processing completes")
+        self.title_label.setStyleSheet("font-size: 12px; font-weight: bold;")
+        self.title_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Span", "Calls", "Total, s", "Mean, ms", "Max, ms"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setMaximumHeight(180)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                gridline-color: #d0d0d0;
+                background-color: transparent;
+                border: 1px solid #ccc;
+                border-radius: 4px;
+                font-size: 11px;
+            }
+            QHeaderView::section {
+                background-color: transparent;
+                border: 1px solid #ccc;
+                padding: 3px;
+                font-weight: bold;
+            }
+        """)
+
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, 5):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.table)
+
+    def show_summary(self, events, trace_path):
+        """Fill the table from the spans of a finished run"""
+        rows = summarize_spans(events)
+        self.table.setRowCount(len(rows))
+
+        for r, (category, name, calls, total_s, mean_ms, max_ms) in enumerate(rows):
+            values = [name, str(calls), f"{total_s:.2f}", f"{mean_ms:.1f}", f"{max_ms:.1f}"]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                if category == 'stage':
+                    font = item.font()
+                    font.setBold(True)
+                    item.setFont(font)
+                self.table.setItem(r, col, item)
+
+        if trace_path:
+            self.title_label.setText(f"Stage timings (trace: {trace_path})")
+        else:
+            self.title_label.setText("No timing data recorded")
+
+    def clear(self):
+        """Reset to the empty state"""
+        self.table.setRowCount(0)
+        self.title_label.setText("Stage timings will be shown when processing completes")